@@ -0,0 +1,177 @@
+"""
+Iteração de mini-lotes para o treino (ordem por época sem copiar o dataset).
+
+- CarregadorLotes embaralha só um vetor de índices a cada época; X e Y
+  continuam onde estão (ndarray contíguo ou memmap de carregar_csv_cache)
+- amostragem:
+    'sequencial'   -> ordem do arquivo; os lotes são views (nenhuma cópia)
+    'aleatoria'    -> permutação nova a cada época
+    'estratificada'-> permutação em que cada classe fica espalhada por igual
+                      ao longo da época: todo lote tem ~a proporção de
+                      classes do dataset (classes raras aparecem em todos)
+    'balanceada'   -> cada classe contribui com ~n / n_classes amostras por
+                      época (raras repetidas, frequentes subamostradas) e
+                      os lotes saem equilibrados
+- Fora do modo sequencial cada lote é reunido (np.take) em um de dois
+  buffers pré-alocados; com prefetch uma thread reúne o próximo lote
+  enquanto o atual treina (double buffering). O lote entregue só é válido
+  até o próximo ser pedido
+"""
+
+import queue
+import threading
+
+import numpy as np
+
+from utils import classes_de
+
+AMOSTRAGENS = ("sequencial", "aleatoria", "estratificada", "balanceada")
+
+
+def ordem_estratificada(rotulos, rng):
+    """
+    Permutação de range(len(rotulos)) em que as amostras de cada classe
+    ficam igualmente espaçadas: a k-ésima amostra (sorteada) de uma classe
+    com n_c membros recebe a chave (k + u) / n_c, u ~ U[0, 1), e a ordem
+    final é a das chaves.
+    """
+    rotulos = np.asarray(rotulos)
+    n = len(rotulos)
+    perm = rng.permutation(n)
+    classes = rotulos[perm]
+    por_classe = np.argsort(classes, kind="stable")
+    contagens = np.bincount(classes)
+    inicios = np.cumsum(contagens) - contagens
+    posicao = np.empty(n)
+    posicao[por_classe] = np.arange(n) - np.repeat(inicios, contagens)
+    chave = (posicao + rng.random(n)) / contagens[classes]
+    return perm[np.argsort(chave, kind="stable")]
+
+
+def ordem_balanceada(rotulos, rng):
+    """
+    n índices com ~n / n_classes de cada classe presente, em ordem
+    estratificada. Dentro de uma classe os índices percorrem permutações
+    sucessivas, então as raras repetem o mínimo possível.
+    """
+    rotulos = np.asarray(rotulos)
+    n = len(rotulos)
+    presentes = np.flatnonzero(np.bincount(rotulos))
+    cotas = np.full(len(presentes), n // len(presentes))
+    cotas[rng.permutation(len(presentes))[:n % len(presentes)]] += 1
+    escolhidos = []
+    for classe, cota in zip(presentes, cotas):
+        membros = np.flatnonzero(rotulos == classe)
+        voltas = -(-cota // len(membros))
+        escolhidos.append(np.concatenate([rng.permutation(membros) for _ in range(voltas)])[:cota])
+    indices = np.concatenate(escolhidos)
+    return indices[ordem_estratificada(rotulos[indices], rng)]
+
+
+class CarregadorLotes:
+    """
+    Iterável de mini-lotes (Xb, Yb); cada iteração completa é uma época.
+    X: (m x n) e Y: alvos (one-hot m x k ou índices m) — não são copiados
+    batch_size: None = lote completo
+    amostragem: ver AMOSTRAGENS
+    prefetch: reúne o próximo lote em uma thread enquanto o atual é usado.
+    Desligado por padrão: nos lotes usuais o np.take custa menos que a
+    passagem entre threads (bench_mlp mede CarregadorLotes com e sem)
+    seed: semente do gerador das ordens (None = aleatória)
+    """
+
+    def __init__(self, X, Y, batch_size=32, amostragem="aleatoria", prefetch=False, seed=None):
+        if amostragem not in AMOSTRAGENS:
+            raise ValueError(f"Amostragem desconhecida: {amostragem}")
+        if len(X) != len(Y):
+            raise ValueError(f"X tem {len(X)} linhas e Y tem {len(Y)}")
+        self.X = X
+        self.Y = Y
+        self.n = len(X)
+        self.batch_size = min(batch_size or self.n, self.n) or 1
+        self.amostragem = amostragem
+        self.prefetch = prefetch
+        self.rng = np.random.default_rng(seed)
+        self._rotulos = classes_de(Y) if amostragem in ("estratificada", "balanceada") else None
+        self._buffers = None  # [(Xb, Yb), (Xb, Yb)], alocados no primeiro uso
+
+    def __len__(self):
+        return -(-self.n // self.batch_size)
+
+    def ordem(self):
+        """Índices da próxima época (None no modo sequencial)."""
+        if self.amostragem == "aleatoria":
+            return self.rng.permutation(self.n)
+        if self.amostragem == "estratificada":
+            return ordem_estratificada(self._rotulos, self.rng)
+        if self.amostragem == "balanceada":
+            return ordem_balanceada(self._rotulos, self.rng)
+        return None
+
+    def _juntar(self, idx, slot):
+        """Copia as linhas idx de X e Y para o buffer 'slot' (sem alocar)."""
+        if self._buffers is None:
+            b = self.batch_size
+            self._buffers = [(np.empty((b,) + self.X.shape[1:], self.X.dtype),
+                              np.empty((b,) + self.Y.shape[1:], self.Y.dtype)) for _ in range(2)]
+        Xb, Yb = self._buffers[slot]
+        m = len(idx)
+        np.take(self.X, idx, axis=0, out=Xb[:m])
+        np.take(self.Y, idx, axis=0, out=Yb[:m])
+        return Xb[:m], Yb[:m]
+
+    def __iter__(self):
+        idx = self.ordem()
+        b = self.batch_size
+        if idx is None:
+            for inicio in range(0, self.n, b):
+                yield self.X[inicio:inicio + b], self.Y[inicio:inicio + b]
+        elif not self.prefetch or len(self) == 1:
+            for k, inicio in enumerate(range(0, self.n, b)):
+                yield self._juntar(idx[inicio:inicio + b], k % 2)
+        else:
+            yield from self._com_prefetch(idx)
+
+    def _com_prefetch(self, idx):
+        """
+        Double buffering: a thread enche um buffer livre e o põe em
+        'prontos'; o buffer de um lote só volta a 'livres' quando o
+        seguinte é pedido (o chamador já terminou de usá-lo).
+        """
+        livres = queue.SimpleQueue()
+        prontos = queue.SimpleQueue()
+        parar = threading.Event()
+        for slot in (0, 1):
+            livres.put(slot)
+
+        def produzir():
+            try:
+                for inicio in range(0, self.n, self.batch_size):
+                    slot = livres.get()
+                    if parar.is_set():
+                        return
+                    prontos.put((slot, self._juntar(idx[inicio:inicio + self.batch_size], slot)))
+                prontos.put(None)
+            except BaseException as e:  # repassado ao consumidor
+                prontos.put(e)
+
+        thread = threading.Thread(target=produzir, name="carregador-prefetch", daemon=True)
+        thread.start()
+        anterior = None
+        try:
+            while True:
+                item = prontos.get()
+                if item is None:
+                    break
+                if isinstance(item, BaseException):
+                    raise item
+                if anterior is not None:
+                    livres.put(anterior)
+                anterior, lote = item
+                yield lote
+        finally:
+            # interrupção no meio da época (break, exceção): libera a thread
+            parar.set()
+            livres.put(0)
+            livres.put(1)
+            thread.join()
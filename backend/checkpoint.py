@@ -0,0 +1,189 @@
+"""
+Checkpoints de treino gravados em segundo plano.
+
+- GravadorCheckpoints recebe snapshots do laço de treino e os grava em uma
+  thread própria; o treino só paga a cópia em memória, nunca o disco. Se um
+  snapshot chega enquanto outro ainda espera na fila, o mais antigo é
+  descartado (vale sempre o mais recente)
+- Retenção: mantém os 'manter_ultimos' checkpoints mais recentes e,
+  separadamente, o melhor pela métrica informada (menor é melhor)
+- Gravação atômica (arquivo temporário + os.replace)
+- Cada execução nova grava no próprio subdiretório (novo_diretorio_execucao):
+  a retenção e o melhor checkpoint nunca misturam execuções diferentes;
+  retomar um treino continua no diretório do checkpoint retomado
+"""
+
+import copy
+import glob
+import os
+import pickle
+import random
+import threading
+import time
+
+import numpy as np
+
+VERSAO_CHECKPOINT = 1
+_PREFIXO = "ckpt_epoca_"
+ARQUIVO_MELHOR = "melhor.ckpt"
+
+
+def estado_rng(carregador=None):
+    """
+    Estados dos geradores usados no treino (random e numpy global) e, se
+    houver, do gerador de ordens de um carregador.CarregadorLotes.
+    """
+    return {
+        "random": random.getstate(),
+        "numpy": np.random.get_state(),
+        "carregador": carregador.rng.bit_generator.state if carregador is not None else None,
+    }
+
+
+def restaurar_rng(estado, carregador=None):
+    """Inverso de estado_rng; com carregador, a ordem das épocas continua de onde parou."""
+    random.setstate(estado["random"])
+    np.random.set_state(estado["numpy"])
+    if carregador is not None and estado.get("carregador") is not None:
+        carregador.rng.bit_generator.state = estado["carregador"]
+
+
+def criar_snapshot(epoca, pesos, otimizador=None, agendador=None, erros=(), normalizador=None, mapa=None,
+                   config=None, metrica=None, carregador=None):
+    """
+    Copia tudo o que é preciso para retomar o treino (o laço de treino
+    segue alterando os originais enquanto o gravador escreve a cópia).
+    normalizador: utils.Normalizador (guardado como estado()) ou None.
+    carregador: carregador.CarregadorLotes do treino (estado do gerador de
+    ordens guardado em 'rng') ou None.
+    """
+    return {
+        "epoca": epoca,
+        "pesos": tuple(np.array(p, copy=True) for p in pesos),
+        "otimizador": copy.deepcopy(otimizador),
+        "agendador": copy.deepcopy(agendador),
+        "rng": estado_rng(carregador),
+        "erros": list(erros),
+        "normalizador": normalizador.estado() if normalizador is not None else None,
+        "mapa": dict(mapa) if mapa is not None else None,
+        "config": dict(config or {}),
+        "metrica": metrica,
+    }
+
+
+def salvar_checkpoint(caminho, estado):
+    """Grava o dict de estado de forma atômica."""
+    tmp = caminho + ".tmp"
+    with open(tmp, "wb") as f:
+        pickle.dump(dict(estado, versao=VERSAO_CHECKPOINT), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp, caminho)
+
+
+def carregar_checkpoint(caminho):
+    """
+    Lê um checkpoint (use apenas arquivos gerados por você: é um pickle).
+    retorna: dict com 'epoca', 'pesos', 'otimizador', 'agendador', 'rng',
+    'erros', 'normalizador', 'mapa', 'config' e 'metrica'
+    """
+    with open(caminho, "rb") as f:
+        estado = pickle.load(f)
+    if estado.get("versao") != VERSAO_CHECKPOINT:
+        raise ValueError(f"Versão de checkpoint não suportada: {estado.get('versao')}")
+    return estado
+
+
+def ultimo_checkpoint(diretorio):
+    """Caminho do checkpoint mais recente em diretorio (ou None)."""
+    arquivos = sorted(glob.glob(os.path.join(diretorio, f"{_PREFIXO}*.ckpt")))
+    return arquivos[-1] if arquivos else None
+
+
+def novo_diretorio_execucao(base):
+    """Cria e retorna base/AAAAmmdd-HHMMSS (com sufixo -2, -3... se já existir) para uma execução nova."""
+    nome = time.strftime("%Y%m%d-%H%M%S")
+    caminho = os.path.join(base, nome)
+    sufixo = 1
+    while True:
+        try:
+            os.makedirs(caminho)
+            return caminho
+        except FileExistsError:
+            sufixo += 1
+            caminho = os.path.join(base, f"{nome}-{sufixo}")
+
+
+class GravadorCheckpoints:
+    """
+    diretorio: pasta de UMA execução (ver novo_diretorio_execucao); se já
+    tiver checkpoints (retomada), a retenção e o melhor continuam deles.
+    """
+
+    def __init__(self, diretorio, manter_ultimos=3, manter_melhor=True):
+        self.diretorio = diretorio
+        self.manter_ultimos = max(1, manter_ultimos)
+        self.manter_melhor = manter_melhor
+        self.melhor_metrica = float("inf")
+        self.erro = None  # última exceção de gravação (o treino não é interrompido)
+
+        os.makedirs(diretorio, exist_ok=True)
+        melhor = os.path.join(diretorio, ARQUIVO_MELHOR)
+        if manter_melhor and os.path.exists(melhor):
+            # retomando no mesmo diretório: só substitui o melhor se superá-lo
+            try:
+                metrica = carregar_checkpoint(melhor).get("metrica")
+                if metrica is not None:
+                    self.melhor_metrica = metrica
+            except Exception as e:
+                print(f"Checkpoint {melhor} ignorado: {e}")
+        self._pendente = None
+        self._condicao = threading.Condition()
+        self._encerrar = False
+        self._thread = threading.Thread(target=self._laco, name="GravadorCheckpoints", daemon=True)
+        self._thread.start()
+
+    def submeter(self, estado):
+        """
+        Enfileira um snapshot (dict já copiado pelo chamador) e retorna na
+        hora. estado['epoca'] nomeia o arquivo; estado.get('metrica') decide
+        o melhor checkpoint.
+        """
+        with self._condicao:
+            self._pendente = estado
+            self._condicao.notify()
+
+    def _laco(self):
+        while True:
+            with self._condicao:
+                while self._pendente is None and not self._encerrar:
+                    self._condicao.wait()
+                estado, self._pendente = self._pendente, None
+                if estado is None:
+                    return
+            try:
+                self._gravar(estado)
+            except Exception as e:
+                print(f"Erro ao gravar checkpoint: {e}")
+                self.erro = e
+
+    def _gravar(self, estado):
+        caminho = os.path.join(self.diretorio, f"{_PREFIXO}{estado['epoca']:09d}.ckpt")
+        salvar_checkpoint(caminho, estado)
+
+        metrica = estado.get("metrica")
+        if self.manter_melhor and metrica is not None and metrica < self.melhor_metrica:
+            self.melhor_metrica = metrica
+            salvar_checkpoint(os.path.join(self.diretorio, ARQUIVO_MELHOR), estado)
+
+        antigos = sorted(glob.glob(os.path.join(self.diretorio, f"{_PREFIXO}*.ckpt")))[:-self.manter_ultimos]
+        for arquivo in antigos:
+            try:
+                os.remove(arquivo)
+            except OSError:
+                pass
+
+    def fechar(self):
+        """Grava o snapshot pendente (se houver) e encerra a thread."""
+        with self._condicao:
+            self._encerrar = True
+            self._condicao.notify()
+        self._thread.join()
@@ -0,0 +1,174 @@
+"""
+Arrays NumPy em memória compartilhada entre processos.
+
+O processo principal copia o dataset uma única vez para um bloco de
+shared_memory; os workers apenas anexam o bloco (sem cópia e sem pickle
+do array) e o usam como somente leitura ou, no caso dos pesos do treino
+paralelo, escrevem diretamente nele.
+
+AnelCompartilhado (fila circular de registros) e PesosCompartilhados
+(snapshot de pesos com seqlock) ligam um processo de treino à GUI sem
+pickle nem trava.
+"""
+
+import time
+from multiprocessing import shared_memory
+import numpy as np
+
+
+def criar_array_compartilhado(array):
+    """
+    Copia array para um novo bloco de memória compartilhada.
+    retorna: (shm, descritor, view) — descritor é uma tupla pequena e
+    serializável que os workers passam para anexar_array. Quem cria é
+    responsável por shm.close() e shm.unlink().
+    """
+    array = np.ascontiguousarray(array)
+    shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+    view = np.ndarray(array.shape, dtype=array.dtype, buffer=shm.buf)
+    view[...] = array
+    return shm, (shm.name, array.shape, array.dtype.str), view
+
+
+def anexar_array(descritor):
+    """
+    Anexa (sem copiar) um array criado por criar_array_compartilhado.
+    retorna: (shm, array) — mantenha a referência a shm enquanto usar array.
+    """
+    nome, shape, dtype = descritor
+    shm = shared_memory.SharedMemory(name=nome)
+    return shm, np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+
+
+def liberar(blocos):
+    """Fecha e remove (unlink) os blocos de memória criados pelo processo."""
+    for shm in blocos:
+        try:
+            shm.close()
+        except BufferError:
+            # ainda há views vivas apontando para o bloco; o unlink basta
+            # para o SO liberar a memória quando elas forem coletadas
+            pass
+        try:
+            shm.unlink()
+        except FileNotFoundError:
+            pass
+
+
+class AnelCompartilhado:
+    """
+    Fila circular de registros float64 de largura fixa em memória
+    compartilhada, com um produtor e um consumidor (processos diferentes).
+    Cabeçalho int64 [escritos, lidos]: só o produtor avança 'escritos' (depois
+    de gravar o registro) e só o consumidor avança 'lidos', então não há
+    trava. Com a fila cheia o produtor espera o consumidor (nada é perdido).
+    """
+
+    def __init__(self, capacidade=65536, largura=8, descritor=None):
+        if descritor is None:
+            self._shm, self.descritor, _ = criar_array_compartilhado(np.zeros(2 + capacidade * largura))
+            self._dono = True
+        else:
+            self._shm, _ = anexar_array(descritor[:3])
+            self.descritor = descritor
+            self._dono = False
+            capacidade, largura = descritor[3], descritor[4]
+        self.descritor = self.descritor[:3] + (capacidade, largura)
+        self.capacidade = capacidade
+        self.largura = largura
+        self._contadores = np.ndarray(2, dtype=np.int64, buffer=self._shm.buf)
+        self._registros = np.ndarray((capacidade, largura), dtype=np.float64, buffer=self._shm.buf, offset=16)
+
+    @classmethod
+    def anexar(cls, descritor):
+        return cls(descritor=descritor)
+
+    def escrever(self, *valores):
+        """Produtor: grava um registro (valores além da largura são ignorados; faltantes viram 0)."""
+        escritos = int(self._contadores[0])
+        while escritos - int(self._contadores[1]) >= self.capacidade:
+            time.sleep(0.001)
+        registro = self._registros[escritos % self.capacidade]
+        registro[:] = 0.0
+        registro[:len(valores)] = valores[:self.largura]
+        self._contadores[0] = escritos + 1
+
+    def ler(self):
+        """Consumidor: retorna (n x largura) com os registros novos, em ordem (cópia)."""
+        lidos = int(self._contadores[1])
+        escritos = int(self._contadores[0])
+        if escritos == lidos:
+            return self._registros[:0].copy()
+        indices = np.arange(lidos, escritos) % self.capacidade
+        registros = self._registros[indices]  # indexação avançada já copia
+        self._contadores[1] = escritos
+        return registros
+
+    def fechar(self):
+        # as views apontam para o bloco; solta-as antes de fechar
+        self._contadores = self._registros = None
+        if self._dono:
+            liberar([self._shm])
+        else:
+            self._shm.close()
+
+
+class PesosCompartilhados:
+    """
+    Parâmetros (W1, B1, ..., Wk, Bk) achatados em memória compartilhada com
+    seqlock: o contador de versão fica ímpar durante a escrita, então quem
+    lê repete a cópia se ela cruzou uma escrita. Um escritor, vários leitores.
+    """
+
+    def __init__(self, formas, dtype=np.float64, descritores=None):
+        self.formas = [tuple(f) for f in formas]
+        total = sum(int(np.prod(f)) for f in self.formas)
+        if descritores is None:
+            self._shm_flat, desc_flat, self.flat = criar_array_compartilhado(np.zeros(total, dtype=dtype))
+            self._shm_versao, desc_versao, self._versao = criar_array_compartilhado(np.zeros(1, dtype=np.int64))
+            self.descritores = (desc_flat, desc_versao)
+            self._dono = True
+        else:
+            self._shm_flat, self.flat = anexar_array(descritores[0])
+            self._shm_versao, self._versao = anexar_array(descritores[1])
+            self.descritores = descritores
+            self._dono = False
+
+    @property
+    def versao(self):
+        """Número de escritas concluídas."""
+        return int(self._versao[0]) // 2
+
+    def escrever(self, pesos):
+        self._versao[0] += 1
+        inicio = 0
+        for p in pesos:
+            self.flat[inicio:inicio + p.size] = p.ravel()
+            inicio += p.size
+        self._versao[0] += 1
+
+    def ler(self):
+        """Cópia consistente dos pesos (tupla de arrays nas formas originais)."""
+        while True:
+            antes = int(self._versao[0])
+            if antes % 2:
+                time.sleep(0)
+                continue
+            copia = self.flat.copy()
+            if int(self._versao[0]) == antes:
+                break
+        pesos = []
+        inicio = 0
+        for forma in self.formas:
+            tamanho = int(np.prod(forma))
+            pesos.append(copia[inicio:inicio + tamanho].reshape(forma))
+            inicio += tamanho
+        return tuple(pesos)
+
+    def fechar(self):
+        self.flat = self._versao = None
+        if self._dono:
+            liberar([self._shm_flat, self._shm_versao])
+        else:
+            self._shm_flat.close()
+            self._shm_versao.close()
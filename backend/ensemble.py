@@ -0,0 +1,171 @@
+"""
+Ensemble de MLPs com sementes diferentes, treinadas juntas.
+
+- Os N membros têm a mesma arquitetura e são empilhados: cada peso ganha
+  um eixo à frente (W: N x saída x entrada, B: N x saída), então um
+  mini-lote passa por todos os membros nas mesmas chamadas de matmul
+  (lote de matrizes), sem N laços Python nem N processos
+- O membro i começa exatamente dos pesos que inicializar_camadas sorteia
+  com random.seed(sementes[i]) e vê os mesmos mini-lotes; só a
+  inicialização difere, que é a variação que o ensemble quer suavizar
+- O treino é o de mlp: EspacoTrabalho aceita pesos empilhados (os buffers
+  ganham o mesmo eixo de membros) e os otimizadores (SGD, momentum,
+  RMSProp, Adam) são elemento a elemento, funcionando direto sobre eles
+- predict_proba_ensemble devolve as saídas de todos os membros em uma
+  chamada; predict_ensemble combina por média das saídas ou por voto;
+  avaliar_ensemble informa a acurácia de cada membro e do ensemble
+"""
+
+import random
+import time
+
+import numpy as np
+
+from mlp import (
+    inicializar_camadas, especificacao_camadas, ativacao_val, dtype_pesos, ativacoes_por_camada, alvos_treino,
+    criar_otimizador, treinar_epoca_camadas, EspacoTrabalho,
+)
+
+
+def inicializar_ensemble(n_in, larguras, n_out, sementes, dtype=np.float64):
+    """
+    Pesos empilhados de len(sementes) membros.
+    retorna: tupla plana (W1, B1, ..., Wk, Bk) com Wi (N x saída x entrada)
+    e Bi (N x saída); o membro i é inicializar_camadas após random.seed(sementes[i])
+    """
+    membros = []
+    for semente in sementes:
+        random.seed(semente)
+        membros.append(inicializar_camadas(n_in, larguras, n_out, dtype))
+    return tuple(np.stack(pesos) for pesos in zip(*membros))
+
+
+def membro(pesos, i):
+    """Pesos do membro i (views), no formato das funções de mlp (predict, salvar_modelo...)."""
+    return tuple(p[i] for p in pesos)
+
+
+# -------------------------
+# Treino
+# -------------------------
+def treinar_epoca_ensemble(X_train, Y_train, pesos, taxa=0.1, ativacao_tipo="logistica", batch_size=1,
+                           otimizador=None, espaco=None, ordem=None):
+    """
+    Uma época de todos os membros sobre os mesmos mini-lotes
+    (mlp.treinar_epoca_camadas com os pesos empilhados).
+    pesos: tupla plana empilhada (ver inicializar_ensemble), atualizada in-place
+    espaco: mlp.EspacoTrabalho dos pesos empilhados a reutilizar entre épocas
+    ordem: permutação das amostras para esta época (None = ordem do arquivo)
+    Retorna a perda média da época de cada membro (vetor N).
+    """
+    dtype = dtype_pesos(pesos)
+    X_train = np.asarray(X_train, dtype=dtype)
+    Y_train = alvos_treino(Y_train, dtype)
+    n = len(X_train)
+    if n == 0:
+        return np.zeros(len(pesos[0]))
+    if not batch_size or batch_size > n:
+        batch_size = n
+
+    lotes = None
+    if ordem is not None:
+        lotes = ((X_train[idx], Y_train[idx])
+                 for idx in (ordem[inicio:inicio + batch_size] for inicio in range(0, n, batch_size)))
+    return treinar_epoca_camadas(X_train, Y_train, pesos, taxa, ativacao_tipo, batch_size,
+                                 otimizador=otimizador, espaco=espaco, lotes=lotes)
+
+
+def treinar_ensemble(X_train, Y_train, n_in, n_hidden, n_out, n_membros=5, seed=0, taxa=0.1, epocas=1000,
+                     ativacao_tipo="logistica", batch_size=1, otimizador=None, saida=None, embaralhar=False,
+                     dtype=np.float64):
+    """
+    Treina n_membros redes (sementes seed, seed + 1, ...) de uma vez.
+    Demais parâmetros como em mlp.treinar; embaralhar sorteia uma ordem
+    nova de amostras a cada época (a mesma para todos os membros).
+    retorna: pesos empilhados (ver membro para extrair um deles)
+    """
+    larguras, ativacao_tipo = especificacao_camadas(n_hidden, ativacao_tipo, saida)
+    pesos = inicializar_ensemble(n_in, larguras, n_out, range(seed, seed + n_membros), dtype)
+    X_train = np.asarray(X_train, dtype=dtype_pesos(pesos))
+    Y_train = alvos_treino(Y_train, dtype_pesos(pesos))
+    if isinstance(otimizador, str):
+        otimizador = criar_otimizador(otimizador, taxa)
+
+    rng = np.random.default_rng(seed)
+    espaco = EspacoTrabalho(pesos, ativacao_tipo, batch_size or len(X_train))
+    inicio = time.perf_counter()
+    for epoca in range(epocas):
+        ordem = rng.permutation(len(X_train)) if embaralhar else None
+        erros = treinar_epoca_ensemble(X_train, Y_train, pesos, taxa, ativacao_tipo, batch_size, otimizador,
+                                       espaco, ordem)
+        if epoca % 500 == 0:
+            print(f"Época {epoca}, erro médio por membro = {np.array2string(erros, precision=6)} "
+                  f"({time.perf_counter() - inicio:.1f}s)")
+    return pesos
+
+
+# -------------------------
+# Predição e avaliação
+# -------------------------
+def predict_proba_ensemble(X, pesos, ativacao_tipo="logistica", chunk_size=65536):
+    """
+    retorna: ndarray (N x m x n_out) com a saída de cada membro, calculada
+    para todos de uma vez (em blocos de chunk_size linhas)
+    """
+    dtype = dtype_pesos(pesos)
+    X = np.atleast_2d(np.asarray(X, dtype=dtype))
+    ativacoes = ativacoes_por_camada(ativacao_tipo, len(pesos) // 2)
+    m = X.shape[0]
+    if not chunk_size or chunk_size <= 0:
+        chunk_size = max(m, 1)
+
+    scores = np.empty((len(pesos[0]), m, pesos[-1].shape[1]), dtype=dtype)
+    for inicio in range(0, m, chunk_size):
+        A = X[inicio:inicio + chunk_size]
+        for (W, B), tipo in zip(zip(pesos[0::2], pesos[1::2]), ativacoes):
+            A = ativacao_val(np.matmul(A, W.transpose(0, 2, 1)) + B[:, None, :], tipo)
+        scores[:, inicio:inicio + chunk_size] = A
+    return scores
+
+
+def combinar(scores, modo="media"):
+    """
+    scores: saídas dos membros (N x m x n_out)
+    modo: 'media' (argmax da média das saídas) ou 'voto' (classe mais votada;
+    empates decididos pela média das saídas)
+    retorna: índice da classe de cada linha (m)
+    """
+    media = scores.mean(axis=0)
+    if modo == "media":
+        return np.argmax(media, axis=1)
+    if modo != "voto":
+        raise ValueError(f"Modo de combinação desconhecido: {modo}")
+    votos = np.argmax(scores, axis=2)  # N x m
+    contagem = (votos[..., None] == np.arange(scores.shape[2])).sum(axis=0)  # m x n_out
+    empatadas = contagem == contagem.max(axis=1, keepdims=True)
+    return np.argmax(np.where(empatadas, media, -np.inf), axis=1)
+
+
+def predict_ensemble(X, pesos, ativacao_tipo="logistica", modo="media", chunk_size=65536):
+    """Classe prevista pelo ensemble para cada linha de X (ver combinar)."""
+    return combinar(predict_proba_ensemble(X, pesos, ativacao_tipo, chunk_size), modo)
+
+
+def avaliar_ensemble(X, Y, pesos, ativacao_tipo="logistica", chunk_size=65536):
+    """
+    Y: alvos one-hot (m x n_out) ou índices de classe inteiros (m)
+    retorna: dict com 'acuracia_membros' (lista), média e desvio dos membros
+    e a acurácia do ensemble por média ('acuracia_media_saidas') e por voto
+    ('acuracia_voto')
+    """
+    scores = predict_proba_ensemble(X, pesos, ativacao_tipo, chunk_size)
+    Y = np.asarray(Y)
+    rotulos = Y if Y.ndim == 1 else np.argmax(Y, axis=1)
+    por_membro = np.mean(np.argmax(scores, axis=2) == rotulos, axis=1)
+    return {
+        "acuracia_membros": por_membro.tolist(),
+        "acuracia_membros_media": float(por_membro.mean()),
+        "acuracia_membros_desvio": float(por_membro.std()),
+        "acuracia_media_saidas": float(np.mean(combinar(scores, "media") == rotulos)),
+        "acuracia_voto": float(np.mean(combinar(scores, "voto") == rotulos)),
+    }
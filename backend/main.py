@@ -1,35 +1,223 @@
-from utils import ler_csv, preparar_dados, normalizar_dados, codificar_classes, detectar_dimensoes
-from mlp import treinar, forward_pass
+import argparse
+import os
+import time
+
+import numpy as np
+
+from utils import (
+    ler_csv, preparar_dados, Normalizador, codificar_classes, codificar_indices, detectar_dimensoes,
+    estatisticas_csv, blocos_normalizados, salvar_modelo, dividir_treino_teste,
+)
+from mlp import (
+    treinar, treinar_streaming, predict_proba, interpretar_camadas, especificacao_camadas, validacao_cruzada,
+)
+from modelo import ModeloMLP
+from ensemble import treinar_ensemble, avaliar_ensemble
+
+
+def treinar_fora_da_memoria(caminho, tamanho_bloco, batch_size=32, camadas=None, dtype=np.float64, saida=None):
+    """
+    Treina relendo o CSV em blocos a cada época (arquivos maiores que a RAM).
+    retorna: (pesos, ativacao_tipo, normalizador, mapa)
+    """
+    # 1ª passada: min/max, mapa de classes e total de amostras
+    estatisticas = estatisticas_csv(caminho, tamanho_bloco, dtype=dtype)
+    input_dim = estatisticas["normalizador"].n_atributos
+    output_dim = len(estatisticas["mapa"])
+
+    print(f"Total de amostras: {estatisticas['n_amostras']}")
+    print(f"Dimensão de entrada: {input_dim}")
+    print(f"Número de classes (saídas): {output_dim}")
+    print(f"Mapa de classes: {estatisticas['mapa']}")
+
+    hidden_dim = camadas or (input_dim + output_dim) // 2 or 1
+    _, ativacao_tipo = especificacao_camadas(hidden_dim, "logistica", saida)
+    print(f"Neurônios camada(s) oculta(s): {hidden_dim}")
+
+    print("\nTreinando a MLP em streaming... Aguarde...\n")
+
+    pesos = treinar_streaming(
+        lambda: blocos_normalizados(caminho, estatisticas, tamanho_bloco, one_hot=saida is None),
+        n_in=input_dim,
+        n_hidden=hidden_dim,
+        n_out=output_dim,
+        taxa=0.5,
+        epocas=5000,
+        batch_size=batch_size,
+        dtype=dtype,
+        saida=saida
+    )
+    return pesos, ativacao_tipo, estatisticas["normalizador"], estatisticas["mapa"]
+
+
+def atualizar_incremental(arquivo_modelo, caminho, epocas, replay=0, exportar=None):
+    """Carrega (ou cria) um ModeloMLP, aplica partial_fit com as linhas do CSV e grava de volta."""
+    if os.path.exists(arquivo_modelo):
+        modelo = ModeloMLP.carregar(arquivo_modelo)
+        print(f"Modelo incremental carregado: {modelo.n_amostras} amostras vistas, classes {modelo.classes}")
+    else:
+        modelo = ModeloMLP(replay=replay, seed=0)
+        print("Criando modelo incremental novo")
+
+    X, y = preparar_dados(ler_csv(caminho))
+    inicio = time.perf_counter()
+    # uma chamada só: as linhas contam uma vez no normalizador e no replay,
+    # e as 'epocas' passadas ficam dentro de partial_fit
+    perda = modelo.partial_fit(X, y, epocas=epocas)
+    _, acuracia = modelo.avaliar(X, y)
+    print(f"\n{len(X)} amostras novas ({epocas} passadas) em {time.perf_counter() - inicio:.2f}s; "
+          f"perda {perda:.6f}, acurácia nelas {acuracia:.4f}, classes {modelo.classes}")
+
+    modelo.salvar(arquivo_modelo)
+    print(f"Modelo incremental salvo em {arquivo_modelo}")
+    if exportar:
+        modelo.exportar(exportar)
+        print(f"Modelo salvo em {exportar}")
+
+
+def imprimir_ensemble(resultado):
+    """Acurácia de teste de cada membro e do ensemble (média das saídas e voto)."""
+    print(f"\n{'membro':>6} {'acurácia':>9}")
+    for i, acuracia in enumerate(resultado["acuracia_membros"]):
+        print(f"{i:>6} {acuracia:>9.4f}")
+    print(f"\nMembros: {resultado['acuracia_membros_media']:.4f} ± {resultado['acuracia_membros_desvio']:.4f}")
+    print(f"Ensemble (média das saídas): {resultado['acuracia_media_saidas']:.4f}")
+    print(f"Ensemble (voto): {resultado['acuracia_voto']:.4f}")
+
+
+def imprimir_validacao_cruzada(resultado, mapa):
+    """Tabela por dobra + agregado (média ± desvio) e matriz de confusão somada."""
+    print(f"{'rep':>3} {'dobra':>5} {'treino':>6} {'teste':>5} {'erro treino':>12} {'erro teste':>11} "
+          f"{'acurácia':>9} {'tempo':>7}")
+    for d in resultado["dobras"]:
+        print(f"{d['repeticao']:>3} {d['dobra']:>5} {d['n_treino']:>6} {d['n_teste']:>5} {d['erro_treino']:>12.6f} "
+              f"{d['erro_teste']:>11.6f} {d['acuracia']:>9.4f} {d['tempo']:>6.2f}s")
+    print(f"\nAcurácia: {resultado['acuracia_media']:.4f} ± {resultado['acuracia_desvio']:.4f}  "
+          f"(erro de teste médio {resultado['erro_teste_medio']:.6f}, {resultado['tempo']:.2f}s)")
+    classes = [nome for nome, _ in sorted(mapa.items(), key=lambda item: item[1])]
+    print("\nMatriz de confusão (linhas = classe real):")
+    largura = max(len(c) for c in classes)
+    for nome, linha in zip(classes, resultado["matriz_confusao"]):
+        print(f"{nome:>{largura}} " + " ".join(f"{v:>6d}" for v in linha))
+
 
 if __name__ == "__main__":
-    caminho = "base_treinamento.csv"
+    parser = argparse.ArgumentParser(description="Treina a MLP a partir de um CSV.")
+    parser.add_argument("caminho", nargs="?", default="base_treinamento.csv")
+    parser.add_argument("--streaming", action="store_true",
+                        help="treina fora da memória, lendo o CSV em blocos a cada época")
+    parser.add_argument("--bloco", type=int, default=10000,
+                        help="linhas por bloco no modo --streaming")
+    parser.add_argument("--lote", type=int, default=32,
+                        help="amostras por mini-lote (1 = SGD por amostra, 0 = lote completo)")
+    parser.add_argument("--salvar", metavar="ARQUIVO",
+                        help="salva pesos, normalizador e mapa de classes (.npz)")
+    parser.add_argument("--float32", action="store_true",
+                        help="treina e prevê em float32 (metade da memória)")
+    parser.add_argument("--softmax", action="store_true",
+                        help="saída softmax com entropia cruzada (classes como índices inteiros, sem one-hot)")
+    parser.add_argument("--amostragem", default="sequencial",
+                        choices=["sequencial", "aleatoria", "estratificada", "balanceada"],
+                        help="ordem das amostras a cada época (padrão: a do arquivo)")
+    parser.add_argument("--camadas", default="auto",
+                        help="camadas ocultas, ex.: 16,8 ou 16:hiperbolica,8 (padrão: uma camada automática)")
+    parser.add_argument("--incremental", metavar="ARQUIVO",
+                        help="continua o modelo incremental em ARQUIVO (criado se não existir) com as linhas do CSV")
+    parser.add_argument("--epocas-incremental", type=int, default=50,
+                        help="passadas sobre as linhas novas com --incremental")
+    parser.add_argument("--replay", type=int, default=0,
+                        help="capacidade do buffer de replay de um modelo incremental novo (0 = sem replay)")
+    parser.add_argument("--ensemble", type=int, metavar="N",
+                        help="treina N redes com sementes diferentes de uma vez e compara membros x ensemble "
+                             "em 30%% das amostras separadas para teste (sem salvar)")
+    parser.add_argument("--cv", type=int, metavar="K",
+                        help="apenas avalia com validação cruzada estratificada em K dobras (sem salvar)")
+    parser.add_argument("--repeticoes", type=int, default=1,
+                        help="repetições do k-fold com embaralhamentos diferentes (com --cv)")
+    parser.add_argument("--processos", type=int,
+                        help="processos para as dobras do --cv (padrão: núcleos da máquina)")
+    args = parser.parse_args()
+    caminho = args.caminho
+    dtype = np.float32 if args.float32 else np.float64
+
+    if args.streaming:
+        pesos, ativacao_tipo, normalizador, mapa = treinar_fora_da_memoria(
+            caminho, args.bloco, args.lote, interpretar_camadas(args.camadas), dtype,
+            "softmax" if args.softmax else None,
+        )
+        if args.salvar:
+            salvar_modelo(args.salvar, pesos, ativacao_tipo, normalizador, mapa)
+        raise SystemExit(0)
+
+    if args.incremental:
+        atualizar_incremental(args.incremental, caminho, args.epocas_incremental, args.replay, args.salvar)
+        raise SystemExit(0)
+
     dados = ler_csv(caminho)
 
-    X, y = preparar_dados(dados)
-    X_norm = normalizar_dados(X)
-    y_encoded, mapa = codificar_classes(y)
-    input_dim, output_dim = detectar_dimensoes(X_norm, y_encoded)
+    X, y = preparar_dados(dados, dtype)
+    normalizador = Normalizador("minmax", dtype)
+    X_norm = normalizador.fit_transform(X)
+    saida = "softmax" if args.softmax else None
+    if saida:
+        y_encoded, mapa = codificar_indices(y)
+        input_dim, output_dim = len(X_norm[0]), len(mapa)
+    else:
+        y_encoded, mapa = codificar_classes(y)
+        input_dim, output_dim = detectar_dimensoes(X_norm, y_encoded)
 
     print(f"Dimensão de entrada: {input_dim}")
     print(f"Número de classes (saídas): {output_dim}")
     print(f"Mapa de classes: {mapa}")
 
-    hidden_dim = (input_dim + output_dim) // 2 or 1
-    print(f"Neurônios camada oculta: {hidden_dim}")
+    hidden_dim = interpretar_camadas(args.camadas) or (input_dim + output_dim) // 2 or 1
+    _, ativacao_tipo = especificacao_camadas(hidden_dim, "logistica", saida)
+    print(f"Neurônios camada(s) oculta(s): {hidden_dim}")
+
+    if args.cv:
+        print(f"\nValidação cruzada: {args.cv} dobras x {args.repeticoes} repetição(ões)... Aguarde...\n")
+        resultado = validacao_cruzada(
+            X, y_encoded, k=args.cv, repeticoes=args.repeticoes, n_hidden=hidden_dim, taxa=0.5, epocas=5000,
+            batch_size=args.lote, processos=args.processos, dtype=dtype, saida=saida,
+        )
+        imprimir_validacao_cruzada(resultado, mapa)
+        raise SystemExit(0)
+
+    if args.ensemble:
+        # separa o teste antes de normalizar: as estatísticas vêm só do treino
+        X_treino, X_teste, y_treino, y_teste = dividir_treino_teste(X, y_encoded)
+        normalizador_treino = Normalizador("minmax", dtype).fit(X_treino)
+        X_treino = normalizador_treino.transform(X_treino)
+        X_teste = normalizador_treino.transform(X_teste)
+        print(f"\nTreinando {args.ensemble} redes (sementes 0..{args.ensemble - 1}) de uma vez... Aguarde...\n")
+        pesos = treinar_ensemble(
+            X_treino, y_treino, n_in=input_dim, n_hidden=hidden_dim, n_out=output_dim, n_membros=args.ensemble,
+            taxa=0.5, epocas=5000, batch_size=args.lote, saida=saida, dtype=dtype,
+        )
+        imprimir_ensemble(avaliar_ensemble(X_teste, y_teste, pesos, ativacao_tipo))
+        raise SystemExit(0)
 
     print("\nTreinando a MLP... Aguarde...\n")
 
-    W1, B1, W2, B2 = treinar(
+    pesos = treinar(
         X_norm, 
         y_encoded,
         n_in=input_dim,
         n_hidden=hidden_dim,
         n_out=output_dim,
         taxa=0.5,
-        epocas=5000
+        epocas=5000,
+        batch_size=args.lote,
+        dtype=dtype,
+        saida=saida,
+        amostragem=args.amostragem
     )
 
+    if args.salvar:
+        salvar_modelo(args.salvar, pesos, ativacao_tipo, normalizador, mapa)
+        print(f"Modelo salvo em {args.salvar}")
+
     print("\nTestando a MLP com os dados de treinamento:\n")
-    for entrada in X_norm:
-        _, saida = forward_pass(entrada, W1, B1, W2, B2)
+    saidas = predict_proba(X_norm, pesos, ativacao_tipo)
+    for entrada, saida in zip(X_norm, saidas):
         print(entrada, "->", saida)
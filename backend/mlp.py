@@ -1,40 +1,246 @@
 """
 Contém a implementação da MLP (atualizado).
 
-- Funções de ativação: linear, logistica (sigmoid), hiperbolica (tanh)
+- Funções de ativação: linear, logistica (sigmoid), hiperbolica (tanh) e,
+  só na camada de saída, softmax (treinada com entropia cruzada estável via
+  log-sum-exp; os alvos podem ser um vetor compacto de índices de classe)
 - forward_pass e backpropagation parametrizados por ativação
-- treinar_epoca retorna erro médio da época
-- inicializar_pesos mantida
+- forward_pass/backpropagation operam sobre matrizes NumPy: aceitam uma
+  amostra (vetor) ou um mini-lote (matriz amostras x atributos)
+- treinar_epoca retorna erro médio da época (batch_size=1 reproduz o SGD
+  amostra a amostra)
+- treinar_streaming treina fora da memória, bloco a bloco
+- treinar pode variar a ordem das amostras a cada época (aleatória,
+  estratificada ou balanceada) via carregador.CarregadorLotes
+- predict/predict_proba avaliam uma matriz inteira em blocos; avaliar
+  devolve erro e acurácia de um conjunto (validação)
+- Otimizadores (SGD, momentum/Nesterov, RMSProp, Adam) com estado por
+  parâmetro e agendadores de taxa (degrau, exponencial, cosseno, warmup,
+  redução no platô)
+- Rede em camadas: qualquer número de camadas ocultas, cada uma com largura
+  e ativação próprias; pesos em tupla plana (W1, B1, ..., Wk, Bk) e
+  ativações/deltas/gradientes em buffers de EspacoTrabalho reutilizados
+  entre mini-lotes e épocas
+- dtype configurável (float64 padrão ou float32): pesos, buffers e dados
+  de treino/predição seguem o dtype dos pesos
+- Checkpoints periódicos (gravados em segundo plano) e retomada do treino
+  com retomar_treino
+- validacao_cruzada: k-fold estratificado (e repetido) com as dobras
+  treinadas em paralelo sobre o dataset em memória compartilhada
+- Perfilador/CallbackTreino: instrumentação opcional por fase (exporta
+  JSON e Chrome trace); custo ~zero quando desligada
+- inicializar_pesos mantida (agora devolve ndarrays)
 """
 
-import random
+import json
 import math
+import multiprocessing as mp
+import os
+import random
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import numpy as np
+
+from carregador import CarregadorLotes
+from checkpoint import criar_snapshot, carregar_checkpoint, restaurar_rng
+from compartilhado import criar_array_compartilhado, anexar_array, liberar
+from utils import Normalizador, dobras_estratificadas, matriz_confusao
+
+try:
+    import resource  # pico de memória (RSS); indisponível no Windows
+except ImportError:
+    resource = None
 
 # Inicializa pesos
-def inicializar_pesos(n_in, n_hidden, n_out):
+def inicializar_pesos(n_in, n_hidden, n_out, dtype=np.float64):
     # pesos entrada -> oculta (n_hidden x n_in)
-    W1 = [[random.uniform(-1, 1) for _ in range(n_in)] for _ in range(n_hidden)]
-    B1 = [random.uniform(-1, 1) for _ in range(n_hidden)]
+    W1 = np.array([[random.uniform(-1, 1) for _ in range(n_in)] for _ in range(n_hidden)], dtype=dtype)
+    B1 = np.array([random.uniform(-1, 1) for _ in range(n_hidden)], dtype=dtype)
 
     # pesos oculta -> saída (n_out x n_hidden)
-    W2 = [[random.uniform(-1, 1) for _ in range(n_hidden)] for _ in range(n_out)]
-    B2 = [random.uniform(-1, 1) for _ in range(n_out)]
+    W2 = np.array([[random.uniform(-1, 1) for _ in range(n_hidden)] for _ in range(n_out)], dtype=dtype)
+    B2 = np.array([random.uniform(-1, 1) for _ in range(n_out)], dtype=dtype)
 
     return W1, B1, W2, B2
 
+
+def inicializar_camadas(n_in, larguras, n_out, dtype=np.float64):
+    """
+    Pesos de uma rede com len(larguras) camadas ocultas.
+    retorna: tupla plana (W1, B1, ..., Wk, Bk), Wi de forma (saída x entrada).
+    Com uma camada oculta sorteia na mesma ordem de inicializar_pesos.
+    dtype: np.float64 ou np.float32 (treino e predição seguem este dtype)
+    """
+    dimensoes = [n_in] + list(larguras) + [n_out]
+    pesos = []
+    for entrada, saida in zip(dimensoes[:-1], dimensoes[1:]):
+        pesos.append(np.array([[random.uniform(-1, 1) for _ in range(entrada)] for _ in range(saida)], dtype=dtype))
+        pesos.append(np.array([random.uniform(-1, 1) for _ in range(saida)], dtype=dtype))
+    return tuple(pesos)
+
+
+def formas_camadas(n_in, larguras, n_out):
+    """Formas de (W1, B1, ..., Wk, Bk) sem sortear os pesos (mesma ordem de inicializar_camadas)."""
+    dimensoes = [n_in] + list(larguras) + [n_out]
+    formas = []
+    for entrada, saida in zip(dimensoes[:-1], dimensoes[1:]):
+        formas += [(saida, entrada), (saida,)]
+    return formas
+
+
+def interpretar_camadas(texto):
+    """
+    Converte '8,4' ou '16:hiperbolica,8' na especificação de camadas
+    ocultas ([8, 4] / [(16, 'hiperbolica'), 8]). Vazio ou 'auto' -> None.
+    """
+    texto = (texto or "").strip()
+    if not texto or texto.lower() == "auto":
+        return None
+    camadas = []
+    for parte in texto.split(","):
+        largura, _, ativacao = parte.strip().partition(":")
+        camadas.append((int(largura), ativacao.strip()) if ativacao.strip() else int(largura))
+    return camadas
+
+
+def especificacao_camadas(camadas, ativacao_tipo="logistica", saida=None):
+    """
+    camadas: int (uma camada oculta) ou lista de int / (largura, ativação)
+    ativacao_tipo: ativação padrão das ocultas sem ativação própria e da
+    camada de saída
+    saida: ativação da camada de saída, se diferente (ex.: 'softmax', que
+    treina com entropia cruzada)
+    retorna: (larguras, ativacoes) com len(ativacoes) == len(larguras) + 1;
+    ativacoes volta como str quando todas as camadas usam a mesma
+    """
+    if isinstance(camadas, (int, np.integer)):
+        camadas = [int(camadas)]
+    if not isinstance(ativacao_tipo, str):
+        # já é uma ativação por camada (ex.: configuração de um checkpoint)
+        larguras = [int(c[0]) if isinstance(c, (tuple, list)) else int(c) for c in camadas]
+        ativacoes = ativacoes_por_camada(ativacao_tipo, len(larguras) + 1)
+        if saida is not None:
+            ativacoes[-1] = saida
+        return larguras, ativacoes
+    larguras = []
+    ativacoes = []
+    for camada in camadas:
+        if isinstance(camada, (tuple, list)):
+            largura, ativacao = camada
+        else:
+            largura, ativacao = camada, ativacao_tipo
+        if int(largura) < 1:
+            raise ValueError(f"Largura de camada inválida: {largura}")
+        larguras.append(int(largura))
+        ativacoes.append(ativacao)
+    ativacoes.append(saida or ativacao_tipo)
+    if all(a == ativacao_tipo for a in ativacoes):
+        return larguras, ativacao_tipo
+    ativacoes_por_camada(ativacoes, len(ativacoes))  # valida (softmax só na saída)
+    return larguras, ativacoes
+
+
+def ativacoes_por_camada(ativacao_tipo, n_camadas):
+    """ativacao_tipo: str (todas as camadas) ou sequência com uma por camada."""
+    if isinstance(ativacao_tipo, str):
+        ativacoes = [ativacao_tipo] * n_camadas
+    else:
+        ativacoes = list(ativacao_tipo)
+    if len(ativacoes) != n_camadas:
+        raise ValueError(f"Esperadas {n_camadas} ativações, recebidas {len(ativacoes)}")
+    if "softmax" in ativacoes[:-1]:
+        raise ValueError("softmax só pode ser a ativação da camada de saída")
+    return ativacoes
+
+
+def alvos_treino(Y, dtype):
+    """
+    Alvos do treino: índices de classe inteiros (vetor) ficam compactos
+    (o one-hot é só implícito, dentro do kernel); one-hot/valores contínuos
+    vão para o dtype dos pesos.
+    """
+    Y = np.asarray(Y)
+    if Y.ndim == 1 and np.issubdtype(Y.dtype, np.integer):
+        return Y.astype(np.intp, copy=False)
+    return np.asarray(Y, dtype=dtype)
+
+
+def dimensao_saida(Y, n_classes=None):
+    """
+    Nº de neurônios de saída para os alvos Y: colunas do one-hot ou, com
+    índices de classe inteiros (m), n_classes (se informado) ou o maior índice + 1.
+    """
+    Y = np.asarray(Y)
+    if Y.ndim == 1 and np.issubdtype(Y.dtype, np.integer):
+        return int(n_classes) if n_classes else int(Y.max()) + 1
+    return Y.reshape(len(Y), -1).shape[1]
+
+
+def dtype_pesos(pesos):
+    """dtype de cálculo de uma tupla de pesos (float64 se não forem ndarrays)."""
+    return getattr(pesos[0], "dtype", np.dtype(np.float64))
+
+
 # -------------------------
 # Funções de ativação
 # -------------------------
+def _limite_exp(dtype):
+    """Maior |x| antes de exp(x) estourar no dtype (a sigmoid já saturou bem antes)."""
+    return 80.0 if dtype == np.float32 else 500.0
+
+
 def ativacao_val(x, tipo="logistica"):
-    """Recebe valor escalar x e tipo e retorna ativação."""
+    """Recebe x (escalar ou ndarray) e tipo e retorna ativação elemento a elemento."""
     if tipo == "linear":
         return x
     elif tipo == "hiperbolica":
         # tanh
-        return math.tanh(x)
+        return np.tanh(x)
+    elif tipo == "softmax":
+        # por linha; subtrair o máximo evita overflow em exp
+        e = np.exp(x - np.max(x, axis=-1, keepdims=True))
+        return e / e.sum(axis=-1, keepdims=True)
     else:
-        # logística / sigmoid
-        return 1.0 / (1.0 + math.exp(-x))
+        # logística / sigmoid (clip evita overflow em exp)
+        limite = _limite_exp(getattr(x, "dtype", None))
+        return 1.0 / (1.0 + np.exp(-np.clip(x, -limite, limite)))
+
+
+def _log_softmax(z):
+    """log(softmax(z)) por linha via log-sum-exp (sem log(0) nem overflow)."""
+    z = z - np.max(z, axis=-1, keepdims=True)
+    return z - np.log(np.exp(z).sum(axis=-1, keepdims=True))
+
+
+def _softmax_inplace(z, logits, lse):
+    """
+    softmax por linha sobrescrevendo z (m x n, ou N x m x n). Guarda em
+    logits os logits deslocados (z - máximo da linha) e em lse (m x 1) o
+    log da soma dos exponenciais, de onde sai log p = logits - lse para a
+    entropia cruzada.
+    """
+    np.max(z, axis=-1, keepdims=True, out=lse)
+    np.subtract(z, lse, out=logits)
+    np.exp(logits, out=z)
+    np.sum(z, axis=-1, keepdims=True, out=lse)
+    z /= lse
+    np.log(lse, out=lse)
+    return z
+
+
+def _ativar_inplace(z, tipo="logistica"):
+    """Mesmo cálculo de ativacao_val, sobrescrevendo z (sem alocar)."""
+    if tipo == "linear":
+        return z
+    if tipo == "hiperbolica":
+        return np.tanh(z, out=z)
+    limite = _limite_exp(z.dtype)
+    np.clip(z, -limite, limite, out=z)
+    np.negative(z, out=z)
+    np.exp(z, out=z)
+    np.add(z, 1.0, out=z)
+    return np.divide(1.0, z, out=z)
 
 
 def derivada_ativacao_por_saida(saida_ativada, tipo="logistica"):
@@ -43,7 +249,7 @@ def derivada_ativacao_por_saida(saida_ativada, tipo="logistica"):
     e retorna a derivada em relação a x.
     """
     if tipo == "linear":
-        return 1.0
+        return np.ones_like(saida_ativada)
     elif tipo == "hiperbolica":
         # d(tanh)/dx = 1 - tanh^2(x) -> usando saida_ativada
         return 1.0 - (saida_ativada ** 2)
@@ -57,117 +263,1012 @@ def derivada_ativacao_por_saida(saida_ativada, tipo="logistica"):
 # -------------------------
 def forward_pass(X, W1, B1, W2, B2, ativacao_tipo="logistica"):
     """
-    X: vetor de entrada (lista)
-    W1: list of lists (n_hidden x n_in)
-    B1: list biases hidden (n_hidden)
-    W2: list of lists (n_out x n_hidden)
-    B2: list biases out (n_out)
+    X: vetor de entrada (n_in) ou mini-lote (m x n_in)
+    W1: ndarray (n_hidden x n_in)
+    B1: ndarray biases hidden (n_hidden)
+    W2: ndarray (n_out x n_hidden)
+    B2: ndarray biases out (n_out)
     ativacao_tipo: 'linear' | 'logistica' | 'hiperbolica'
-    retorna: (hidden_ativada_list, output_ativada_list)
+    retorna: (hidden_ativada, output_ativada) com o mesmo número de
+    dimensões de X, no dtype dos pesos (como predict_proba)
     """
+    X = np.asarray(X, dtype=dtype_pesos((W1,)))
+
     # camada oculta
-    hidden_raw = []
-    hidden_activated = []
-    for j in range(len(W1)):
-        s = 0.0
-        for i in range(len(X)):
-            s += X[i] * W1[j][i]
-        s += B1[j]
-        hidden_raw.append(s)
-        hidden_activated.append(ativacao_val(s, ativacao_tipo))
+    hidden_activated = ativacao_val(X @ np.asarray(W1).T + B1, ativacao_tipo)
 
     # camada de saída
-    output_raw = []
-    output_activated = []
-    for k in range(len(W2)):
-        s = 0.0
-        for j in range(len(hidden_activated)):
-            s += hidden_activated[j] * W2[k][j]
-        s += B2[k]
-        output_raw.append(s)
-        output_activated.append(ativacao_val(s, ativacao_tipo))
+    output_activated = ativacao_val(hidden_activated @ np.asarray(W2).T + B2, ativacao_tipo)
 
     return hidden_activated, output_activated
 
 
+def forward_camadas(X, pesos, ativacao_tipo="logistica"):
+    """
+    Forward de uma rede de qualquer profundidade (aloca; para treino use
+    EspacoTrabalho). pesos: tupla plana (W1, B1, ..., Wk, Bk).
+    retorna: lista com as ativações de cada camada (a última é a saída)
+    """
+    ativacoes = ativacoes_por_camada(ativacao_tipo, len(pesos) // 2)
+    A = np.asarray(X, dtype=dtype_pesos(pesos))
+    saidas = []
+    for (W, B), tipo in zip(zip(pesos[0::2], pesos[1::2]), ativacoes):
+        A = ativacao_val(A @ np.asarray(W).T + B, tipo)
+        saidas.append(A)
+    return saidas
+
+
 # -------------------------
-# Backpropagation parametrizado
+# Predição em lote
 # -------------------------
-def backpropagation(X, y, hidden, output, W1, B1, W2, B2, taxa, ativacao_tipo="logistica"):
+def predict_proba(X, pesos, ativacao_tipo="logistica", chunk_size=65536):
+    """
+    X: matriz de entrada (m x n_in)
+    pesos: tupla plana (W1, B1, ..., Wk, Bk) com uma ou mais camadas ocultas
+    ativacao_tipo: str ou uma ativação por camada
+    chunk_size: nº máximo de linhas processadas por vez (limita memória)
+    retorna: ndarray (m x n_out) com as ativações da camada de saída
+    """
+    dtype = dtype_pesos(pesos)
+    X = np.atleast_2d(np.asarray(X, dtype=dtype))
+    m = X.shape[0]
+    if not chunk_size or chunk_size <= 0:
+        chunk_size = max(m, 1)
+
+    scores = np.empty((m, len(pesos[-1])), dtype=dtype)
+    for inicio in range(0, m, chunk_size):
+        scores[inicio:inicio + chunk_size] = forward_camadas(X[inicio:inicio + chunk_size], pesos, ativacao_tipo)[-1]
+    return scores
+
+
+def predict(X, pesos, ativacao_tipo="logistica", chunk_size=65536):
+    """Retorna o índice da classe com maior ativação para cada linha de X."""
+    return np.argmax(predict_proba(X, pesos, ativacao_tipo, chunk_size), axis=1)
+
+
+def avaliar(X, Y, pesos, ativacao_tipo="logistica", chunk_size=65536):
     """
-    X: vetor de entrada
-    y: vetor alvo (one-hot)
-    hidden: lista ativada da camada oculta
-    output: lista ativada da camada de saída
-    atualiza pesos in-place
-    retorna: mse (erro quadrático médio da amostra)
+    Erro e acurácia de um conjunto (ex.: validação) com um forward em lote.
+    Y: alvos one-hot (m x n_out) ou índices de classe inteiros (m)
+    retorna: (erro, acuracia), erro na mesma escala do erro de treino (mse,
+    ou entropia cruzada com saída softmax)
     """
+    ativacoes = ativacoes_por_camada(ativacao_tipo, len(pesos) // 2)
+    softmax = ativacoes[-1] == "softmax"
+    if softmax:
+        # logits da saída e log-softmax estável (a perda usa log p)
+        scores = _log_softmax(predict_proba(X, pesos, ativacoes[:-1] + ["linear"], chunk_size))
+    else:
+        scores = predict_proba(X, pesos, ativacao_tipo, chunk_size)
+    if len(scores) == 0:
+        return 0.0, 0.0
+    Y = alvos_treino(Y, scores.dtype)
+    linhas = np.arange(len(scores))
+    if Y.ndim == 1:
+        rotulos = Y
+        if softmax:
+            erro = -float(np.mean(scores[linhas, Y]))
+        else:
+            diferenca = -scores
+            diferenca[linhas, Y] += 1.0
+            erro = float(np.mean(diferenca ** 2))
+    else:
+        Y = Y.reshape(scores.shape)
+        rotulos = np.argmax(Y, axis=1)
+        erro = -float(np.sum(Y * scores) / len(Y)) if softmax else float(np.mean((Y - scores) ** 2))
+    acuracia = float(np.mean(np.argmax(scores, axis=1) == rotulos))
+    return erro, acuracia
+
+
+# -------------------------
+# Gradientes e backpropagation parametrizado
+# -------------------------
+def calcular_gradientes(X, y, hidden, output, W2, ativacao_tipo="logistica"):
+    """
+    Calcula os gradientes (média do mini-lote) de 0.5 * soma((y - output)^2)
+    em relação a W1, B1, W2, B2.
+    X, y, hidden, output: mini-lote (m x ...) ou uma única amostra (vetor)
+    retorna: (gW1, gB1, gW2, gB2, mse) onde mse é a média do erro quadrático
+    médio por amostra; os gradientes saem no dtype dos pesos (o de W2)
+    """
+    dtype = dtype_pesos((W2,))
+    X = np.atleast_2d(np.asarray(X, dtype=dtype))
+    y = np.atleast_2d(np.asarray(y, dtype=dtype))
+    hidden = np.atleast_2d(np.asarray(hidden, dtype=dtype))
+    output = np.atleast_2d(np.asarray(output, dtype=dtype))
+    m = X.shape[0]
+
     # erro na saída (y - output)
-    erro_saida = [y[k] - output[k] for k in range(len(y))]
+    erro_saida = y - output
 
     # delta na saída (usando derivada baseada na saída ativada)
-    delta_saida = [
-        erro_saida[k] * derivada_ativacao_por_saida(output[k], ativacao_tipo)
-        for k in range(len(output))
-    ]
-
-    # erro na camada oculta (retropropagar)
-    erro_oculta = []
-    for j in range(len(hidden)):
-        soma = 0.0
-        for k in range(len(delta_saida)):
-            soma += delta_saida[k] * W2[k][j]
-        erro_oculta.append(soma)
-
-    # delta na oculta
-    delta_oculta = [
-        erro_oculta[j] * derivada_ativacao_por_saida(hidden[j], ativacao_tipo)
-        for j in range(len(hidden))
-    ]
-
-    # atualizar W2 e B2
-    for k in range(len(W2)):
-        for j in range(len(W2[k])):
-            W2[k][j] += taxa * delta_saida[k] * hidden[j]
-        B2[k] += taxa * delta_saida[k]
-
-    # atualizar W1 e B1
-    for j in range(len(W1)):
-        for i in range(len(W1[j])):
-            W1[j][i] += taxa * delta_oculta[j] * X[i]
-        B1[j] += taxa * delta_oculta[j]
-
-    mse = sum(e ** 2 for e in erro_saida) / len(erro_saida)
+    delta_saida = erro_saida * derivada_ativacao_por_saida(output, ativacao_tipo)
+
+    # erro/delta na camada oculta (retropropagar)
+    delta_oculta = (delta_saida @ W2) * derivada_ativacao_por_saida(hidden, ativacao_tipo)
+
+    gW2 = -(delta_saida.T @ hidden) / m
+    gB2 = -delta_saida.sum(axis=0) / m
+    gW1 = -(delta_oculta.T @ X) / m
+    gB1 = -delta_oculta.sum(axis=0) / m
+
+    mse = float(np.mean(erro_saida ** 2))
+    return gW1, gB1, gW2, gB2, mse
+
+
+def backpropagation(X, y, hidden, output, W1, B1, W2, B2, taxa, ativacao_tipo="logistica"):
+    """
+    X: vetor de entrada ou mini-lote
+    y: vetor alvo (one-hot) ou mini-lote de alvos
+    hidden: ativações da camada oculta
+    output: ativações da camada de saída
+    atualiza pesos (ndarrays) in-place com a média dos gradientes do lote
+    retorna: mse (erro quadrático médio das amostras)
+    """
+    gW1, gB1, gW2, gB2, mse = calcular_gradientes(X, y, hidden, output, W2, ativacao_tipo)
+
+    # atualizar W2/B2 e W1/B1
+    W2 -= taxa * gW2
+    B2 -= taxa * gB2
+    W1 -= taxa * gW1
+    B1 -= taxa * gB1
+
     return mse
 
 
 # -------------------------
-# treinar_epoca: varre todas as amostras e chama backpropagation
+# Buffers de treino reutilizáveis (rede em camadas)
 # -------------------------
-def treinar_epoca(X_train, Y_train, W1, B1, W2, B2, taxa=0.1, ativacao_tipo="logistica"):
+class EspacoTrabalho:
     """
-    Executa UMA época de treino (varre todas as amostras),
-    atualiza pesos in-place e retorna o erro médio da época.
+    Ativações, deltas e gradientes de uma rede em camadas, alocados uma vez
+    para 'capacidade' linhas e reutilizados (mini-lotes menores usam as
+    primeiras linhas de cada buffer). Só realoca se chegar um lote maior.
+    Os pesos não ficam aqui: forward/backward os recebem a cada chamada.
+    Os buffers usam o dtype dos pesos.
+    Com saída 'softmax' a perda é a entropia cruzada (log-sum-exp guardado
+    no forward); nas demais, 0.5 * soma((Y - saída)^2).
+    Pesos empilhados de N redes iguais (W: N x saída x entrada, B: N x
+    saída — ver ensemble.inicializar_ensemble) ganham o mesmo eixo à frente
+    nos buffers: o mini-lote passa por todas com um matmul por camada e a
+    perda volta como vetor (uma por rede).
     """
-    erros = []
-    for X, y in zip(X_train, Y_train):
-        hidden, output = forward_pass(X, W1, B1, W2, B2, ativacao_tipo)
-        mse = backpropagation(X, y, hidden, output, W1, B1, W2, B2, taxa, ativacao_tipo)
-        erros.append(mse)
+
+    def __init__(self, pesos, ativacao_tipo="logistica", capacidade=1):
+        self.larguras = [np.shape(B)[-1] for B in pesos[1::2]]
+        # nº de redes empilhadas (None = uma rede, pesos sem eixo de membros)
+        self.n_membros = np.shape(pesos[1])[0] if np.ndim(pesos[1]) == 2 else None
+        # eixos para transpor as duas últimas dimensões (None = .T) e do
+        # lote/saída na perda (None = todos), com ou sem eixo de membros
+        self._eixos_t = None if self.n_membros is None else (0, 2, 1)
+        self._eixos_perda = None if self.n_membros is None else (1, 2)
+        self.ativacoes = ativacoes_por_camada(ativacao_tipo, len(self.larguras))
+        self.softmax = self.ativacoes[-1] == "softmax"
+        self.dtype = dtype_pesos(pesos)
+        # gradientes: mesmas formas dos pesos, independem do lote
+        self.grads = [np.empty(np.shape(p), dtype=self.dtype) for p in pesos]
+        self.capacidade = 0
+        self._reservar(max(1, capacidade))
+
+    def _reservar(self, capacidade):
+        self.capacidade = capacidade
+        membros = (self.n_membros,) if self.n_membros is not None else ()
+        self._A = [np.empty(membros + (capacidade, n), self.dtype) for n in self.larguras]    # ativações
+        self._D = [np.empty(membros + (capacidade, n), self.dtype) for n in self.larguras]    # deltas
+        self._T = [np.empty(membros + (capacidade, n), self.dtype) for n in self.larguras]    # derivadas / rascunho
+        self._lse = np.empty(membros + (capacidade, 1), self.dtype)  # log-sum-exp por linha (saída softmax)
+        self._linhas = np.arange(capacidade)  # índice das linhas, para os alvos em índices de classe
+        self._m = None
+
+    def _vistas(self, m):
+        """Views das m primeiras linhas; refeitas só quando o tamanho do lote muda."""
+        if m != self._m:
+            if m > self.capacidade:
+                self._reservar(m)
+            self._m = m
+            self._vA = [A[..., :m, :] for A in self._A]
+            self._vD = [D[..., :m, :] for D in self._D]
+            self._vT = [T[..., :m, :] for T in self._T]
+            self._vlse = self._lse[..., :m, :]
+        return self._vA, self._vD, self._vT
+
+    def forward(self, X, pesos):
+        """
+        X: mini-lote (m x n_in), o mesmo para todas as redes empilhadas.
+        Retorna a view da saída (m x n_out, ou N x m x n_out).
+        """
+        A, _, T = self._vistas(len(X))
+        A_ant = X
+        for l, tipo in enumerate(self.ativacoes):
+            Z = A[l]
+            np.matmul(A_ant, pesos[2 * l].transpose(self._eixos_t), out=Z)
+            B = pesos[2 * l + 1]
+            Z += B if self.n_membros is None else B[:, None, :]
+            if tipo == "softmax":
+                # T da saída guarda os logits deslocados para o backward
+                A_ant = _softmax_inplace(Z, T[l], self._vlse)
+            else:
+                A_ant = _ativar_inplace(Z, tipo)
+        return A_ant
+
+    def backward(self, X, Y, pesos):
+        """
+        Depois de forward(X): preenche self.grads com os gradientes (média do
+        lote) da perda e retorna a perda média do lote (mse, ou entropia
+        cruzada com saída softmax); com redes empilhadas, um vetor (N).
+        Y: alvos (m x n_out) ou índices de classe inteiros (m); com índices o
+        one-hot nunca é materializado.
+        """
+        m = len(X)
+        A, D, T = self._vistas(m)
+        ultima = len(self.larguras) - 1
+        saida, delta, rascunho = A[ultima], D[ultima], T[ultima]
+        indices = Y.ndim == 1
+        if indices:
+            linhas = self._linhas[:m]
+
+        # camada de saída: delta = (y - saída) * f'(saída); com softmax +
+        # entropia cruzada a derivada se cancela e delta = y - saída
+        if indices:
+            np.negative(saida, out=delta)
+            delta[..., linhas, Y] += 1.0
+        else:
+            np.subtract(Y, saida, out=delta)
+        if not self.softmax:
+            np.square(delta, out=rascunho)
+            perda = rascunho.mean(axis=self._eixos_perda)
+        elif indices:
+            # -log p_y = lse - logit_y (logits deslocados do forward)
+            perda = np.mean(self._vlse[..., 0] - rascunho[..., linhas, Y], axis=-1)
+        else:
+            # -soma(y * log p) = soma(y * (lse - logits))
+            np.subtract(self._vlse, rascunho, out=rascunho)
+            rascunho *= Y
+            perda = rascunho.sum(axis=self._eixos_perda) / m
+
+        for l in range(ultima, -1, -1):
+            # derivada a partir da saída ativada (linear = 1)
+            tipo = self.ativacoes[l]
+            if tipo == "hiperbolica":
+                np.square(A[l], out=T[l])
+                np.subtract(1.0, T[l], out=T[l])
+                D[l] *= T[l]
+            elif tipo not in ("linear", "softmax"):
+                np.subtract(1.0, A[l], out=T[l])
+                T[l] *= A[l]
+                D[l] *= T[l]
+
+            A_ant = X if l == 0 else A[l - 1]
+            gW, gB = self.grads[2 * l], self.grads[2 * l + 1]
+            np.matmul(D[l].transpose(self._eixos_t), A_ant, out=gW)
+            np.divide(gW, -m, out=gW)
+            np.sum(D[l], axis=-2, out=gB)
+            np.divide(gB, -m, out=gB)
+            if l > 0:
+                # retropropaga para a camada anterior
+                np.matmul(D[l], pesos[2 * l], out=D[l - 1])
+        return perda if self.n_membros is not None else float(perda)
+
+
+# -------------------------
+# Instrumentação (opcional)
+# -------------------------
+class Perfilador:
+    """
+    Acumula tempos por fase (forward, backward, atualizacao, plato,
+    sinais, ...) e métricas por época: tempo de parede, amostras/s e pico
+    de memória. Guarda também os eventos para exportar em Chrome trace.
+    """
+
+    def __init__(self, max_eventos=200000):
+        self.max_eventos = max_eventos
+        self.eventos = []  # (nome, inicio_s, duracao_s)
+        self.epocas = []   # métricas por época
+        self._fases_epoca = {}
+        self._inicio_epoca = None
+        self._origem = time.perf_counter()
+
+    def registrar(self, nome, inicio, fim=None):
+        """Registra a fase nome iniciada em inicio (time.perf_counter())."""
+        if fim is None:
+            fim = time.perf_counter()
+        duracao = fim - inicio
+        self._fases_epoca[nome] = self._fases_epoca.get(nome, 0.0) + duracao
+        if len(self.eventos) < self.max_eventos:
+            self.eventos.append((nome, inicio, duracao))
+
+    def iniciar_epoca(self):
+        self._fases_epoca = {}
+        self._inicio_epoca = time.perf_counter()
+
+    def finalizar_epoca(self, epoca, n_amostras, erro):
+        fim = time.perf_counter()
+        tempo = fim - self._inicio_epoca
+        if len(self.eventos) < self.max_eventos:
+            self.eventos.append(("epoca", self._inicio_epoca, tempo))
+        metricas = {
+            "epoca": epoca,
+            "erro": erro,
+            "tempo": tempo,
+            "amostras_por_segundo": n_amostras / tempo if tempo > 0 else 0.0,
+            "memoria_pico_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss if resource else None,
+            "fases": dict(self._fases_epoca),
+        }
+        self.epocas.append(metricas)
+        return metricas
+
+    def resumo(self):
+        """Soma dos tempos por fase em todas as épocas."""
+        total = {}
+        for metricas in self.epocas:
+            for nome, duracao in metricas["fases"].items():
+                total[nome] = total.get(nome, 0.0) + duracao
+        return total
+
+    def exportar_json(self, caminho):
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({"resumo": self.resumo(), "epocas": self.epocas}, f, indent=2)
+
+    def exportar_chrome_trace(self, caminho):
+        """Grava no formato trace-event (abre em chrome://tracing ou Perfetto)."""
+        pid = os.getpid()
+        tid = threading.get_ident()
+        eventos = [
+            {
+                "name": nome,
+                "cat": "mlp",
+                "ph": "X",
+                "ts": (inicio - self._origem) * 1e6,
+                "dur": duracao * 1e6,
+                "pid": pid,
+                "tid": tid,
+            }
+            for nome, inicio, duracao in self.eventos
+        ]
+        with open(caminho, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": eventos, "displayTimeUnit": "ms"}, f)
+
+
+class CallbackTreino:
+    """
+    Base para callbacks de treino; sobrescreva só o que precisar.
+    metricas é o dict de Perfilador.finalizar_epoca (ou apenas
+    {'epoca', 'erro'} quando a instrumentação está desligada).
+    """
+
+    def inicio_epoca(self, epoca):
+        pass
+
+    def fim_epoca(self, epoca, metricas):
+        pass
+
+    def fim_treino(self, pesos):
+        pass
+
+
+# -------------------------
+# Otimizadores
+# -------------------------
+class Otimizador:
+    """
+    Base dos otimizadores. passo(params, grads) atualiza cada ndarray de
+    params in-place a partir do gradiente correspondente; o estado (ex.:
+    velocidades, momentos) é alocado na primeira chamada, um por parâmetro.
+    """
+
+    def __init__(self, taxa=0.1):
+        self.taxa = taxa
+
+    def passo(self, params, grads):
+        raise NotImplementedError
+
+
+class SGD(Otimizador):
+    def passo(self, params, grads):
+        for p, g in zip(params, grads):
+            p -= self.taxa * g
+
+
+class Momentum(Otimizador):
+    """SGD com momento clássico ou de Nesterov (nesterov=True)."""
+
+    def __init__(self, taxa=0.1, momento=0.9, nesterov=False):
+        super().__init__(taxa)
+        self.momento = momento
+        self.nesterov = nesterov
+        self.velocidades = None
+
+    def passo(self, params, grads):
+        if self.velocidades is None:
+            self.velocidades = [np.zeros_like(p) for p in params]
+        for p, g, v in zip(params, grads, self.velocidades):
+            v *= self.momento
+            v -= self.taxa * g
+            if self.nesterov:
+                p += self.momento * v - self.taxa * g
+            else:
+                p += v
+
+
+class RMSProp(Otimizador):
+    def __init__(self, taxa=0.001, rho=0.9, eps=1e-8):
+        super().__init__(taxa)
+        self.rho = rho
+        self.eps = eps
+        self.medias_quadrado = None
+
+    def passo(self, params, grads):
+        if self.medias_quadrado is None:
+            self.medias_quadrado = [np.zeros_like(p) for p in params]
+        for p, g, s in zip(params, grads, self.medias_quadrado):
+            s *= self.rho
+            s += (1.0 - self.rho) * g * g
+            p -= self.taxa * g / (np.sqrt(s) + self.eps)
+
+
+class Adam(Otimizador):
+    def __init__(self, taxa=0.001, beta1=0.9, beta2=0.999, eps=1e-8):
+        super().__init__(taxa)
+        self.beta1 = beta1
+        self.beta2 = beta2
+        self.eps = eps
+        self.t = 0
+        self.m = None
+        self.v = None
+
+    def passo(self, params, grads):
+        if self.m is None:
+            self.m = [np.zeros_like(p) for p in params]
+            self.v = [np.zeros_like(p) for p in params]
+        self.t += 1
+        # correção de viés embutida na taxa do passo
+        taxa_t = self.taxa * math.sqrt(1.0 - self.beta2 ** self.t) / (1.0 - self.beta1 ** self.t)
+        for p, g, m, v in zip(params, grads, self.m, self.v):
+            m *= self.beta1
+            m += (1.0 - self.beta1) * g
+            v *= self.beta2
+            v += (1.0 - self.beta2) * g * g
+            p -= taxa_t * m / (np.sqrt(v) + self.eps)
+
+
+OTIMIZADORES = {
+    "sgd": lambda taxa: SGD(taxa),
+    "momentum": lambda taxa: Momentum(taxa),
+    "nesterov": lambda taxa: Momentum(taxa, nesterov=True),
+    "rmsprop": lambda taxa: RMSProp(taxa),
+    "adam": lambda taxa: Adam(taxa),
+}
+
+
+def criar_otimizador(nome, taxa):
+    """nome: 'sgd' | 'momentum' | 'nesterov' | 'rmsprop' | 'adam'"""
+    try:
+        return OTIMIZADORES[nome](taxa)
+    except KeyError:
+        raise ValueError(f"Otimizador desconhecido: {nome}") from None
+
+
+# -------------------------
+# Agendadores de taxa de aprendizado
+# -------------------------
+class Agendador:
+    """
+    Base dos agendadores. ajustar(otimizador, epoca, erro_anterior) é
+    chamado no início de cada época (epoca a partir de 0; erro_anterior é
+    None na primeira) e grava a nova taxa em otimizador.taxa. A taxa base é
+    a do otimizador na primeira chamada.
+    """
+
+    def __init__(self):
+        self.taxa_base = None
+
+    def ajustar(self, otimizador, epoca, erro_anterior=None):
+        if self.taxa_base is None:
+            self.taxa_base = otimizador.taxa
+        otimizador.taxa = self.taxa(epoca, erro_anterior)
+        return otimizador.taxa
+
+    def taxa(self, epoca, erro_anterior):
+        raise NotImplementedError
+
+    def escalar(self, fator):
+        """Multiplica a taxa base (ex.: redução manual de 10% no platô)."""
+        if self.taxa_base is not None:
+            self.taxa_base *= fator
+
+
+class AgendadorDegrau(Agendador):
+    """Multiplica a taxa por fator a cada 'a_cada' épocas."""
+
+    def __init__(self, a_cada=1000, fator=0.5):
+        super().__init__()
+        self.a_cada = a_cada
+        self.fator = fator
+
+    def taxa(self, epoca, erro_anterior):
+        return self.taxa_base * self.fator ** (epoca // self.a_cada)
+
+
+class AgendadorExponencial(Agendador):
+    def __init__(self, gamma=0.999):
+        super().__init__()
+        self.gamma = gamma
+
+    def taxa(self, epoca, erro_anterior):
+        return self.taxa_base * self.gamma ** epoca
+
+
+class AgendadorCosseno(Agendador):
+    """Decaimento em cosseno de taxa_base até taxa_min ao longo de 'epocas'."""
+
+    def __init__(self, epocas=1000, taxa_min=0.0):
+        super().__init__()
+        self.epocas = max(1, epocas)
+        self.taxa_min = taxa_min
+
+    def taxa(self, epoca, erro_anterior):
+        progresso = min(epoca, self.epocas) / self.epocas
+        return self.taxa_min + 0.5 * (self.taxa_base - self.taxa_min) * (1.0 + float(np.cos(np.pi * progresso)))
+
+
+class AgendadorWarmup(Agendador):
+    """Rampa linear nas primeiras épocas; depois delega para 'seguinte' (ou mantém a base)."""
+
+    def __init__(self, epocas_warmup=10, seguinte=None):
+        super().__init__()
+        self.epocas_warmup = max(1, epocas_warmup)
+        self.seguinte = seguinte
+
+    def taxa(self, epoca, erro_anterior):
+        if epoca < self.epocas_warmup:
+            return self.taxa_base * (epoca + 1) / self.epocas_warmup
+        if self.seguinte is None:
+            return self.taxa_base
+        if self.seguinte.taxa_base is None:
+            self.seguinte.taxa_base = self.taxa_base
+        return self.seguinte.taxa(epoca - self.epocas_warmup, erro_anterior)
+
+    def escalar(self, fator):
+        super().escalar(fator)
+        if self.seguinte is not None:
+            self.seguinte.escalar(fator)
+
+
+class ReducaoNoPlato(Agendador):
+    """Multiplica a taxa por fator quando o erro não melhora por 'paciencia' épocas."""
+
+    def __init__(self, fator=0.5, paciencia=20, limiar=1e-4, taxa_min=1e-6):
+        super().__init__()
+        self.fator = fator
+        self.paciencia = paciencia
+        self.limiar = limiar
+        self.taxa_min = taxa_min
+        self.taxa_atual = None
+        self.melhor = float("inf")
+        self.sem_melhora = 0
+
+    def taxa(self, epoca, erro_anterior):
+        if self.taxa_atual is None:
+            self.taxa_atual = self.taxa_base
+        if erro_anterior is not None:
+            if erro_anterior < self.melhor * (1.0 - self.limiar):
+                self.melhor = erro_anterior
+                self.sem_melhora = 0
+            else:
+                self.sem_melhora += 1
+                if self.sem_melhora >= self.paciencia:
+                    self.taxa_atual = max(self.taxa_atual * self.fator, self.taxa_min)
+                    self.sem_melhora = 0
+        return self.taxa_atual
+
+    def escalar(self, fator):
+        super().escalar(fator)
+        if self.taxa_atual is not None:
+            self.taxa_atual *= fator
+
+
+def criar_agendador(nome, epocas=1000):
+    """
+    nome: None/'constante' | 'degrau' | 'exponencial' | 'cosseno' |
+    'warmup' (warmup + cosseno) | 'plato'
+    epocas: total de épocas previsto (define as escalas padrão)
+    """
+    if nome in (None, "constante"):
+        return None
+    if nome == "degrau":
+        return AgendadorDegrau(a_cada=max(1, epocas // 4), fator=0.5)
+    if nome == "exponencial":
+        return AgendadorExponencial(gamma=0.01 ** (1.0 / max(1, epocas)))
+    if nome == "cosseno":
+        return AgendadorCosseno(epocas=epocas)
+    if nome == "warmup":
+        aquecimento = max(1, epocas // 20)
+        return AgendadorWarmup(aquecimento, AgendadorCosseno(epocas=epocas - aquecimento))
+    if nome == "plato":
+        return ReducaoNoPlato()
+    raise ValueError(f"Agendador desconhecido: {nome}")
+
+
+# -------------------------
+# treinar_epoca: varre todas as amostras em mini-lotes
+# -------------------------
+def treinar_epoca(X_train, Y_train, W1, B1, W2, B2, taxa=0.1, ativacao_tipo="logistica", batch_size=1, perfil=None,
+                  otimizador=None, lotes=None):
+    """
+    Executa UMA época de treino (varre todas as amostras em mini-lotes de
+    batch_size; None = lote completo), atualiza pesos in-place e retorna o
+    erro médio da época. batch_size=1 equivale ao SGD amostra a amostra.
+    perfil: Perfilador opcional que recebe os tempos de forward, backward
+    e atualizacao de cada mini-lote.
+    otimizador: Otimizador opcional; quando informado, substitui o SGD
+    simples e 'taxa' é ignorada (vale otimizador.taxa).
+    lotes: iterável de mini-lotes (ver treinar_epoca_camadas)
+    """
+    return treinar_epoca_camadas(X_train, Y_train, (W1, B1, W2, B2), taxa, ativacao_tipo, batch_size, perfil,
+                                 otimizador, lotes=lotes)
+
+
+def treinar_epoca_camadas(X_train, Y_train, pesos, taxa=0.1, ativacao_tipo="logistica", batch_size=1, perfil=None,
+                          otimizador=None, espaco=None, lotes=None):
+    """
+    treinar_epoca para uma rede de qualquer profundidade.
+    pesos: tupla plana (W1, B1, ..., Wk, Bk), atualizada in-place
+    ativacao_tipo: str ou uma ativação por camada
+    espaco: EspacoTrabalho a reutilizar entre épocas (criado se None); com
+    ele o laço não aloca nada por mini-lote no SGD simples
+    Os dados são convertidos (uma vez) para o dtype dos pesos; Y_train pode
+    ser one-hot (m x n_out) ou índices de classe inteiros (m).
+    lotes: iterável de mini-lotes (Xb, Yb) que substitui o fatiamento de
+    X_train/Y_train na ordem do arquivo (ex.: carregador.CarregadorLotes
+    para embaralhar/estratificar sem copiar o dataset)
+    Retorna a perda média da época (mse, ou entropia cruzada com saída
+    softmax); com pesos empilhados (ver EspacoTrabalho), uma por rede.
+    """
+    dtype = dtype_pesos(pesos)
+    X_train = np.asarray(X_train, dtype=dtype)
+    Y_train = alvos_treino(Y_train, dtype)
+    n = len(X_train)
+    if n == 0:
+        return 0.0
+    if not batch_size or batch_size > n:
+        batch_size = n
+    if espaco is None:
+        espaco = EspacoTrabalho(pesos, ativacao_tipo, batch_size)
+
+    converter = lotes is not None
+    if lotes is None:
+        lotes = ((X_train[i:i + batch_size], Y_train[i:i + batch_size]) for i in range(0, n, batch_size))
+
+    relogio = time.perf_counter
+    soma_erros = 0.0
+    vistos = 0
+    for Xb, Yb in lotes:
+        if converter:
+            Xb = np.asarray(Xb, dtype=dtype)  # sem cópia quando já está no dtype dos pesos
+            Yb = alvos_treino(Yb, dtype)
+
+        t0 = relogio() if perfil is not None else 0.0
+        espaco.forward(Xb, pesos)
+        t1 = relogio() if perfil is not None else 0.0
+        perda = espaco.backward(Xb, Yb, pesos)
+        t2 = relogio() if perfil is not None else 0.0
+        if otimizador is None:
+            for p, g in zip(pesos, espaco.grads):
+                g *= taxa
+                p -= g
+        else:
+            otimizador.passo(pesos, espaco.grads)
+
+        if perfil is not None:
+            t3 = relogio()
+            perfil.registrar("forward", t0, t1)
+            perfil.registrar("backward", t1, t2)
+            perfil.registrar("atualizacao", t2, t3)
+        soma_erros += perda * len(Xb)
+        vistos += len(Xb)
 
     # retornar erro médio da época
-    if len(erros) == 0:
+    return soma_erros / max(vistos, 1)
+
+
+# -------------------------
+# Treino fora da memória (out-of-core)
+# -------------------------
+def treinar_epoca_blocos(blocos, pesos, taxa=0.1, ativacao_tipo="logistica", batch_size=1, espaco=None):
+    """
+    Executa UMA época consumindo um iterável de blocos (X_bloco, Y_bloco),
+    por exemplo utils.blocos_normalizados. Retorna o erro médio da época.
+    pesos: tupla plana (W1, B1, ..., Wk, Bk), atualizada in-place
+    espaco: EspacoTrabalho reaproveitado entre blocos e épocas (criado se None)
+    """
+    if espaco is None:
+        espaco = EspacoTrabalho(pesos, ativacao_tipo, batch_size or 1)
+    soma_erros = 0.0
+    n = 0
+    for X_bloco, Y_bloco in blocos:
+        erro_bloco = treinar_epoca_camadas(X_bloco, Y_bloco, pesos, taxa, ativacao_tipo, batch_size, espaco=espaco)
+        soma_erros += erro_bloco * len(X_bloco)
+        n += len(X_bloco)
+
+    if n == 0:
         return 0.0
-    return sum(erros) / len(erros)
+    return soma_erros / n
+
+
+def treinar_streaming(fonte_blocos, n_in, n_hidden, n_out, taxa=0.1, epocas=100, ativacao_tipo="logistica", batch_size=1,
+                      dtype=np.float64, saida=None):
+    """
+    fonte_blocos: função sem argumentos que devolve um novo iterável de
+    blocos (X_bloco, Y_bloco) a cada chamada; é chamada uma vez por época,
+    de modo que o arquivo é relido em streaming sem ficar em memória.
+    n_hidden, dtype e saida como em treinar (camadas ocultas, precisão e
+    ativação da saída; com 'softmax' os blocos podem trazer índices de classe).
+    Retorna a tupla plana de pesos.
+    """
+    larguras, ativacao_tipo = especificacao_camadas(n_hidden, ativacao_tipo, saida)
+    pesos = inicializar_camadas(n_in, larguras, n_out, dtype)
+    espaco = EspacoTrabalho(pesos, ativacao_tipo, batch_size or 1)
+    for epoca in range(epocas):
+        erro_medio = treinar_epoca_blocos(fonte_blocos(), pesos, taxa, ativacao_tipo, batch_size, espaco)
+        if epoca % 500 == 0:
+            print(f"Época {epoca}, Erro médio = {erro_medio:.6f}")
+    return pesos
 
 
 # -------------------------
 # Função utilitária de treino (legacy, não usada pela thread)
 # -------------------------
-def treinar(X_train, Y_train, n_in, n_hidden, n_out, taxa=0.1, epocas=5000, ativacao_tipo="logistica"):
-    W1, B1, W2, B2 = inicializar_pesos(n_in, n_hidden, n_out)
-    for epoca in range(epocas):
-        erro_medio = treinar_epoca(X_train, Y_train, W1, B1, W2, B2, taxa, ativacao_tipo)
+def treinar(X_train, Y_train, n_in, n_hidden, n_out, taxa=0.1, epocas=5000, ativacao_tipo="logistica", batch_size=1,
+            perfil=None, callbacks=(), otimizador=None, agendador=None,
+            gravador=None, checkpoint_cada=100, estado_inicial=None, dtype=np.float64, saida=None,
+            amostragem="sequencial", prefetch=False, seed=None, X_val=None, Y_val=None):
+    """
+    Treina do zero por 'epocas' épocas.
+    n_hidden: int (uma camada oculta) ou lista de camadas, cada uma int ou
+    (largura, ativação) — ver especificacao_camadas. Retorna a tupla plana
+    de pesos (W1, B1, W2, B2 com uma camada oculta).
+    otimizador: Otimizador ou nome ('sgd', 'momentum', 'nesterov',
+    'rmsprop', 'adam'); None = SGD simples com 'taxa'.
+    agendador: Agendador ou nome (ver criar_agendador); exige otimizador
+    (se ausente, usa SGD com 'taxa').
+    gravador: checkpoint.GravadorCheckpoints opcional; recebe um snapshot a
+    cada checkpoint_cada épocas e ao final.
+    estado_inicial: dict de carregar_checkpoint para continuar de onde
+    parou (ver retomar_treino); nesse caso 'epocas' são adicionais.
+    dtype: np.float64 ou np.float32 (metade da memória; ignorado ao retomar,
+    que mantém o dtype dos pesos salvos)
+    saida: ativação da camada de saída, se diferente de ativacao_tipo; com
+    'softmax' a perda é a entropia cruzada e Y_train pode ser só o vetor de
+    índices de classe (inteiros)
+    amostragem: ordem das amostras a cada época ('sequencial', 'aleatoria',
+    'estratificada', 'balanceada' — ver carregador.CarregadorLotes);
+    prefetch reúne o próximo mini-lote em segundo plano (desligado por padrão)
+    seed: semente das ordens de amostragem; None = sorteada do random
+    global (reprodutível com random.seed, como os pesos iniciais). Ao
+    retomar, o estado salvo no checkpoint tem precedência
+    X_val/Y_val: validação opcional, avaliada a cada snapshot; com ela o
+    melhor checkpoint (melhor.ckpt) é o de menor erro de validação, e não
+    o de menor erro de treino
+    """
+    epoca_inicial = 0
+    erros = []
+    larguras, ativacao_tipo = especificacao_camadas(n_hidden, ativacao_tipo, saida)
+    if estado_inicial is not None:
+        pesos = tuple(np.array(p, copy=True) for p in estado_inicial["pesos"])
+        otimizador = estado_inicial["otimizador"]
+        agendador = estado_inicial["agendador"]
+        epoca_inicial = estado_inicial["epoca"]
+        erros = list(estado_inicial["erros"])
+    else:
+        pesos = inicializar_camadas(n_in, larguras, n_out, dtype)
+    X_train = np.asarray(X_train, dtype=dtype_pesos(pesos))
+    Y_train = alvos_treino(Y_train, dtype_pesos(pesos))
+    if isinstance(otimizador, str):
+        otimizador = criar_otimizador(otimizador, taxa)
+    if isinstance(agendador, str):
+        agendador = criar_agendador(agendador, epocas)
+    if agendador is not None and otimizador is None:
+        otimizador = SGD(taxa)
+
+    espaco = EspacoTrabalho(pesos, ativacao_tipo, batch_size or len(X_train))
+    lotes = None
+    if amostragem != "sequencial":
+        if seed is None:
+            seed = random.getrandbits(64)
+        lotes = CarregadorLotes(X_train, Y_train, batch_size, amostragem, prefetch, seed)
+    # tudo o que retomar_treino precisa para continuar igual (a ordem das
+    # épocas depende de amostragem; o estado do gerador vai em 'rng')
+    config = {"ativacao_tipo": ativacao_tipo, "taxa": taxa, "batch_size": batch_size, "n_hidden": n_hidden,
+              "saida": saida, "amostragem": amostragem, "seed": seed}
+
+    def snapshot(epoca, erro):
+        # com validação, o melhor checkpoint é o de menor erro de validação
+        metrica = avaliar(X_val, Y_val, pesos, ativacao_tipo)[0] if X_val is not None else erro
+        return criar_snapshot(epoca, pesos, otimizador, agendador, erros, config=config, metrica=metrica,
+                              carregador=lotes)
+
+    if estado_inicial is not None:
+        restaurar_rng(estado_inicial["rng"], lotes)
+    erro_medio = erros[-1] if erros else None
+    for epoca in range(epoca_inicial, epoca_inicial + epocas):
+        if agendador is not None:
+            agendador.ajustar(otimizador, epoca, erro_medio)
+        for callback in callbacks:
+            callback.inicio_epoca(epoca)
+        if perfil is not None:
+            perfil.iniciar_epoca()
+
+        erro_medio = treinar_epoca_camadas(X_train, Y_train, pesos, taxa, ativacao_tipo, batch_size, perfil,
+                                           otimizador, espaco, lotes)
+        if gravador is not None:
+            erros.append(erro_medio)
+
+        if perfil is not None:
+            metricas = perfil.finalizar_epoca(epoca, len(X_train), erro_medio)
+        else:
+            metricas = {"epoca": epoca, "erro": erro_medio}
+        for callback in callbacks:
+            callback.fim_epoca(epoca, metricas)
+
+        if gravador is not None and (epoca + 1) % checkpoint_cada == 0:
+            gravador.submeter(snapshot(epoca + 1, erro_medio))
+
         if epoca % 500 == 0:
             print(f"Época {epoca}, Erro médio = {erro_medio:.6f}")
-    return W1, B1, W2, B2
\ No newline at end of file
+
+    if gravador is not None and epocas > 0:
+        gravador.submeter(snapshot(epoca_inicial + epocas, erro_medio))
+
+    for callback in callbacks:
+        callback.fim_treino(pesos)
+    return pesos
+
+
+def retomar_treino(caminho_checkpoint, X_train, Y_train, epocas=1000, **kwargs):
+    """
+    Continua um treino a partir de um checkpoint: restaura pesos, estado do
+    otimizador/agendador, contador de épocas, histórico de erros e RNG, e
+    treina mais 'epocas' épocas. kwargs vão para treinar (ex.: gravador).
+    A ativação, a taxa, o lote e a amostragem vêm do checkpoint, salvo se
+    informados; o RNG (inclusive o do carregador) é restaurado por treinar
+    (estado_inicial), então a retomada segue as mesmas ordens de épocas.
+    """
+    estado = carregar_checkpoint(caminho_checkpoint)
+    pesos = estado["pesos"]
+    for chave, valor in estado["config"].items():
+        kwargs.setdefault(chave, valor)
+    kwargs.setdefault("n_hidden", [len(B) for B in pesos[1:-2:2]])
+    return treinar(X_train, Y_train, pesos[0].shape[1], n_out=len(pesos[-1]), epocas=epocas,
+                   estado_inicial=estado, **kwargs)
+
+
+# -------------------------
+# Validação cruzada k-fold (dobras treinadas em paralelo)
+# -------------------------
+# dataset anexado em cada worker (preenchido por _iniciar_worker_cv)
+_DADOS_CV = {}
+_BLOCOS_CV = []
+
+
+def _iniciar_worker_cv(descritores):
+    for nome, descritor in descritores.items():
+        shm, array = anexar_array(descritor)
+        _BLOCOS_CV.append(shm)
+        _DADOS_CV[nome] = array
+
+
+def _treinar_dobra(repeticao, dobra, idx_treino, idx_teste, config, seed):
+    """Treina uma dobra (normalizador ajustado só no treino dela) e avalia no teste."""
+    inicio = time.perf_counter()
+    X, Y = _DADOS_CV["X"], _DADOS_CV["Y"]
+    dtype = np.dtype(config["dtype"])
+
+    normalizador = Normalizador(config["normalizar"], dtype).fit(X[idx_treino])
+    X_treino = normalizador.transform(X[idx_treino])
+    X_teste = normalizador.transform(X[idx_teste])
+    Y_treino = alvos_treino(Y[idx_treino], dtype)
+    Y_teste = alvos_treino(Y[idx_teste], dtype)
+    n_out = config["n_out"]
+
+    random.seed(seed)
+    larguras, ativacao_tipo = especificacao_camadas(config["n_hidden"], config["ativacao_tipo"], config["saida"])
+    pesos = inicializar_camadas(X.shape[1], larguras, n_out, dtype)
+    otimizador = criar_otimizador(config["otimizador"], config["taxa"]) if config["otimizador"] else None
+    espaco = EspacoTrabalho(pesos, ativacao_tipo, config["batch_size"] or len(X_treino))
+
+    erro = float("nan")
+    for _ in range(config["epocas"]):
+        erro = treinar_epoca_camadas(X_treino, Y_treino, pesos, config["taxa"], ativacao_tipo,
+                                     config["batch_size"], None, otimizador, espaco)
+        if not math.isfinite(erro):
+            break
+
+    erro_teste, acuracia = avaliar(X_teste, Y_teste, pesos, ativacao_tipo)
+    previsoes = predict(X_teste, pesos, ativacao_tipo)
+    return {
+        "repeticao": repeticao,
+        "dobra": dobra,
+        "n_treino": len(idx_treino),
+        "n_teste": len(idx_teste),
+        "erro_treino": erro,
+        "erro_teste": erro_teste,
+        "acuracia": acuracia,
+        "matriz_confusao": matriz_confusao(Y_teste if Y_teste.ndim == 1 else np.argmax(Y_teste, axis=1), previsoes,
+                                           n_out),
+        "tempo": time.perf_counter() - inicio,
+    }
+
+
+def validacao_cruzada(X, Y, k=5, repeticoes=1, n_hidden=None, taxa=0.1, epocas=1000, ativacao_tipo="logistica",
+                      batch_size=16, otimizador=None, normalizar="minmax", processos=None, seed=0,
+                      dtype=np.float64, metodo_inicio=None, ao_concluir=None, saida=None):
+    """
+    k-fold estratificado (repetido 'repeticoes' vezes) com as dobras
+    treinadas ao mesmo tempo em um pool de processos.
+    X: atributos brutos (cada dobra ajusta o próprio Normalizador só no
+    treino); Y: alvos one-hot ou índices de classe inteiros. X e Y vão uma única vez para memória
+    compartilhada; cada tarefa recebe só os índices da dobra.
+    n_hidden: especificação de camadas (None = (n_in + n_out) // 2)
+    processos: nº de processos (None = núcleos; 1 = no próprio processo)
+    metodo_inicio: 'spawn' quando chamado de uma thread (ex.: QThread)
+    ao_concluir: função opcional chamada com o dict de cada dobra concluída
+    saida: ativação da camada de saída (ex.: 'softmax'), ver treinar
+    retorna: dict com 'dobras' (métricas por dobra), 'acuracia_media',
+    'acuracia_desvio', 'erro_teste_medio', 'matriz_confusao' (soma das
+    dobras) e 'tempo'
+    """
+    X = np.asarray(X, dtype=float)
+    Y = alvos_treino(Y, np.float64)
+    n_out = dimensao_saida(Y)
+    if n_hidden is None:
+        n_hidden = max(1, (X.shape[1] + n_out) // 2)
+    config = {
+        "n_hidden": n_hidden, "taxa": taxa, "epocas": epocas, "ativacao_tipo": ativacao_tipo,
+        "batch_size": batch_size, "otimizador": otimizador, "normalizar": normalizar,
+        "dtype": np.dtype(dtype).name, "saida": saida, "n_out": n_out,
+    }
+    divisoes = dobras_estratificadas(Y, k, repeticoes, seed)
+    tarefas = [(r, d, treino, teste, config, seed + i) for i, (r, d, treino, teste) in enumerate(divisoes)]
+
+    inicio = time.perf_counter()
+    dobras = []
+    if processos == 1:
+        _DADOS_CV.update(X=X, Y=Y)
+        try:
+            for tarefa in tarefas:
+                dobras.append(_treinar_dobra(*tarefa))
+                if ao_concluir is not None:
+                    ao_concluir(dobras[-1])
+        finally:
+            _DADOS_CV.clear()
+    else:
+        blocos = []
+        descritores = {}
+        try:
+            for nome, array in (("X", X), ("Y", Y)):
+                shm, descritor, _ = criar_array_compartilhado(array)
+                blocos.append(shm)
+                descritores[nome] = descritor
+
+            contexto = mp.get_context(metodo_inicio) if metodo_inicio else None
+            with ProcessPoolExecutor(max_workers=min(processos or os.cpu_count(), len(tarefas)),
+                                     mp_context=contexto, initializer=_iniciar_worker_cv,
+                                     initargs=(descritores,)) as pool:
+                futuros = [pool.submit(_treinar_dobra, *tarefa) for tarefa in tarefas]
+                for futuro in as_completed(futuros):
+                    dobras.append(futuro.result())
+                    if ao_concluir is not None:
+                        ao_concluir(dobras[-1])
+        finally:
+            liberar(blocos)
+
+    dobras.sort(key=lambda d: (d["repeticao"], d["dobra"]))
+    acuracias = np.array([d["acuracia"] for d in dobras])
+    return {
+        "dobras": dobras,
+        "acuracia_media": float(acuracias.mean()),
+        "acuracia_desvio": float(acuracias.std(ddof=1)) if len(acuracias) > 1 else 0.0,
+        "erro_teste_medio": float(np.mean([d["erro_teste"] for d in dobras])),
+        "matriz_confusao": sum(d["matriz_confusao"] for d in dobras),
+        "tempo": time.perf_counter() - inicio,
+    }
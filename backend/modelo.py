@@ -0,0 +1,282 @@
+"""
+Modelo persistente com aprendizado incremental (online).
+
+- ModeloMLP.partial_fit recebe um mini-lote novo (atributos brutos +
+  rótulos originais) e continua o treino de onde parou, sem voltar a
+  inicializar_camadas: o Normalizador é atualizado com o lote
+  (Normalizador.partial_fit), classes inéditas entram no fim do mapa e
+  ganham uma linha nova na camada de saída, e o estado do otimizador
+  (momentos do Adam, velocidades do momentum...) é mantido entre chamadas
+- BufferReplay (opcional): reservatório de tamanho fixo com uma amostra
+  uniforme de tudo o que já foi visto; a cada partial_fit uma parte dele é
+  misturada ao lote novo, o que reduz o esquecimento do que veio antes
+- salvar/carregar gravam tudo (pesos, otimizador, normalizador, mapa,
+  buffer) em um checkpoint; exportar grava no formato de
+  utils.salvar_modelo (servidor.py, GUI)
+"""
+
+import random
+
+import numpy as np
+
+from checkpoint import criar_snapshot, salvar_checkpoint, carregar_checkpoint
+from mlp import (
+    inicializar_camadas, especificacao_camadas, treinar_epoca_camadas, criar_otimizador, predict_proba, avaliar,
+    EspacoTrabalho,
+)
+from utils import Normalizador, salvar_modelo
+
+
+class BufferReplay:
+    """
+    Reservatório (algoritmo R) com até 'capacidade' amostras brutas e seus
+    índices de classe: depois de n amostras vistas, cada uma está no buffer
+    com a mesma probabilidade capacidade / n. Guarda os atributos brutos
+    (o normalizador muda a cada lote, então a normalização é refeita no treino).
+    """
+
+    def __init__(self, capacidade, n_atributos):
+        self.capacidade = int(capacidade)
+        self.X = np.empty((self.capacidade, n_atributos))
+        self.y = np.empty(self.capacidade, dtype=np.int32)
+        self.tamanho = 0
+        self.vistos = 0
+
+    def adicionar(self, X, y, rng):
+        n = len(X)
+        # fase de preenchimento
+        livres = min(self.capacidade - self.tamanho, n)
+        if livres > 0:
+            self.X[self.tamanho:self.tamanho + livres] = X[:livres]
+            self.y[self.tamanho:self.tamanho + livres] = y[:livres]
+            self.tamanho += livres
+        # substituição: a i-ésima amostra vista entra na posição j ~ U[0, i] se j < capacidade
+        if n > livres:
+            posicoes = rng.integers(0, np.arange(self.vistos + livres, self.vistos + n) + 1)
+            entram = np.flatnonzero(posicoes < self.capacidade)
+            for i, j in zip(entram + livres, posicoes[entram]):  # em ordem: a mais recente prevalece
+                self.X[j] = X[i]
+                self.y[j] = y[i]
+        self.vistos += n
+
+    def amostrar(self, quantidade, rng):
+        """Até 'quantidade' amostras distintas do buffer (sem reposição)."""
+        quantidade = min(int(quantidade), self.tamanho)
+        idx = rng.choice(self.tamanho, quantidade, replace=False)
+        return self.X[idx], self.y[idx]
+
+    def estado(self):
+        return {"capacidade": self.capacidade, "X": self.X[:self.tamanho].copy(),
+                "y": self.y[:self.tamanho].copy(), "vistos": self.vistos}
+
+    @classmethod
+    def de_estado(cls, estado):
+        buffer = cls(estado["capacidade"], estado["X"].shape[1])
+        buffer.tamanho = len(estado["X"])
+        buffer.X[:buffer.tamanho] = estado["X"]
+        buffer.y[:buffer.tamanho] = estado["y"]
+        buffer.vistos = estado["vistos"]
+        return buffer
+
+
+def _crescer_estado_otimizador(otimizador, n_pesos, novas_linhas):
+    """
+    Acrescenta linhas zeradas ao estado do otimizador referente a W e B da
+    camada de saída (os dois últimos parâmetros), acompanhando o crescimento
+    da camada. Vale para qualquer otimizador cujo estado seja uma lista com
+    um ndarray por parâmetro (Momentum, RMSProp, Adam).
+    """
+    for valor in vars(otimizador).values():
+        if isinstance(valor, list) and len(valor) == n_pesos and all(isinstance(v, np.ndarray) for v in valor):
+            for i in (n_pesos - 2, n_pesos - 1):
+                extra = np.zeros((novas_linhas,) + valor[i].shape[1:], dtype=valor[i].dtype)
+                valor[i] = np.concatenate([valor[i], extra])
+
+
+class ModeloMLP:
+    """
+    MLP que aprende por lotes à medida que os dados chegam.
+
+    camadas: camadas ocultas (ver mlp.especificacao_camadas); None usa a
+    heurística (n_in + n_classes) // 2 do primeiro lote
+    saida: ativação da camada de saída; 'softmax' (padrão) treina com
+    entropia cruzada e comporta classes novas sem mudar a escala das demais
+    otimizador: nome (ver mlp.criar_otimizador) ou None (SGD com 'taxa')
+    replay: capacidade do BufferReplay (0 desliga); proporcao_replay:
+    amostras do buffer misturadas por amostra nova em cada partial_fit
+    seed: semente dos pesos iniciais (random global, como no resto do
+    backend) e do gerador de embaralhamento/replay
+    """
+
+    def __init__(self, camadas=None, ativacao_tipo="logistica", saida="softmax", taxa=0.01, otimizador="adam",
+                 batch_size=16, normalizar="minmax", dtype=np.float64, replay=0, proporcao_replay=1.0, seed=None):
+        self.camadas = camadas
+        self.ativacao_tipo = ativacao_tipo
+        self.saida = saida
+        self.taxa = taxa
+        self.batch_size = batch_size
+        self.dtype = np.dtype(dtype)
+        self.proporcao_replay = proporcao_replay
+        self.seed = seed
+        self.capacidade_replay = int(replay)
+
+        self.normalizador = Normalizador(normalizar, self.dtype)
+        self.mapa = {}  # classe -> índice na saída (classes novas entram no fim)
+        self.otimizador = criar_otimizador(otimizador, taxa) if otimizador else None
+        self.pesos = None
+        self.ativacoes = None  # str ou uma ativação por camada (resolvida no primeiro lote)
+        self.replay = None
+        self.n_amostras = 0
+        self.atualizacoes = 0
+        self._espaco = None
+        self._rng = np.random.default_rng(seed)
+
+    @property
+    def classes(self):
+        return [nome for nome, _ in sorted(self.mapa.items(), key=lambda item: item[1])]
+
+    def _registrar_classes(self, rotulos):
+        """Acrescenta ao mapa as classes ainda não vistas; retorna quantas entraram."""
+        novas = set(rotulos) - self.mapa.keys()
+        try:
+            novas = sorted(novas)
+        except TypeError:
+            novas = list(novas)
+        for classe in novas:
+            self.mapa[classe] = len(self.mapa)
+        return len(novas)
+
+    def _iniciar_rede(self, n_in):
+        n_out = len(self.mapa)
+        camadas = self.camadas if self.camadas is not None else max(1, (n_in + n_out) // 2)
+        larguras, self.ativacoes = especificacao_camadas(camadas, self.ativacao_tipo, self.saida)
+        if self.seed is not None:
+            random.seed(self.seed)
+        self.pesos = inicializar_camadas(n_in, larguras, n_out, self.dtype)
+        if self.capacidade_replay > 0:
+            self.replay = BufferReplay(self.capacidade_replay, n_in)
+
+    def _crescer_saida(self, novas):
+        """Uma linha nova em W e B da camada de saída por classe nova (sorteio de inicializar_camadas)."""
+        W, B = self.pesos[-2], self.pesos[-1]
+        W_novo = np.array([[random.uniform(-1, 1) for _ in range(W.shape[1])] for _ in range(novas)], dtype=W.dtype)
+        B_novo = np.array([random.uniform(-1, 1) for _ in range(novas)], dtype=B.dtype)
+        self.pesos = self.pesos[:-2] + (np.concatenate([W, W_novo]), np.concatenate([B, B_novo]))
+        if self.otimizador is not None:
+            _crescer_estado_otimizador(self.otimizador, len(self.pesos), novas)
+        self._espaco = None  # buffers dimensionados pela saída antiga
+
+    def partial_fit(self, X, y, epocas=1, classes=None):
+        """
+        Treina 'epocas' passadas sobre o lote novo (mais a amostra do buffer
+        de replay, se houver), continuando dos pesos e do otimizador atuais.
+        X: atributos brutos (m x n); y: rótulos originais (m)
+        classes: rótulos possíveis, para reservar as saídas de antemão (opcional)
+        retorna: perda média da última passada
+        """
+        X = np.atleast_2d(np.asarray(X, dtype=np.float64))
+        rotulos = np.asarray(y).tolist()
+        if len(X) != len(rotulos):
+            raise ValueError(f"X tem {len(X)} linhas e y tem {len(rotulos)} rótulos")
+        if self.pesos is not None and X.shape[1] != self.pesos[0].shape[1]:
+            raise ValueError(f"Esperados {self.pesos[0].shape[1]} atributos, recebidos {X.shape[1]}")
+        if len(X) == 0:
+            return 0.0
+
+        novas = self._registrar_classes(list(classes or ()) + rotulos)
+        self.normalizador.partial_fit(X)
+        if self.pesos is None:
+            self._iniciar_rede(X.shape[1])
+        elif novas:
+            self._crescer_saida(novas)
+        indices = np.fromiter((self.mapa[r] for r in rotulos), dtype=np.int32, count=len(rotulos))
+
+        X_treino, y_treino = X, indices
+        if self.replay is not None and self.replay.tamanho:
+            X_antigo, y_antigo = self.replay.amostrar(round(self.proporcao_replay * len(X)), self._rng)
+            X_treino = np.concatenate([X, X_antigo])
+            y_treino = np.concatenate([indices, y_antigo])
+        X_treino = self.normalizador.transform(X_treino)
+
+        if self._espaco is None:  # reaproveitado entre chamadas (cresce sozinho se o lote aumentar)
+            self._espaco = EspacoTrabalho(self.pesos, self.ativacoes, self.batch_size or len(X_treino))
+
+        perda = 0.0
+        for _ in range(epocas):
+            ordem = self._rng.permutation(len(X_treino))
+            perda = treinar_epoca_camadas(X_treino[ordem], y_treino[ordem], self.pesos, self.taxa, self.ativacoes,
+                                          self.batch_size, otimizador=self.otimizador, espaco=self._espaco)
+
+        if self.replay is not None:
+            self.replay.adicionar(X, indices, self._rng)
+        self.n_amostras += len(X)
+        self.atualizacoes += 1
+        return perda
+
+    def _verificar_treinado(self):
+        if self.pesos is None:
+            raise ValueError("Modelo ainda não treinado (chame partial_fit).")
+
+    def predict_proba(self, X):
+        """Saídas da rede para atributos brutos (colunas na ordem de self.classes)."""
+        self._verificar_treinado()
+        return predict_proba(self.normalizador.transform(np.atleast_2d(X)), self.pesos, self.ativacoes)
+
+    def predict(self, X):
+        """Rótulos originais previstos."""
+        classes = self.classes
+        return [classes[i] for i in np.argmax(self.predict_proba(X), axis=1)]
+
+    def avaliar(self, X, y):
+        """(perda, acurácia) em um conjunto rotulado; rótulos nunca vistos contam como erro."""
+        self._verificar_treinado()
+        rotulos = np.asarray(y).tolist()
+        conhecidos = np.array([r in self.mapa for r in rotulos], dtype=bool)
+        X = self.normalizador.transform(np.atleast_2d(X))
+        if not conhecidos.any():
+            return float("nan"), 0.0
+        indices = np.array([self.mapa[r] for r, ok in zip(rotulos, conhecidos) if ok], dtype=np.int32)
+        perda, acuracia = avaliar(X[conhecidos], indices, self.pesos, self.ativacoes)
+        return perda, float(acuracia * conhecidos.mean())
+
+    # -------------------------
+    # Persistência
+    # -------------------------
+    def salvar(self, caminho):
+        """Checkpoint completo para continuar o aprendizado depois (ver carregar)."""
+        self._verificar_treinado()
+        config = {
+            "camadas": self.camadas, "ativacao_tipo": self.ativacao_tipo, "saida": self.saida, "taxa": self.taxa,
+            "batch_size": self.batch_size, "dtype": self.dtype.name, "proporcao_replay": self.proporcao_replay,
+            "seed": self.seed, "replay": self.capacidade_replay, "ativacoes": self.ativacoes,
+            "n_amostras": self.n_amostras, "atualizacoes": self.atualizacoes,
+        }
+        estado = criar_snapshot(self.atualizacoes, self.pesos, self.otimizador, normalizador=self.normalizador,
+                                mapa=self.mapa, config=config)
+        estado["replay"] = self.replay.estado() if self.replay is not None else None
+        estado["gerador"] = self._rng.bit_generator.state
+        salvar_checkpoint(caminho, estado)
+
+    @classmethod
+    def carregar(cls, caminho):
+        estado = carregar_checkpoint(caminho)
+        config = estado["config"]
+        modelo = cls(config["camadas"], config["ativacao_tipo"], config["saida"], config["taxa"], None,
+                     config["batch_size"], dtype=config["dtype"], replay=config["replay"],
+                     proporcao_replay=config["proporcao_replay"], seed=config["seed"])
+        modelo.pesos = tuple(estado["pesos"])
+        modelo.ativacoes = config["ativacoes"]
+        modelo.otimizador = estado["otimizador"]
+        modelo.normalizador = Normalizador.de_estado(estado["normalizador"])
+        modelo.mapa = dict(estado["mapa"])
+        modelo.n_amostras = config["n_amostras"]
+        modelo.atualizacoes = config["atualizacoes"]
+        if estado["replay"] is not None:
+            modelo.replay = BufferReplay.de_estado(estado["replay"])
+        modelo._rng.bit_generator.state = estado["gerador"]
+        return modelo
+
+    def exportar(self, caminho):
+        """Grava só o necessário para inferência, no formato de utils.salvar_modelo."""
+        self._verificar_treinado()
+        salvar_modelo(caminho, self.pesos, self.ativacoes, self.normalizador, self.mapa)
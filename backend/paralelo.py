@@ -0,0 +1,219 @@
+"""
+Treino data-parallel da MLP em vários núcleos.
+
+- Dataset e pesos vivem em memória compartilhada (compartilhado.py); cada
+  worker processa um shard disjunto das amostras
+- modo 'sincrono': a cada passo todos os workers calculam o gradiente do
+  seu pedaço do mini-lote, o worker 0 faz a média ponderada e atualiza os
+  pesos (duas barreiras por passo)
+- modo 'assincrono': estilo Hogwild — cada worker aplica suas atualizações
+  direto nos pesos compartilhados, sem trava
+- cada época reporta a eficiência de escala: tempo ocupado somado dos
+  workers / (n_workers * tempo de parede)
+"""
+
+import math
+import multiprocessing as mp
+import os
+import time
+
+import numpy as np
+
+from compartilhado import criar_array_compartilhado, anexar_array, liberar
+from mlp import EspacoTrabalho, dtype_pesos, alvos_treino
+
+
+def _views_pesos(flat, formas):
+    """Divide o vetor achatado de parâmetros em views (W1, B1, ..., Wk, Bk)."""
+    views = []
+    inicio = 0
+    for forma in formas:
+        tamanho = int(np.prod(forma))
+        views.append(flat[inicio:inicio + tamanho].reshape(forma))
+        inicio += tamanho
+    return views
+
+
+def _worker(indice, descritores, formas, inicio, fim, barreira, conexao, modo, ativacao_tipo):
+    blocos = []
+    arrays = {}
+    for nome, descritor in descritores.items():
+        shm, array = anexar_array(descritor)
+        blocos.append(shm)
+        arrays[nome] = array
+
+    X = arrays["X"][inicio:fim]
+    Y = arrays["Y"][inicio:fim]
+    flat = arrays["pesos"]
+    pesos = _views_pesos(flat, formas)
+    gradientes = arrays.get("gradientes")
+    contagens = arrays.get("contagens")
+    espaco = EspacoTrabalho(pesos, ativacao_tipo)
+    g = np.empty_like(flat)
+
+    try:
+        while True:
+            comando = conexao.recv()
+            if comando[0] == "fim":
+                break
+            _, taxa, lote_local, n_passos = comando
+
+            soma_erros = 0.0
+            ocupado = 0.0
+            for passo in range(n_passos):
+                t0 = time.perf_counter()
+                Xb = X[passo * lote_local:(passo + 1) * lote_local]
+                Yb = Y[passo * lote_local:(passo + 1) * lote_local]
+                m = len(Xb)
+                if m:
+                    espaco.forward(Xb, pesos)
+                    soma_erros += espaco.backward(Xb, Yb, pesos) * m
+                    np.concatenate([gp.ravel() for gp in espaco.grads], out=g)
+
+                if modo == "assincrono":
+                    if m:
+                        # Hogwild: atualização direta, sem trava
+                        g *= taxa
+                        flat -= g
+                    ocupado += time.perf_counter() - t0
+                    continue
+
+                # síncrono: publica soma dos gradientes do pedaço local
+                if m:
+                    np.multiply(g, m, out=gradientes[indice])
+                else:
+                    gradientes[indice] = 0.0
+                contagens[indice] = m
+                ocupado += time.perf_counter() - t0
+                barreira.wait()
+
+                if indice == 0:
+                    t0 = time.perf_counter()
+                    total = contagens.sum()
+                    if total:
+                        flat -= taxa * (gradientes.sum(axis=0) / total)
+                    ocupado += time.perf_counter() - t0
+                barreira.wait()
+
+            conexao.send((soma_erros, len(X), ocupado))
+    finally:
+        for shm in blocos:
+            try:
+                shm.close()
+            except BufferError:
+                # views locais ainda vivas; o processo está encerrando
+                pass
+
+
+class TreinadorParalelo:
+    """
+    Executa treinar_epoca em n_workers processos sobre shards disjuntos.
+
+    Os pesos ficam em memória compartilhada; use .pesos para acessá-los
+    (views) e fechar() (ou with) para encerrar os workers.
+    """
+
+    def __init__(self, X, Y, pesos, n_workers=None, modo="sincrono", ativacao_tipo="logistica", batch_size=None, metodo_inicio=None):
+        if modo not in ("sincrono", "assincrono"):
+            raise ValueError(f"Modo de treino paralelo desconhecido: {modo}")
+        # dados e buffers compartilhados no dtype dos pesos (float64/float32);
+        # índices de classe inteiros continuam compactos (intp, sem one-hot)
+        dtype = dtype_pesos(pesos)
+        X = np.asarray(X, dtype=dtype)
+        Y = alvos_treino(Y, dtype)
+        self.n_amostras = len(X)
+        self.n_workers = max(1, min(n_workers or os.cpu_count(), self.n_amostras))
+        self.modo = modo
+        self.batch_size = batch_size
+        self.metricas = {}
+
+        formas = [np.shape(p) for p in pesos]
+        self._blocos = []
+        descritores = {}
+
+        def compartilhar(nome, array):
+            shm, descritor, view = criar_array_compartilhado(array)
+            self._blocos.append(shm)
+            descritores[nome] = descritor
+            return view
+
+        compartilhar("X", X)
+        compartilhar("Y", Y)
+        flat = compartilhar("pesos", np.concatenate([np.ravel(p) for p in pesos]).astype(dtype))
+        self.pesos = tuple(_views_pesos(flat, formas))
+        if modo == "sincrono":
+            compartilhar("gradientes", np.zeros((self.n_workers, flat.size), dtype=dtype))
+            compartilhar("contagens", np.zeros(self.n_workers, dtype=np.int64))
+
+        # shards contíguos e disjuntos
+        limites = np.linspace(0, self.n_amostras, self.n_workers + 1).astype(int)
+        self._tamanhos_shard = np.diff(limites)
+
+        # metodo_inicio='spawn' é o mais seguro quando o processo já tem
+        # outras threads (ex.: chamado de dentro de uma QThread)
+        contexto = mp.get_context(metodo_inicio)
+        barreira = contexto.Barrier(self.n_workers)
+        self._conexoes = []
+        self._processos = []
+        for i in range(self.n_workers):
+            pai, filho = contexto.Pipe()
+            processo = contexto.Process(
+                target=_worker,
+                args=(i, descritores, formas, limites[i], limites[i + 1], barreira, filho, modo, ativacao_tipo),
+                daemon=True,
+            )
+            processo.start()
+            filho.close()
+            self._conexoes.append(pai)
+            self._processos.append(processo)
+
+    def treinar_epoca(self, taxa=0.1):
+        """Executa UMA época paralela e retorna o erro médio (como treinar_epoca)."""
+        maior_shard = int(self._tamanhos_shard.max())
+        if self.batch_size and self.modo == "sincrono":
+            # o mini-lote global é repartido entre os workers
+            lote_local = max(1, math.ceil(self.batch_size / self.n_workers))
+        elif self.batch_size:
+            lote_local = self.batch_size
+        else:
+            lote_local = maior_shard
+        n_passos = math.ceil(maior_shard / lote_local)
+
+        inicio = time.perf_counter()
+        for conexao in self._conexoes:
+            conexao.send(("epoca", taxa, lote_local, n_passos))
+        respostas = [conexao.recv() for conexao in self._conexoes]
+        parede = time.perf_counter() - inicio
+
+        soma_erros = sum(r[0] for r in respostas)
+        n = sum(r[1] for r in respostas)
+        ocupado = sum(r[2] for r in respostas)
+        self.metricas = {
+            "tempo_parede": parede,
+            "amostras_por_segundo": n / parede if parede > 0 else 0.0,
+            "eficiencia": ocupado / (self.n_workers * parede) if parede > 0 else 0.0,
+        }
+        return soma_erros / n if n else 0.0
+
+    def pesos_copia(self):
+        return tuple(np.array(p) for p in self.pesos)
+
+    def fechar(self):
+        for conexao in self._conexoes:
+            try:
+                conexao.send(("fim",))
+            except (BrokenPipeError, OSError):
+                pass
+        for processo in self._processos:
+            processo.join(timeout=5)
+            if processo.is_alive():
+                processo.terminate()
+        self.pesos = self.pesos_copia()
+        liberar(self._blocos)
+        self._blocos = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.fechar()
@@ -0,0 +1,313 @@
+"""
+Servidor de inferência local para modelos salvos com utils.salvar_modelo.
+
+- asyncio puro (HTTP/1.1 com keep-alive) em TCP ou socket Unix
+- requisições concorrentes são agrupadas em micro-lotes: o lote é enviado
+  ao forward vetorizado quando junta 'max_lote' amostras ou quando vence o
+  prazo 'max_espera_ms' contado a partir da primeira requisição do lote
+- o forward roda em uma thread do executor (o NumPy libera o GIL), então o
+  laço continua aceitando requisições enquanto o lote anterior é calculado
+
+Rotas:
+    POST /predict   {"amostras": [[...], ...]} ou {"amostra": [...]}
+                    -> {"classes": [...], "indices": [...], "probabilidades": [[...], ...]}
+    GET  /stats     vazão, latência (p50/p95/p99) e tamanho médio dos lotes
+    GET  /saude     {"ok": true}
+
+Uso:
+    python servidor.py modelo.npz [--host 127.0.0.1] [--porta 8765] [--unix /tmp/mlp.sock]
+                                  [--max-lote 256] [--max-espera-ms 2]
+"""
+
+import argparse
+import asyncio
+import json
+import time
+from collections import deque
+
+import numpy as np
+
+from mlp import predict_proba
+from utils import carregar_modelo
+
+_STATUS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+           413: "Payload Too Large", 500: "Internal Server Error"}
+MAX_CORPO_BYTES = 16 * 1024 * 1024
+
+
+class ModeloServido:
+    """Modelo carregado + forward completo (normalização, rede, nomes das classes)."""
+
+    def __init__(self, caminho):
+        modelo = carregar_modelo(caminho)
+        self.pesos = modelo["pesos"]
+        self.ativacao_tipo = modelo["ativacao_tipo"]
+        self.normalizador = modelo["normalizador"]
+        mapa = modelo["mapa"] or {}
+        self.classes = [nome for nome, _ in sorted(mapa.items(), key=lambda item: item[1])]
+        self.n_atributos = self.pesos[0].shape[1]
+
+    def prever(self, X):
+        """X: matriz bruta (m x n_atributos) -> (índices, probabilidades)."""
+        if self.normalizador is not None:
+            X = self.normalizador.transform(X)
+        scores = predict_proba(X, self.pesos, self.ativacao_tipo)
+        return np.argmax(scores, axis=1), scores
+
+
+class Estatisticas:
+    """Contadores e janela das últimas latências (em segundos)."""
+
+    def __init__(self, janela=10000):
+        self.inicio = time.perf_counter()
+        self.requisicoes = 0
+        self.amostras = 0
+        self.lotes = 0
+        self.erros = 0
+        self.latencias = deque(maxlen=janela)
+        self.tamanhos_lote = deque(maxlen=janela)
+
+    def registrar_lote(self, n_requisicoes, n_amostras):
+        self.lotes += 1
+        self.tamanhos_lote.append(n_requisicoes)
+        self.amostras += n_amostras
+
+    def registrar_requisicao(self, latencia):
+        self.requisicoes += 1
+        self.latencias.append(latencia)
+
+    def resumo(self):
+        decorrido = time.perf_counter() - self.inicio
+        resumo = {
+            "tempo_ativo_s": decorrido,
+            "requisicoes": self.requisicoes,
+            "amostras": self.amostras,
+            "lotes": self.lotes,
+            "erros": self.erros,
+            "requisicoes_por_segundo": self.requisicoes / decorrido if decorrido > 0 else 0.0,
+            "amostras_por_segundo": self.amostras / decorrido if decorrido > 0 else 0.0,
+            "requisicoes_por_lote": float(np.mean(self.tamanhos_lote)) if self.tamanhos_lote else 0.0,
+        }
+        if self.latencias:
+            p50, p95, p99 = np.percentile(np.fromiter(self.latencias, dtype=float), [50, 95, 99])
+            resumo.update(latencia_p50_ms=p50 * 1e3, latencia_p95_ms=p95 * 1e3, latencia_p99_ms=p99 * 1e3)
+        return resumo
+
+
+class LoteadorMicro:
+    """
+    Agrupa requisições concorrentes em micro-lotes.
+    prever() retorna assim que o lote que contém a requisição foi calculado.
+    """
+
+    def __init__(self, modelo, max_lote=256, max_espera_ms=2.0, estatisticas=None):
+        self.modelo = modelo
+        self.max_lote = max_lote
+        self.max_espera = max_espera_ms / 1000.0
+        self.estatisticas = estatisticas or Estatisticas()
+        self._fila = asyncio.Queue()
+        self._tarefa = None
+
+    def iniciar(self):
+        self._tarefa = asyncio.get_running_loop().create_task(self._laco())
+
+    async def fechar(self):
+        if self._tarefa is not None:
+            self._tarefa.cancel()
+            try:
+                await self._tarefa
+            except asyncio.CancelledError:
+                pass
+
+    async def prever(self, X):
+        futuro = asyncio.get_running_loop().create_future()
+        await self._fila.put((X, futuro))
+        return await futuro
+
+    async def _coletar(self):
+        """Primeiro item bloqueia; os demais entram até encher o lote ou vencer o prazo."""
+        loop = asyncio.get_running_loop()
+        itens = [await self._fila.get()]
+        n = len(itens[0][0])
+        prazo = loop.time() + self.max_espera
+        while n < self.max_lote:
+            restante = prazo - loop.time()
+            if restante <= 0:
+                break
+            try:
+                item = await asyncio.wait_for(self._fila.get(), restante)
+            except asyncio.TimeoutError:
+                break
+            itens.append(item)
+            n += len(item[0])
+        # o que já estiver na fila sem esperar também vai (até max_lote)
+        while n < self.max_lote and not self._fila.empty():
+            item = self._fila.get_nowait()
+            itens.append(item)
+            n += len(item[0])
+        return itens
+
+    async def _laco(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            itens = await self._coletar()
+            X = np.concatenate([x for x, _ in itens])
+            try:
+                indices, scores = await loop.run_in_executor(None, self.modelo.prever, X)
+            except Exception as e:
+                for _, futuro in itens:
+                    if not futuro.done():
+                        futuro.set_exception(e)
+                continue
+            self.estatisticas.registrar_lote(len(itens), len(X))
+
+            inicio = 0
+            for x, futuro in itens:
+                fim = inicio + len(x)
+                if not futuro.done():
+                    futuro.set_result((indices[inicio:fim], scores[inicio:fim]))
+                inicio = fim
+
+
+# -------------------------
+# HTTP mínimo
+# -------------------------
+async def _ler_requisicao(reader):
+    """Retorna (método, caminho, cabeçalhos, corpo) ou None se a conexão fechou."""
+    linha = await reader.readline()
+    if not linha:
+        return None
+    try:
+        metodo, caminho, _ = linha.decode("latin-1").split(" ", 2)
+    except ValueError:
+        raise ValueError("linha de requisição inválida")
+
+    cabecalhos = {}
+    while True:
+        linha = await reader.readline()
+        if linha in (b"\r\n", b"\n", b""):
+            break
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        cabecalhos[nome.strip().lower()] = valor.strip()
+
+    tamanho = int(cabecalhos.get("content-length", 0))
+    if tamanho > MAX_CORPO_BYTES:
+        raise OverflowError("corpo grande demais")
+    corpo = await reader.readexactly(tamanho) if tamanho else b""
+    return metodo.upper(), caminho, cabecalhos, corpo
+
+
+def _resposta(status, dados, manter_conexao=True):
+    corpo = json.dumps(dados).encode("utf-8")
+    cabecalho = (
+        f"HTTP/1.1 {status} {_STATUS[status]}\r\n"
+        "Content-Type: application/json\r\n"
+        f"Content-Length: {len(corpo)}\r\n"
+        f"Connection: {'keep-alive' if manter_conexao else 'close'}\r\n\r\n"
+    )
+    return cabecalho.encode("latin-1") + corpo
+
+
+class ServidorInferencia:
+    def __init__(self, modelo, max_lote=256, max_espera_ms=2.0):
+        self.modelo = modelo
+        self.estatisticas = Estatisticas()
+        self.loteador = LoteadorMicro(modelo, max_lote, max_espera_ms, self.estatisticas)
+
+    async def _predict(self, corpo):
+        dados = json.loads(corpo or b"{}")
+        if "amostras" in dados:
+            X = np.asarray(dados["amostras"], dtype=float)
+        elif "amostra" in dados:
+            X = np.asarray([dados["amostra"]], dtype=float)
+        else:
+            raise ValueError("informe 'amostras' ou 'amostra'")
+        if X.ndim != 2 or X.shape[1] != self.modelo.n_atributos or len(X) == 0:
+            raise ValueError(f"esperado matriz (m x {self.modelo.n_atributos})")
+
+        indices, scores = await self.loteador.prever(X)
+        classes = self.modelo.classes
+        return {
+            "classes": [classes[i] if i < len(classes) else int(i) for i in indices],
+            "indices": indices.tolist(),
+            "probabilidades": scores.tolist(),
+        }
+
+    async def _rotear(self, metodo, caminho):
+        caminho = caminho.split("?", 1)[0]
+        if caminho == "/saude":
+            return 200, {"ok": True}
+        if caminho == "/stats":
+            return 200, self.estatisticas.resumo()
+        if caminho == "/predict":
+            return (405, {"erro": "use POST"}) if metodo != "POST" else None
+        return 404, {"erro": f"rota desconhecida: {caminho}"}
+
+    async def atender(self, reader, writer):
+        try:
+            while True:
+                try:
+                    requisicao = await _ler_requisicao(reader)
+                except (ValueError, asyncio.IncompleteReadError):
+                    writer.write(_resposta(400, {"erro": "requisição inválida"}, False))
+                    break
+                except OverflowError:
+                    writer.write(_resposta(413, {"erro": "corpo grande demais"}, False))
+                    break
+                if requisicao is None:
+                    break
+                metodo, caminho, cabecalhos, corpo = requisicao
+                manter = cabecalhos.get("connection", "").lower() != "close"
+
+                inicio = time.perf_counter()
+                resposta = await self._rotear(metodo, caminho)
+                if resposta is None:
+                    try:
+                        resposta = 200, await self._predict(corpo)
+                        self.estatisticas.registrar_requisicao(time.perf_counter() - inicio)
+                    except (ValueError, TypeError) as e:
+                        self.estatisticas.erros += 1
+                        resposta = 400, {"erro": str(e)}
+                    except Exception as e:
+                        self.estatisticas.erros += 1
+                        resposta = 500, {"erro": str(e)}
+
+                writer.write(_resposta(*resposta, manter))
+                await writer.drain()
+                if not manter:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def servir(self, host="127.0.0.1", porta=8765, unix=None):
+        self.loteador.iniciar()
+        if unix:
+            servidor = await asyncio.start_unix_server(self.atender, path=unix)
+            print(f"Servindo em unix:{unix}")
+        else:
+            servidor = await asyncio.start_server(self.atender, host, porta)
+            print(f"Servindo em http://{host}:{porta}")
+        try:
+            async with servidor:
+                await servidor.serve_forever()
+        finally:
+            await self.loteador.fechar()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servidor de inferência com micro-lotes.")
+    parser.add_argument("modelo", help="arquivo .npz gerado por salvar_modelo")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--unix", help="caminho de socket Unix (em vez de TCP)")
+    parser.add_argument("--max-lote", type=int, default=256, help="amostras por micro-lote")
+    parser.add_argument("--max-espera-ms", type=float, default=2.0, help="prazo máximo para fechar um lote")
+    args = parser.parse_args()
+
+    servidor = ServidorInferencia(ModeloServido(args.modelo), args.max_lote, args.max_espera_ms)
+    try:
+        asyncio.run(servidor.servir(args.host, args.porta, args.unix))
+    except KeyboardInterrupt:
+        pass
@@ -1,17 +1,33 @@
 """""
 Contém funções auxiliares que não fazem parte diretamente da MLP.
-Normalização de dados
+Normalização de dados (Normalizador ajustável, reaproveitado no teste e
+na inferência)
 
-Divisão treino/teste
+Divisão treino/teste estratificada (NumPy puro, sem scikit-learn)
 
 Cálculo de matriz de confusão
 
+Validação cruzada: índices de k-fold estratificado (repetível)
+
 Detecção de platô e ajuste da taxa de aprendizado
 
-Leitura de CSV e pré-processamento
+Leitura de CSV e pré-processamento (inclusive em blocos, para arquivos
+que não cabem na memória)
+
+Cache binário (.npy mapeado em memória) dos CSVs já lidos e codificados
+
+Salvamento/carregamento do modelo treinado (pesos + normalizador + classes)
+
+dtype configurável (float64 padrão ou float32) na saída de preparar_dados,
+normalizar_dados/Normalizador, carregar_csv_cache e indices_para_one_hot
 """
 import csv
-from sklearn.model_selection import train_test_split
+import hashlib
+import json
+import os
+import time
+from collections import deque
+import numpy as np
 
 
 def ler_csv(caminho):
@@ -33,8 +49,215 @@ def ler_csv(caminho):
     return dados
 
 
-def preparar_dados(dados):
-    """Separa as entradas e classes a partir da lista lida do CSV."""
+def ler_csv_em_blocos(caminho, tamanho_bloco=10000, dtype=np.float64):
+    """
+    Lê o CSV em streaming e gera blocos (X_bloco, y_bloco), onde X_bloco é
+    um ndarray (<= tamanho_bloco x n_atributos) do dtype pedido e y_bloco um
+    ndarray de rótulos (str). Só um bloco fica em memória por vez.
+    """
+    with open(caminho, mode='r', encoding='utf-8') as file:
+        reader = csv.reader(file)
+        next(reader, None)  # pula cabeçalho
+        entradas = []
+        classes = []
+        for linha in reader:
+            if len(linha) < 2:
+                continue
+            entradas.append(linha[:-1])
+            classes.append(linha[-1])
+            if len(entradas) == tamanho_bloco:
+                yield np.array(entradas, dtype=dtype), np.array(classes)
+                entradas = []
+                classes = []
+        if entradas:
+            yield np.array(entradas, dtype=dtype), np.array(classes)
+
+
+def estatisticas_csv(caminho, tamanho_bloco=10000, modo="minmax", dtype=np.float64):
+    """
+    Primeira passada em streaming: ajusta um Normalizador (partial_fit por
+    bloco), monta o mapa de classes e conta as amostras sem carregar o
+    arquivo inteiro.
+    dtype: dtype dos blocos normalizados (o dos pesos do treino)
+    retorna: dict com 'normalizador', 'mapa' e 'n_amostras'
+    """
+    normalizador = Normalizador(modo, dtype)
+    classes = set()
+    for X_bloco, y_bloco in ler_csv_em_blocos(caminho, tamanho_bloco):
+        normalizador.partial_fit(X_bloco)
+        classes.update(y_bloco.tolist())
+
+    mapa = {c: i for i, c in enumerate(sorted(classes))}
+    return {"normalizador": normalizador, "mapa": mapa, "n_amostras": normalizador.n_amostras}
+
+
+def blocos_normalizados(caminho, estatisticas, tamanho_bloco=10000, one_hot=True):
+    """
+    Segunda passada (repetida a cada época): gera blocos (X_norm, Y_onehot)
+    já normalizados com as estatísticas de estatisticas_csv.
+    one_hot=False entrega os índices de classe inteiros (saída softmax).
+    """
+    normalizador = estatisticas["normalizador"]
+    mapa = estatisticas["mapa"]
+    identidade = np.eye(len(mapa), dtype=normalizador.dtype)
+
+    for X_bloco, y_bloco in ler_csv_em_blocos(caminho, tamanho_bloco):
+        indices = np.array([mapa[c] for c in y_bloco], dtype=int)
+        yield normalizador.transform(X_bloco), identidade[indices] if one_hot else indices
+
+
+# -------------------------
+# Cache binário de datasets
+# -------------------------
+CACHE_DIR_PADRAO = os.path.join(os.path.expanduser("~"), ".cache", "projeto_mlp")
+CACHE_LIMITE_BYTES = 2 * 1024 ** 3  # 2 GiB no total, com despejo LRU
+_CACHE_INDICE = "indice.json"
+
+
+def _hash_conteudo(caminho, tamanho_bloco=1 << 20):
+    """Hash do conteúdo do arquivo (lido em blocos, sem parse)."""
+    h = hashlib.blake2b(digest_size=16)
+    with open(caminho, "rb") as f:
+        for bloco in iter(lambda: f.read(tamanho_bloco), b""):
+            h.update(bloco)
+    return h.hexdigest()
+
+
+def _ler_indice_cache(cache_dir):
+    try:
+        with open(os.path.join(cache_dir, _CACHE_INDICE), encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _gravar_indice_cache(cache_dir, indice):
+    destino = os.path.join(cache_dir, _CACHE_INDICE)
+    tmp = destino + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(indice, f)
+    os.replace(tmp, destino)
+
+
+def _arquivos_cache(cache_dir, chave):
+    return (os.path.join(cache_dir, f"{chave}_X.npy"),
+            os.path.join(cache_dir, f"{chave}_y.npy"))
+
+
+def _gravar_npy(destino, array):
+    tmp = destino + ".tmp"
+    with open(tmp, "wb") as f:
+        np.save(f, array)
+    os.replace(tmp, destino)
+
+
+def _despejar_lru(cache_dir, indice, limite_bytes, manter):
+    """Remove as entradas menos usadas até o total caber em limite_bytes."""
+    total = sum(e["bytes"] for e in indice.values())
+    for chave in sorted(indice, key=lambda k: indice[k]["ultimo_acesso"]):
+        if total <= limite_bytes:
+            break
+        if chave == manter:
+            continue
+        for arquivo in _arquivos_cache(cache_dir, chave):
+            try:
+                os.remove(arquivo)
+            except OSError:
+                pass
+        total -= indice.pop(chave)["bytes"]
+
+
+def carregar_csv_cache(caminho, cache_dir=None, limite_bytes=CACHE_LIMITE_BYTES, tamanho_bloco=10000,
+                       dtype=np.float64):
+    """
+    Lê o CSV usando um cache binário em disco.
+    Na primeira leitura o arquivo é parseado e X (float) e os índices de
+    classe (int) são gravados como .npy; nas seguintes os arrays são apenas
+    mapeados em memória (np.load com mmap_mode='r'), sem parse.
+    A entrada é identificada por caminho, tamanho, mtime e hash do conteúdo.
+    dtype: o cache guarda float64; outro dtype (ex.: np.float32) devolve uma
+    cópia convertida em memória em vez do mapeamento.
+    retorna: (X, y_indices, mapa) com mapa = {classe: indice}
+    """
+    cache_dir = cache_dir or CACHE_DIR_PADRAO
+    os.makedirs(cache_dir, exist_ok=True)
+
+    caminho_abs = os.path.abspath(caminho)
+    info = os.stat(caminho_abs)
+    indice = _ler_indice_cache(cache_dir)
+
+    # 1) caminho/tamanho/mtime já conhecidos: reaproveita o hash gravado
+    hash_conteudo = None
+    for entrada in indice.values():
+        if (entrada["caminho"] == caminho_abs and entrada["tamanho"] == info.st_size
+                and entrada["mtime"] == info.st_mtime_ns):
+            hash_conteudo = entrada["hash"]
+            break
+    if hash_conteudo is None:
+        hash_conteudo = _hash_conteudo(caminho_abs)
+
+    chave = hashlib.blake2b(
+        f"{caminho_abs}|{info.st_size}|{info.st_mtime_ns}|{hash_conteudo}".encode("utf-8"),
+        digest_size=16,
+    ).hexdigest()
+    arq_X, arq_y = _arquivos_cache(cache_dir, chave)
+
+    if chave not in indice or not (os.path.exists(arq_X) and os.path.exists(arq_y)):
+        # 2) mesmo conteúdo já em cache (ex.: arquivo só "tocado"): reaproveita
+        origem = next((k for k, e in indice.items()
+                       if e["hash"] == hash_conteudo and e["tamanho"] == info.st_size
+                       and all(os.path.exists(a) for a in _arquivos_cache(cache_dir, k))), None)
+        if origem is not None:
+            X = np.load(_arquivos_cache(cache_dir, origem)[0])
+            y_indices = np.load(_arquivos_cache(cache_dir, origem)[1])
+            classes = indice[origem]["classes"]
+        else:
+            # 3) miss: parse único em blocos
+            blocos_X, rotulos = [], []
+            for X_bloco, y_bloco in ler_csv_em_blocos(caminho_abs, tamanho_bloco):
+                blocos_X.append(X_bloco)
+                rotulos.append(y_bloco)
+            if not blocos_X:
+                raise ValueError(f"CSV sem amostras: {caminho}")
+            X = np.vstack(blocos_X)
+            classes, y_indices = np.unique(np.concatenate(rotulos), return_inverse=True)
+            classes = classes.tolist()
+            y_indices = y_indices.astype(np.int64)
+
+        _gravar_npy(arq_X, np.ascontiguousarray(X))
+        _gravar_npy(arq_y, y_indices)
+        indice[chave] = {
+            "caminho": caminho_abs,
+            "tamanho": info.st_size,
+            "mtime": info.st_mtime_ns,
+            "hash": hash_conteudo,
+            "classes": classes,
+            "bytes": os.path.getsize(arq_X) + os.path.getsize(arq_y),
+        }
+
+    indice[chave]["ultimo_acesso"] = time.time()
+    _despejar_lru(cache_dir, indice, limite_bytes, manter=chave)
+    _gravar_indice_cache(cache_dir, indice)
+
+    X = np.load(arq_X, mmap_mode="r")
+    if X.dtype != np.dtype(dtype):
+        X = X.astype(dtype)
+    y_indices = np.load(arq_y, mmap_mode="r")
+    mapa = {c: i for i, c in enumerate(indice[chave]["classes"])}
+    return X, y_indices, mapa
+
+
+def indices_para_one_hot(y_indices, n_classes, dtype=np.float64):
+    """Converte índices de classe (int) em matriz one-hot (m x n_classes)."""
+    return np.eye(n_classes, dtype=dtype)[np.asarray(y_indices, dtype=int)]
+
+
+def preparar_dados(dados, dtype=None):
+    """
+    Separa as entradas e classes a partir da lista lida do CSV.
+    dtype: None mantém X como lista de listas; np.float64/np.float32
+    devolve X como matriz NumPy compacta desse dtype.
+    """
     X = [linha[0] for linha in dados]
     y = [linha[1] for linha in dados]
 
@@ -43,28 +266,118 @@ def preparar_dados(dados):
     print(f"Exemplo Y[0]: {y[0]}")
     print(f"Classes únicas: {set(y)}\n")
 
+    if dtype is not None:
+        X = np.array(X, dtype=dtype)
     return X, y
 
-def normalizar_dados(X):
-    """Normaliza os valores de entrada entre 0 e 1."""
-    X_norm = []
-    num_features = len(X[0])
-
-    # calcular min/max de cada coluna
-    mins = [min(coluna) for coluna in zip(*X)]
-    maxs = [max(coluna) for coluna in zip(*X)]
-
-    # normalizar: (x - min) / (max - min)
-    for linha in X:
-        nova_linha = []
-        for i in range(num_features):
-            if maxs[i] - mins[i] == 0:  # evitar divisão por zero
-                nova_linha.append(0)
+class Normalizador:
+    """
+    Normalizador ajustável (fit uma vez, transform quantas vezes quiser).
+
+    modo 'minmax' leva cada coluna para [0, 1]; modo 'zscore' subtrai a
+    média e divide pelo desvio padrão. As estatísticas são acumuladas em
+    uma única passada vetorizada por lote (partial_fit), o que permite
+    ajustar em streaming e reaplicar no teste/inferência sem reajuste.
+    Colunas constantes são levadas a 0.
+    As estatísticas são sempre acumuladas em float64; dtype define só a
+    saída de transform.
+    """
+
+    def __init__(self, modo="minmax", dtype=np.float64):
+        if modo not in ("minmax", "zscore"):
+            raise ValueError(f"Modo de normalização desconhecido: {modo}")
+        self.modo = modo
+        self.dtype = np.dtype(dtype)
+        self.n_amostras = 0
+        self.mins = None
+        self.maxs = None
+        self.media = None
+        self._m2 = None  # soma dos quadrados dos desvios (Chan/Welford)
+
+    def fit(self, X):
+        self.__init__(self.modo, self.dtype)
+        return self.partial_fit(X)
+
+    def partial_fit(self, X):
+        X = np.atleast_2d(np.asarray(X, dtype=float))
+        m = len(X)
+        if m == 0:
+            return self
+
+        bloco_min = X.min(axis=0)
+        bloco_max = X.max(axis=0)
+        if self.n_amostras == 0:
+            self.mins, self.maxs = bloco_min, bloco_max
+        else:
+            self.mins = np.minimum(self.mins, bloco_min)
+            self.maxs = np.maximum(self.maxs, bloco_max)
+
+        if self.modo == "zscore":
+            bloco_media = X.mean(axis=0)
+            bloco_m2 = ((X - bloco_media) ** 2).sum(axis=0)
+            if self.n_amostras == 0:
+                self.media, self._m2 = bloco_media, bloco_m2
             else:
-                nova_linha.append((linha[i] - mins[i]) / (maxs[i] - mins[i]))
-        X_norm.append(nova_linha)
+                # combinação de médias/variâncias de dois lotes (Chan et al.)
+                total = self.n_amostras + m
+                delta = bloco_media - self.media
+                self.media = self.media + delta * (m / total)
+                self._m2 = self._m2 + bloco_m2 + delta ** 2 * (self.n_amostras * m / total)
+
+        self.n_amostras += m
+        return self
+
+    @property
+    def desvio(self):
+        if self._m2 is None:
+            return None
+        return np.sqrt(self._m2 / self.n_amostras)
+
+    @property
+    def n_atributos(self):
+        return None if self.mins is None else len(self.mins)
+
+    def transform(self, X):
+        if self.n_amostras == 0:
+            raise ValueError("Normalizador ainda não ajustado (chame fit).")
+        X = np.asarray(X, dtype=float)
+        if self.modo == "zscore":
+            centro, escala = self.media, self.desvio
+        else:
+            centro, escala = self.mins, self.maxs - self.mins
+
+        constante = escala == 0
+        X_norm = (X - centro) / np.where(constante, 1.0, escala)
+        X_norm[..., constante] = 0.0
+        return X_norm if X_norm.dtype == self.dtype else X_norm.astype(self.dtype)
+
+    def fit_transform(self, X):
+        return self.fit(X).transform(X)
+
+    def estado(self):
+        """Estatísticas em dict de ndarrays (para salvar junto dos pesos)."""
+        estado = {"modo": self.modo, "n_amostras": self.n_amostras, "dtype": self.dtype.name,
+                  "mins": self.mins, "maxs": self.maxs}
+        if self.modo == "zscore":
+            estado["media"] = self.media
+            estado["m2"] = self._m2
+        return estado
 
-    return X_norm
+    @classmethod
+    def de_estado(cls, estado):
+        normalizador = cls(str(estado["modo"]), str(estado.get("dtype", "float64")))
+        normalizador.n_amostras = int(estado["n_amostras"])
+        normalizador.mins = np.asarray(estado["mins"], dtype=float)
+        normalizador.maxs = np.asarray(estado["maxs"], dtype=float)
+        if normalizador.modo == "zscore":
+            normalizador.media = np.asarray(estado["media"], dtype=float)
+            normalizador._m2 = np.asarray(estado["m2"], dtype=float)
+        return normalizador
+
+
+def normalizar_dados(X, dtype=np.float64):
+    """Normaliza os valores de entrada entre 0 e 1 (matriz do dtype pedido)."""
+    return Normalizador("minmax", dtype).fit_transform(X)
 
 def codificar_classes(y):
     classes = sorted(set(y))
@@ -78,29 +391,207 @@ def codificar_classes(y):
 
     return y_encoded, class_to_index
 
+
+def codificar_indices(y):
+    """
+    Como codificar_classes, mas devolve só o índice de cada classe
+    (vetor int32, 4 bytes por amostra, qualquer que seja o nº de classes).
+    retorna: (y_indices, mapa {classe: índice})
+    """
+    classes, indices = np.unique(np.asarray(y), return_inverse=True)
+    return indices.astype(np.int32), {c.item() if hasattr(c, "item") else c: i for i, c in enumerate(classes)}
+
+# -------------------------
+# Persistência do modelo treinado
+# -------------------------
+def salvar_modelo(caminho, pesos, ativacao_tipo="logistica", normalizador=None, mapa=None):
+    """
+    Salva pesos (tupla W1, B1, W2, B2, ...), tipo de ativação (str ou uma
+    por camada), estado do Normalizador e mapa de classes em um único
+    arquivo .npz.
+    """
+    arrays = {f"peso_{i}": np.asarray(p) for i, p in enumerate(pesos)}
+    meta = {"ativacao_tipo": ativacao_tipo, "n_pesos": len(pesos), "mapa": mapa, "normalizador": None}
+    if normalizador is not None:
+        estado = normalizador.estado()
+        meta["normalizador"] = {"modo": estado["modo"], "n_amostras": estado["n_amostras"], "dtype": estado["dtype"]}
+        for nome in ("mins", "maxs", "media", "m2"):
+            if nome in estado:
+                arrays[f"norm_{nome}"] = estado[nome]
+
+    with open(caminho, "wb") as f:
+        np.savez(f, meta=np.array(json.dumps(meta)), **arrays)
+
+
+def carregar_modelo(caminho):
+    """
+    Carrega um arquivo de salvar_modelo.
+    retorna: dict com 'pesos' (tupla), 'ativacao_tipo', 'normalizador'
+    (Normalizador ou None) e 'mapa'
+    """
+    with np.load(caminho, allow_pickle=False) as dados:
+        meta = json.loads(str(dados["meta"]))
+        pesos = tuple(dados[f"peso_{i}"] for i in range(meta["n_pesos"]))
+        normalizador = None
+        if meta["normalizador"] is not None:
+            estado = dict(meta["normalizador"])
+            for nome in ("mins", "maxs", "media", "m2"):
+                if f"norm_{nome}" in dados:
+                    estado[nome] = dados[f"norm_{nome}"]
+            normalizador = Normalizador.de_estado(estado)
+
+    return {
+        "pesos": pesos,
+        "ativacao_tipo": meta["ativacao_tipo"],
+        "normalizador": normalizador,
+        "mapa": meta["mapa"],
+    }
+
+
 def detectar_dimensoes(X, y_encoded):
     input_dim = len(X[0])
     output_dim = len(y_encoded[0])
     return input_dim, output_dim
 
+class DetectorPlato:
+    """
+    Detecta platô no erro de treino por média/variância móveis em O(1)
+    por época (Welford com janela deslizante: entra o novo valor, sai o
+    mais antigo). Há platô quando a janela está cheia e o desvio padrão
+    fica <= limiar_std. A cada 'janela' atualizações as estatísticas são
+    recalculadas da janela (O(1) amortizado) para não acumular erro numérico.
+    """
+
+    def __init__(self, janela=10, limiar_std=1e-5):
+        self.janela = janela
+        self.limiar_std = limiar_std
+        self.reiniciar()
+
+    def reiniciar(self):
+        self._valores = deque()
+        self.media = 0.0
+        self._m2 = 0.0
+        self._desde_recalculo = 0
+
+    def adicionar(self, valor):
+        """Inclui o erro da época e retorna True se estiver em platô."""
+        if len(self._valores) == self.janela:
+            antigo = self._valores.popleft()
+            nova_media = self.media + (valor - antigo) / self.janela
+            self._m2 += (valor - antigo) * (valor - nova_media + antigo - self.media)
+            self.media = nova_media
+        else:
+            n = len(self._valores) + 1
+            delta = valor - self.media
+            self.media += delta / n
+            self._m2 += delta * (valor - self.media)
+        self._valores.append(valor)
+
+        self._desde_recalculo += 1
+        if self._desde_recalculo >= self.janela:
+            self._desde_recalculo = 0
+            self.media = sum(self._valores) / len(self._valores)
+            self._m2 = sum((v - self.media) ** 2 for v in self._valores)
+        return self.em_plato
+
+    @property
+    def desvio(self):
+        if not self._valores:
+            return 0.0
+        return max(self._m2, 0.0) ** 0.5 / len(self._valores) ** 0.5
+
+    @property
+    def em_plato(self):
+        return len(self._valores) == self.janela and self.desvio <= self.limiar_std
+
+
+def classes_de(y):
+    """Índice de classe por amostra a partir de índices, rótulos ou one-hot."""
+    y = np.asarray(y)
+    if y.ndim == 2:
+        return np.argmax(y, axis=1)
+    return np.unique(y, return_inverse=True)[1]
+
+
 def dividir_treino_teste(X, y, test_size=0.3, random_state=42):
-    """Divide os dados em conjuntos de treino e teste."""
-    try:
-        # TENTATIVA com estratificação (ideal para classificação)
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y,
-            test_size=test_size,
-            random_state=random_state,
-            stratify=y
-        )
-    except Exception as e:
-        print(f"Stratify falhou ({e}). Tentando sem estratificação...")
-        # FALLBACK sem stratify
-        X_train, X_test, y_train, y_test = train_test_split(
-            X, y,
-            test_size=test_size,
-            random_state=random_state,
-        )
-
-    print(f"Treino: {len(X_train)} amostras  |  Teste: {len(X_test)} amostras\n")
-    return X_train, X_test, y_train, y_test
+    """
+    Divide os dados em conjuntos de treino e teste, estratificado por
+    classe (cada classe contribui com ~test_size das suas amostras).
+    y: índices de classe, rótulos ou one-hot; X e y voltam como ndarray.
+    Se alguma classe tiver menos de 2 amostras, divide sem estratificação.
+    """
+    X = np.asarray(X)
+    y = np.asarray(y)
+    n = len(y)
+    n_teste = int(np.ceil(test_size * n)) if isinstance(test_size, float) else int(test_size)
+    if not 0 < n_teste < n:
+        raise ValueError(f"test_size={test_size} deixa treino ou teste vazio ({n} amostras)")
+
+    rng = np.random.default_rng(random_state)
+    classes = classes_de(y)
+    contagens = np.bincount(classes)
+    if contagens[contagens > 0].min() < 2:
+        print("Stratify falhou (classe com menos de 2 amostras). Dividindo sem estratificação...")
+        teste = rng.permutation(n)[:n_teste]
+    else:
+        # cota de teste por classe: proporcional, com o arredondamento
+        # distribuído pelos maiores restos (total exato = n_teste)
+        cotas = contagens * (n_teste / n)
+        por_classe = np.floor(cotas).astype(np.int64)
+        restos = np.argsort(-(cotas - por_classe), kind="stable")
+        por_classe[restos[:n_teste - por_classe.sum()]] += 1
+
+        # embaralha tudo uma vez e pega os primeiros 'por_classe[c]' de cada classe
+        ordem = rng.permutation(n)
+        ordem = ordem[np.argsort(classes[ordem], kind="stable")]
+        inicio_classe = np.concatenate(([0], np.cumsum(contagens)[:-1]))
+        posicao = np.arange(n) - inicio_classe[classes[ordem]]
+        teste = ordem[posicao < por_classe[classes[ordem]]]
+
+    mascara = np.zeros(n, dtype=bool)
+    mascara[teste] = True
+    treino = rng.permutation(np.flatnonzero(~mascara))
+    teste = rng.permutation(teste)
+    print(f"Treino: {len(treino)} amostras  |  Teste: {len(teste)} amostras\n")
+    return X[treino], X[teste], y[treino], y[teste]
+
+
+# -------------------------
+# Validação cruzada (k-fold estratificado) e métricas
+# -------------------------
+def dobras_estratificadas(y, k=5, repeticoes=1, seed=0):
+    """
+    Índices de k-fold estratificado, opcionalmente repetido com
+    embaralhamentos diferentes.
+    y: índices de classe (m) ou one-hot (m x n_classes)
+    retorna: lista de (repeticao, dobra, idx_treino, idx_teste); cada classe
+    é distribuída em rodízio entre as dobras, então toda dobra tem
+    praticamente a mesma proporção de classes do conjunto completo
+    """
+    y = classes_de(y)
+    if k < 2 or k > len(y):
+        raise ValueError(f"k deve estar entre 2 e o número de amostras ({len(y)}), recebido {k}")
+
+    rng = np.random.default_rng(seed)
+    divisoes = []
+    for repeticao in range(repeticoes):
+        dobra_de = np.empty(len(y), dtype=np.int64)
+        inicio = rng.integers(k)  # desloca o rodízio para não sobrecarregar a dobra 0
+        for classe in np.unique(y):
+            membros = rng.permutation(np.flatnonzero(y == classe))
+            dobra_de[membros] = (inicio + np.arange(len(membros))) % k
+            inicio = (inicio + len(membros)) % k
+        for dobra in range(k):
+            teste = dobra_de == dobra
+            divisoes.append((repeticao, dobra, np.flatnonzero(~teste), np.flatnonzero(teste)))
+    return divisoes
+
+
+def matriz_confusao(y_true, y_pred, n_classes=None):
+    """Matriz (n_classes x n_classes): linha = classe real, coluna = prevista."""
+    y_true = np.asarray(y_true, dtype=np.int64)
+    y_pred = np.asarray(y_pred, dtype=np.int64)
+    if n_classes is None:
+        n_classes = int(max(y_true.max(initial=-1), y_pred.max(initial=-1))) + 1
+    contagens = np.bincount(y_true * n_classes + y_pred, minlength=n_classes * n_classes)
+    return contagens.reshape(n_classes, n_classes)
@@ -0,0 +1,220 @@
+"""
+Varredura de hiperparâmetros (grid ou random search) em paralelo.
+
+- Espaço de busca: taxa, n_hidden, ativacao_tipo e batch_size;
+  n_hidden aceita também uma lista de camadas ocultas ([8, 4],
+  [(16, 'hiperbolica'), 8]) como em especificacao_camadas
+- Trials executados em um pool de processos; o dataset é copiado uma vez
+  para memória compartilhada e os workers só o anexam (somente leitura)
+- Trials ruins são podados cedo por successive halving: em cada rodada
+  todos treinam o mesmo orçamento de épocas (uma fração de max_epocas) e
+  só o melhor 1/eta segue para a próxima; os que chegam à última rodada
+  treinam max_epocas. O nº de épocas é o orçamento da busca, não um eixo
+  dela (trials com orçamentos diferentes não seriam comparáveis)
+- Resultado: tabela ordenada por acurácia de validação (e erro final)
+"""
+
+import argparse
+import itertools
+import math
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from compartilhado import criar_array_compartilhado, anexar_array, liberar
+from mlp import (especificacao_camadas, interpretar_camadas, inicializar_camadas, treinar_epoca_camadas,
+                 EspacoTrabalho, predict)
+from utils import carregar_csv_cache, indices_para_one_hot, dividir_treino_teste, Normalizador
+
+
+ESPACO_PADRAO = {
+    "taxa": [0.01, 0.1, 0.5],
+    "n_hidden": [2, 4, 8],
+    "ativacao_tipo": ["logistica", "hiperbolica"],
+    "batch_size": [1, 16],
+}
+
+# dataset anexado em cada worker (preenchido por _iniciar_worker)
+_DADOS = {}
+_BLOCOS = []
+
+
+def gerar_configuracoes(espaco, modo="grid", n_amostras=20, seed=None):
+    """
+    espaco: dict {hiperparâmetro: lista de valores}
+    modo 'grid' gera o produto cartesiano; 'random' sorteia n_amostras
+    combinações distintas desse produto.
+    """
+    nomes = list(espaco)
+    todas = [dict(zip(nomes, valores)) for valores in itertools.product(*(espaco[n] for n in nomes))]
+    if modo == "grid":
+        return todas
+    if modo == "random":
+        rng = random.Random(seed)
+        return rng.sample(todas, min(n_amostras, len(todas)))
+    raise ValueError(f"Modo de busca desconhecido: {modo}")
+
+
+def _iniciar_worker(descritores):
+    for nome, descritor in descritores.items():
+        shm, array = anexar_array(descritor)
+        _BLOCOS.append(shm)
+        _DADOS[nome] = array
+
+
+def _executar_trial(config, pesos, epoca_inicial, epoca_final, seed):
+    """Treina (ou continua) um trial até epoca_final e avalia na validação."""
+    X_train, Y_train = _DADOS["X_train"], _DADOS["Y_train"]
+    X_val, Y_val = _DADOS["X_val"], _DADOS["Y_val"]
+
+    inicio = time.perf_counter()
+    larguras, ativacoes = especificacao_camadas(config["n_hidden"], config["ativacao_tipo"])
+    if pesos is None:
+        random.seed(seed)
+        pesos = inicializar_camadas(X_train.shape[1], larguras, Y_train.shape[1])
+
+    erro = float("nan")
+    espaco = EspacoTrabalho(pesos, ativacoes, min(config["batch_size"] or len(X_train), len(X_train)))
+    for _ in range(epoca_inicial, epoca_final):
+        erro = treinar_epoca_camadas(X_train, Y_train, pesos, config["taxa"], ativacoes,
+                                     config["batch_size"], espaco=espaco)
+        if not math.isfinite(erro):
+            break
+
+    previsoes = predict(X_val, pesos, ativacoes)
+    acuracia = float(np.mean(previsoes == np.argmax(Y_val, axis=1)))
+    return pesos, erro, acuracia, time.perf_counter() - inicio
+
+
+def numero_rodadas(n_configs, eta):
+    """Rodadas do successive halving: 1 + quantas vezes n_configs pode ser dividido por eta (sem log em float)."""
+    rodadas = 1
+    if eta > 1:
+        while n_configs >= eta:
+            n_configs //= eta
+            rodadas += 1
+    return rodadas
+
+
+def executar_varredura(X_train, Y_train, X_val, Y_val, espaco=None, modo="grid",
+                       n_amostras=20, processos=None, eta=3, seed=0, max_epocas=2000):
+    """
+    Executa a varredura e retorna a lista de resultados (dicts) ordenada
+    da melhor para a pior configuração.
+    max_epocas: épocas dos trials que chegam à última rodada (as rodadas
+    anteriores treinam max_epocas / eta, / eta^2, ...)
+    """
+    espaco = espaco or ESPACO_PADRAO
+    if "epocas" in espaco:
+        raise ValueError("'epocas' não é um eixo da varredura; use max_epocas")
+    configs = gerar_configuracoes(espaco, modo, n_amostras, seed)
+    n_rodadas = numero_rodadas(len(configs), eta)
+
+    resultados = [
+        {**config, "acuracia": 0.0, "erro_final": float("nan"), "tempo": 0.0,
+         "epocas_executadas": 0, "status": "podado", "_pesos": None, "_seed": seed + i}
+        for i, config in enumerate(configs)
+    ]
+
+    blocos = []
+    descritores = {}
+    try:
+        for nome, array in (("X_train", X_train), ("Y_train", Y_train), ("X_val", X_val), ("Y_val", Y_val)):
+            shm, descritor, _ = criar_array_compartilhado(np.asarray(array, dtype=float))
+            blocos.append(shm)
+            descritores[nome] = descritor
+
+        vivos = list(range(len(resultados)))
+        with ProcessPoolExecutor(max_workers=processos or os.cpu_count(),
+                                 initializer=_iniciar_worker, initargs=(descritores,)) as pool:
+            for rodada in range(n_rodadas):
+                # mesmo orçamento para todos os trials da rodada (fração de max_epocas)
+                alvo = max(1, int(round(max_epocas * float(eta) ** (rodada - n_rodadas + 1))))
+                futuros = {}
+                for i in vivos:
+                    r = resultados[i]
+                    futuros[i] = (alvo, pool.submit(_executar_trial, configs[i], r["_pesos"],
+                                                    r["epocas_executadas"], alvo, r["_seed"]))
+
+                for i, (alvo, futuro) in futuros.items():
+                    pesos, erro, acuracia, tempo = futuro.result()
+                    r = resultados[i]
+                    r.update(_pesos=pesos, erro_final=erro, acuracia=acuracia,
+                             tempo=r["tempo"] + tempo, epocas_executadas=alvo)
+
+                if rodada == n_rodadas - 1:
+                    for i in vivos:
+                        resultados[i]["status"] = "completo"
+                    break
+
+                # successive halving: mantém o melhor 1/eta
+                vivos.sort(key=lambda i: _chave_ranking(resultados[i]))
+                vivos = vivos[:max(1, math.ceil(len(vivos) / eta))]
+    finally:
+        liberar(blocos)
+
+    for r in resultados:
+        del r["_pesos"], r["_seed"]
+    resultados.sort(key=lambda r: (r["status"] != "completo", _chave_ranking(r)))
+    return resultados
+
+
+def _chave_ranking(resultado):
+    erro = resultado["erro_final"]
+    return (-resultado["acuracia"], erro if math.isfinite(erro) else float("inf"))
+
+
+def imprimir_tabela(resultados):
+    colunas = ["#", "taxa", "n_hidden", "ativacao_tipo", "batch_size",
+               "acuracia", "erro_final", "tempo", "epocas_executadas", "status"]
+    print(" | ".join(colunas))
+    for pos, r in enumerate(resultados, start=1):
+        print(" | ".join([
+            str(pos), f"{r['taxa']:g}", str(r["n_hidden"]), r["ativacao_tipo"], str(r["batch_size"]), f"{r['acuracia']:.4f}", f"{r['erro_final']:.6f}",
+            f"{r['tempo']:.2f}s", str(r["epocas_executadas"]), r["status"],
+        ]))
+
+
+def _lista(tipo):
+    return lambda texto: [tipo(v) for v in texto.split(",")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Varredura de hiperparâmetros da MLP.")
+    parser.add_argument("caminho")
+    parser.add_argument("--modo", choices=["grid", "random"], default="grid")
+    parser.add_argument("--amostras", type=int, default=20, help="nº de trials no modo random")
+    parser.add_argument("--processos", type=int, default=None)
+    parser.add_argument("--eta", type=int, default=3, help="fator de poda do successive halving (1 = sem poda)")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--taxas", type=_lista(float), default=ESPACO_PADRAO["taxa"])
+    parser.add_argument("--ocultas", type=_lista(int), default=ESPACO_PADRAO["n_hidden"])
+    parser.add_argument("--camadas", type=lambda texto: [interpretar_camadas(v) for v in texto.split(";")],
+                        default=None, help="arquiteturas separadas por ';' (ex.: '8,4;16:hiperbolica,8'); "
+                                           "substitui --ocultas")
+    parser.add_argument("--ativacoes", type=_lista(str), default=ESPACO_PADRAO["ativacao_tipo"])
+    parser.add_argument("--epocas", type=int, default=2000,
+                        help="épocas dos trials que chegam à última rodada (as anteriores treinam frações disso)")
+    parser.add_argument("--lotes", type=_lista(int), default=ESPACO_PADRAO["batch_size"])
+    args = parser.parse_args()
+
+    X, y_indices, mapa = carregar_csv_cache(args.caminho)
+    Y = indices_para_one_hot(y_indices, len(mapa))
+    X_train, X_val, Y_train, Y_val = dividir_treino_teste(X, Y, test_size=0.3, random_state=args.seed)
+    normalizador = Normalizador("minmax").fit(X_train)
+
+    espaco = {
+        "taxa": args.taxas,
+        "n_hidden": args.camadas or args.ocultas,
+        "ativacao_tipo": args.ativacoes,
+        "batch_size": args.lotes,
+    }
+    resultados = executar_varredura(
+        normalizador.transform(X_train), Y_train, normalizador.transform(X_val), Y_val,
+        espaco=espaco, modo=args.modo, n_amostras=args.amostras,
+        processos=args.processos, eta=args.eta, seed=args.seed, max_epocas=args.epocas,
+    )
+    imprimir_tabela(resultados)
@@ -0,0 +1,110 @@
+"""
+Tempo de inicialização a frio (importações) do backend e da GUI.
+
+Uso:
+    python benchmarks/bench_importacao.py [--repeticoes 7] [--saida importacao.json] [--detalhes 10]
+
+Cada caso roda em um interpretador novo (python -X importtime), então mede
+o custo real de importar os módulos e não o cache de sys.modules: 'parede'
+é o tempo total do processo e 'importações' a soma das importações de
+topo informada pelo próprio interpretador. Para a GUI, mede até a janela
+estar visível (QT_QPA_PLATFORM=offscreen) e confere que matplotlib/sklearn
+ainda não foram carregados nesse ponto. Casos cujas dependências não estão
+instaladas aparecem como ignorados.
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BACKEND = os.path.join(RAIZ, "backend")
+DESKTOP = os.path.join(RAIZ, "desktop")
+
+# nome -> código executado no interpretador novo (cwd = backend)
+CASOS = {
+    "numpy (referência)": "import numpy",
+    "sklearn.model_selection (referência)": "import sklearn.model_selection",
+    "backend: mlp + utils": "import mlp, utils",
+    "backend: main.py --help": (
+        "import sys, runpy; sys.argv = ['main.py', '--help']\n"
+        "try:\n    runpy.run_path('main.py', run_name='__main__')\nexcept SystemExit:\n    pass"
+    ),
+    "desktop: janela visível": (
+        f"import os, sys; os.environ.setdefault('QT_QPA_PLATFORM', 'offscreen'); sys.path.insert(0, {DESKTOP!r})\n"
+        "from PySide6.QtWidgets import QApplication\n"
+        "import main\n"
+        "app = QApplication(sys.argv); janela = main.MainWindow(); janela.show(); app.processEvents()\n"
+        "carregados = [m for m in ('matplotlib', 'sklearn') if m in sys.modules]\n"
+        "print('CARREGADOS=' + ','.join(carregados), file=sys.stderr)"
+    ),
+}
+
+
+def _executar(codigo):
+    """
+    Roda o código em um interpretador novo.
+    retorna: (parede_s, importacoes_s, [(cumulativo_s, módulo de topo)], demais linhas do stderr) ou None
+    """
+    inicio = time.perf_counter()
+    processo = subprocess.run([sys.executable, "-X", "importtime", "-c", codigo], cwd=BACKEND,
+                              capture_output=True, text=True)
+    parede = time.perf_counter() - inicio
+    if processo.returncode != 0:
+        return None
+    modulos = []
+    outras = []
+    for linha in processo.stderr.splitlines():
+        if not linha.startswith("import time:"):
+            outras.append(linha)
+            continue
+        partes = linha[len("import time:"):].split("|")
+        if len(partes) != 3 or not partes[1].strip().isdigit():
+            continue  # cabeçalho
+        if not partes[2].startswith("  "):  # só importações de topo (as aninhadas têm recuo)
+            modulos.append((int(partes[1]) / 1e6, partes[2].strip()))
+    return parede, sum(t for t, _ in modulos), modulos, "\n".join(outras)
+
+
+def medir(repeticoes, detalhes):
+    relatorio = {}
+    for nome, codigo in CASOS.items():
+        execucoes = [_executar(codigo) for _ in range(repeticoes)]
+        if any(e is None for e in execucoes):
+            print(f"{nome:<40} ignorado (dependência ausente ou erro)")
+            relatorio[nome] = None
+            continue
+        paredes = [e[0] for e in execucoes]
+        importacoes = [e[1] for e in execucoes]
+        medida = {"parede_mediana_s": statistics.median(paredes), "parede_min_s": min(paredes),
+                  "importacoes_mediana_s": statistics.median(importacoes)}
+        extra = ""
+        for linha in execucoes[-1][3].splitlines():
+            if linha.startswith("CARREGADOS="):
+                medida["carregados"] = [m for m in linha.split("=", 1)[1].split(",") if m]
+                extra = f"  carregados na abertura: {', '.join(medida['carregados']) or 'nenhum pesado'}"
+        relatorio[nome] = medida
+        print(f"{nome:<40} parede={medida['parede_mediana_s'] * 1e3:8.1f}ms  "
+              f"importações={medida['importacoes_mediana_s'] * 1e3:8.1f}ms{extra}")
+        if detalhes:
+            for tempo, modulo in sorted(execucoes[-1][2], reverse=True)[:detalhes]:
+                print(f"    {tempo * 1e3:8.1f}ms  {modulo}")
+    return relatorio
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo de importação a frio do backend e da GUI.")
+    parser.add_argument("--repeticoes", type=int, default=7)
+    parser.add_argument("--saida", help="grava o relatório em JSON")
+    parser.add_argument("--detalhes", type=int, default=0, help="mostra os N módulos de topo mais lentos")
+    args = parser.parse_args()
+
+    relatorio = medir(args.repeticoes, args.detalhes)
+    if args.saida:
+        with open(args.saida, "w") as f:
+            json.dump(relatorio, f, indent=2)
+        print(f"\nRelatório salvo em {args.saida}")
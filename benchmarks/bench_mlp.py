@@ -0,0 +1,327 @@
+"""
+Benchmarks dos caminhos críticos da MLP e do pipeline de dados.
+
+Uso:
+    python benchmarks/bench_mlp.py executar --saida base.json [--rapido]
+    python benchmarks/bench_mlp.py comparar base.json novo.json [--limite 1.10]
+
+'executar' gera CSVs sintéticos (no mesmo formato de
+backend/Base_Treinamento_Iris.csv) varrendo linhas x atributos x classes e
+larguras da camada oculta, mede cada função e grava um JSON. Também treina
+a mesma rede em float64 e float32 (mesma inicialização) e registra a
+diferença de acurácia e das saídas em "precisao", e compara a saída
+logística com erro quadrático contra softmax com entropia cruzada (alvos
+one-hot x índices inteiros) em "saidas".
+'comparar' casa os casos dos dois arquivos e marca como REGRESSÃO os que
+ficaram mais lentos que o limite (razão novo/base); sai com código 1 se
+houver alguma.
+"""
+
+import argparse
+import itertools
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "backend"))
+
+from mlp import (  # noqa: E402
+    inicializar_pesos, inicializar_camadas, forward_pass, backpropagation, treinar_epoca, treinar_epoca_camadas,
+    EspacoTrabalho, predict, predict_proba,
+)
+from carregador import CarregadorLotes  # noqa: E402
+from ensemble import inicializar_ensemble, treinar_epoca_ensemble  # noqa: E402
+from utils import ler_csv, preparar_dados, normalizar_dados, codificar_classes, dividir_treino_teste  # noqa: E402
+
+IRIS = os.path.join(RAIZ, "backend", "Base_Treinamento_Iris.csv")
+
+GRADE_COMPLETA = {
+    "linhas": [1000, 10000, 100000],
+    "atributos": [4, 32],
+    "classes": [3, 10],
+    "ocultos": [8, 64],
+}
+GRADE_RAPIDA = {
+    "linhas": [1000, 10000],
+    "atributos": [4],
+    "classes": [3],
+    "ocultos": [8],
+}
+
+
+def gerar_csv_sintetico(caminho, linhas, atributos, classes, seed=0):
+    """Grava um CSV com cabeçalho, atributos float e rótulo textual na última coluna."""
+    rng = np.random.default_rng(seed)
+    rotulos = rng.integers(0, classes, size=linhas)
+    # classes separáveis: centro diferente por classe + ruído
+    centros = rng.uniform(0, 10, size=(classes, atributos))
+    X = centros[rotulos] + rng.normal(0, 1.0, size=(linhas, atributos))
+    with open(caminho, "w", encoding="utf-8") as f:
+        f.write(",".join(f"atr_{i}" for i in range(atributos)) + "\n")
+        for linha, rotulo in zip(X, rotulos):
+            f.write(",".join(f"{v:.4f}" for v in linha) + f",classe_{rotulo}\n")
+
+
+def medir(funcao, repeticoes=5, minimo_s=0.05):
+    """
+    Chama funcao() repetidas vezes (em laços internos até somar minimo_s)
+    e retorna estatísticas do tempo por chamada.
+    """
+    funcao()  # aquecimento
+    n = 1
+    while True:
+        inicio = time.perf_counter()
+        for _ in range(n):
+            funcao()
+        decorrido = time.perf_counter() - inicio
+        if decorrido >= minimo_s or n >= 1 << 20:
+            break
+        n *= 2
+
+    tempos = [decorrido / n]
+    for _ in range(repeticoes - 1):
+        inicio = time.perf_counter()
+        for _ in range(n):
+            funcao()
+        tempos.append((time.perf_counter() - inicio) / n)
+    return {"mediana_s": statistics.median(tempos), "min_s": min(tempos), "repeticoes": repeticoes, "chamadas": n}
+
+
+def _casos_dados(caminho, X, y, X_norm, y_encoded, caso):
+    yield "ler_csv", caso, lambda: ler_csv(caminho)
+    yield "normalizar_dados", caso, lambda: normalizar_dados(X)
+    yield "codificar_classes", caso, lambda: codificar_classes(y)
+    yield "dividir_treino_teste", caso, lambda: dividir_treino_teste(X_norm, y_encoded)
+
+    # uma época de mini-lotes sem treinar: custo só da ordem + cópia dos lotes
+    Xa, Ya = np.asarray(X_norm, dtype=float), np.asarray(y_encoded, dtype=float)
+    for amostragem in ("sequencial", "aleatoria", "estratificada"):
+        for prefetch in (False, True):
+            carregador = CarregadorLotes(Xa, Ya, 64, amostragem, prefetch, seed=0)
+            yield f"CarregadorLotes[{amostragem},lote=64{',prefetch' if prefetch else ''}]", caso, \
+                lambda carregador=carregador: sum(1 for _ in carregador)
+
+
+def _casos_mlp(X_norm, y_encoded, caso, ocultos):
+    X = np.asarray(X_norm, dtype=float)
+    Y = np.asarray(y_encoded, dtype=float)
+    random.seed(0)
+    pesos = inicializar_pesos(X.shape[1], ocultos, Y.shape[1])
+    W1, B1, W2, B2 = pesos
+    caso = dict(caso, ocultos=ocultos)
+
+    x0, y0 = X[0], Y[0]
+    hidden, output = forward_pass(x0, *pesos)
+    yield "forward_pass", caso, lambda: forward_pass(x0, *pesos)
+    yield "backpropagation", caso, lambda: backpropagation(x0, y0, hidden, output, W1, B1, W2, B2, 1e-6)
+    yield "treinar_epoca[lote=1]", caso, lambda: treinar_epoca(X, Y, W1, B1, W2, B2, 1e-6)
+    yield "treinar_epoca[lote=64]", caso, lambda: treinar_epoca(X, Y, W1, B1, W2, B2, 1e-6, batch_size=64)
+
+    # duas camadas ocultas, buffers reaproveitados entre épocas
+    profunda = inicializar_camadas(X.shape[1], [ocultos, ocultos], Y.shape[1])
+    espaco = EspacoTrabalho(profunda, capacidade=64)
+    yield "treinar_epoca_camadas[2x,lote=64]", caso, \
+        lambda: treinar_epoca_camadas(X, Y, profunda, 1e-6, batch_size=64, espaco=espaco)
+
+    # saída softmax + entropia cruzada com alvos como índices de classe
+    rotulos = np.argmax(Y, axis=1).astype(np.int32)
+    ativacoes_softmax = ["logistica", "softmax"]
+    pesos_softmax = tuple(p.copy() for p in pesos)
+    espaco_softmax = EspacoTrabalho(pesos_softmax, ativacoes_softmax, capacidade=64)
+    yield "treinar_epoca_camadas[lote=64,softmax]", caso, \
+        lambda: treinar_epoca_camadas(X, rotulos, pesos_softmax, 1e-6, ativacoes_softmax, batch_size=64,
+                                      espaco=espaco_softmax)
+
+    # 8 membros empilhados (um matmul por camada para todos) x 8 épocas de uma rede só
+    ensemble = inicializar_ensemble(X.shape[1], [ocultos], Y.shape[1], range(8))
+    espaco_ensemble = EspacoTrabalho(ensemble, capacidade=64)
+    yield "treinar_epoca_ensemble[8 membros,lote=64]", caso, \
+        lambda: treinar_epoca_ensemble(X, Y, ensemble, 1e-6, batch_size=64, espaco=espaco_ensemble)
+    espaco_sozinho = EspacoTrabalho(pesos, capacidade=64)
+    yield "treinar_epoca_camadas[8x sequencial,lote=64]", caso, \
+        lambda: [treinar_epoca_camadas(X, Y, pesos, 1e-6, batch_size=64, espaco=espaco_sozinho) for _ in range(8)]
+
+    # mesma rede em float32 (dados convertidos uma vez, como no treino real)
+    X32, Y32 = X.astype(np.float32), Y.astype(np.float32)
+    pesos32 = tuple(p.astype(np.float32) for p in pesos)
+    espaco32 = EspacoTrabalho(pesos32, capacidade=64)
+    yield "treinar_epoca_camadas[lote=64,float32]", caso, \
+        lambda: treinar_epoca_camadas(X32, Y32, pesos32, 1e-6, batch_size=64, espaco=espaco32)
+    yield "predict_proba", caso, lambda: predict_proba(X, pesos)
+    yield "predict_proba[float32]", caso, lambda: predict_proba(X32, pesos32)
+
+
+def comparar_precisao(X_norm, y_encoded, ocultos, epocas=50, batch_size=16, taxa=0.5):
+    """
+    Treina a mesma rede (mesma inicialização e ordem) em float64 e float32
+    e compara acurácia no próprio conjunto e a maior diferença nas saídas.
+    """
+    X = np.asarray(X_norm, dtype=float)
+    Y = np.asarray(y_encoded, dtype=float)
+    rotulos = np.argmax(Y, axis=1)
+    random.seed(0)
+    base = inicializar_pesos(X.shape[1], ocultos, Y.shape[1])
+
+    resultado = {}
+    saidas = {}
+    for dtype in (np.float64, np.float32):
+        pesos = tuple(p.astype(dtype) for p in base)
+        Xd, Yd = X.astype(dtype), Y.astype(dtype)
+        espaco = EspacoTrabalho(pesos, capacidade=batch_size)
+        for _ in range(epocas):
+            erro = treinar_epoca_camadas(Xd, Yd, pesos, taxa, batch_size=batch_size, espaco=espaco)
+        nome = np.dtype(dtype).name
+        saidas[nome] = predict_proba(Xd, pesos)
+        resultado[f"acuracia_{nome}"] = float(np.mean(predict(Xd, pesos) == rotulos))
+        resultado[f"erro_{nome}"] = erro
+    resultado["diferenca_acuracia"] = resultado["acuracia_float32"] - resultado["acuracia_float64"]
+    resultado["max_diferenca_saida"] = float(np.max(np.abs(saidas["float64"] - saidas["float32"])))
+    return resultado
+
+
+def comparar_saidas(X_norm, y_encoded, ocultos, epocas=50, batch_size=16, taxa=0.5):
+    """
+    Treina a mesma rede (mesma inicialização e ordem) com saída logística +
+    erro quadrático e com softmax + entropia cruzada, e compara a acurácia
+    e a memória dos alvos (one-hot em float64 x índices int32).
+    """
+    X = np.asarray(X_norm, dtype=float)
+    Y = np.asarray(y_encoded, dtype=float)
+    rotulos = np.argmax(Y, axis=1).astype(np.int32)
+    random.seed(0)
+    base = inicializar_pesos(X.shape[1], ocultos, Y.shape[1])
+
+    resultado = {"bytes_alvos_onehot": Y.nbytes, "bytes_alvos_indices": rotulos.nbytes}
+    for nome, ativacoes, alvos in (("logistica", "logistica", Y), ("softmax", ["logistica", "softmax"], rotulos)):
+        pesos = tuple(p.copy() for p in base)
+        espaco = EspacoTrabalho(pesos, ativacoes, capacidade=batch_size)
+        inicio = time.perf_counter()
+        for _ in range(epocas):
+            erro = treinar_epoca_camadas(X, alvos, pesos, taxa, ativacoes, batch_size=batch_size, espaco=espaco)
+        resultado[f"tempo_{nome}_s"] = time.perf_counter() - inicio
+        resultado[f"acuracia_{nome}"] = float(np.mean(predict(X, pesos, ativacoes) == rotulos))
+        resultado[f"perda_{nome}"] = erro
+    return resultado
+
+
+def executar(grade, saida, repeticoes, diretorio=None):
+    resultados = []
+    precisao = []
+    saidas = []
+    with tempfile.TemporaryDirectory() as tmp:
+        diretorio = diretorio or tmp
+        caminhos = [IRIS]
+        for linhas, atributos, classes in itertools.product(grade["linhas"], grade["atributos"], grade["classes"]):
+            caminho = os.path.join(diretorio, f"sintetico_{linhas}x{atributos}x{classes}.csv")
+            if not os.path.exists(caminho):
+                gerar_csv_sintetico(caminho, linhas, atributos, classes)
+            caminhos.append(caminho)
+
+        for caminho in caminhos:
+            X, y = preparar_dados(ler_csv(caminho))
+            X_norm = normalizar_dados(X)
+            y_encoded, _ = codificar_classes(y)
+            caso = {"dataset": os.path.basename(caminho), "linhas": len(X),
+                    "atributos": len(X[0]), "classes": len(set(y))}
+
+            casos = list(_casos_dados(caminho, X, y, X_norm, y_encoded, caso))
+            for ocultos in grade["ocultos"]:
+                casos += list(_casos_mlp(X_norm, y_encoded, caso, ocultos))
+
+            for ocultos in grade["ocultos"]:
+                comparacao = dict(caso, ocultos=ocultos, **comparar_precisao(X_norm, y_encoded, ocultos))
+                precisao.append(comparacao)
+                print(f"{'float32 vs float64':<24} {json.dumps(caso)} ocultos={ocultos}  "
+                      f"acurácia {comparacao['acuracia_float64']:.4f} -> {comparacao['acuracia_float32']:.4f}  "
+                      f"máx |Δsaída|={comparacao['max_diferenca_saida']:.2e}")
+                comparacao = dict(caso, ocultos=ocultos, **comparar_saidas(X_norm, y_encoded, ocultos))
+                saidas.append(comparacao)
+                print(f"{'logística vs softmax':<24} {json.dumps(caso)} ocultos={ocultos}  "
+                      f"acurácia {comparacao['acuracia_logistica']:.4f} -> {comparacao['acuracia_softmax']:.4f}  "
+                      f"alvos {comparacao['bytes_alvos_onehot']} -> {comparacao['bytes_alvos_indices']} bytes")
+
+            for nome, parametros, funcao in casos:
+                medida = medir(funcao, repeticoes)
+                resultados.append({"nome": nome, **parametros, **medida})
+                print(f"{nome:<24} {json.dumps(parametros)}  mediana={medida['mediana_s']:.6f}s")
+
+    relatorio = {
+        "meta": {
+            "python": platform.python_version(),
+            "numpy": np.__version__,
+            "plataforma": platform.platform(),
+            "processador": platform.processor(),
+            "data": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "resultados": resultados,
+        "precisao": precisao,
+        "saidas": saidas,
+    }
+    with open(saida, "w", encoding="utf-8") as f:
+        json.dump(relatorio, f, indent=2)
+    print(f"\nResultados gravados em {saida}")
+    return relatorio
+
+
+def _chave(resultado):
+    return tuple((k, resultado.get(k)) for k in ("nome", "dataset", "linhas", "atributos", "classes", "ocultos"))
+
+
+def comparar(arquivo_base, arquivo_novo, limite=1.10):
+    """Imprime a razão novo/base por caso; retorna a lista de regressões."""
+    with open(arquivo_base, encoding="utf-8") as f:
+        base = {_chave(r): r for r in json.load(f)["resultados"]}
+    with open(arquivo_novo, encoding="utf-8") as f:
+        novo = {_chave(r): r for r in json.load(f)["resultados"]}
+
+    regressoes = []
+    for chave in sorted(base.keys() & novo.keys(), key=str):
+        t_base = base[chave]["mediana_s"]
+        t_novo = novo[chave]["mediana_s"]
+        razao = t_novo / t_base if t_base > 0 else float("inf")
+        marca = ""
+        if razao > limite:
+            marca = "REGRESSÃO"
+            regressoes.append((chave, razao))
+        elif razao < 1.0 / limite:
+            marca = "melhora"
+        descricao = " ".join(f"{k}={v}" for k, v in chave if v is not None)
+        print(f"{razao:8.2f}x  {t_base:.6f}s -> {t_novo:.6f}s  {descricao}  {marca}")
+
+    for chave in sorted(base.keys() ^ novo.keys(), key=str):
+        print(f"(sem par) {' '.join(f'{k}={v}' for k, v in chave if v is not None)}")
+
+    print(f"\n{len(regressoes)} regressão(ões) acima de {limite:.2f}x")
+    return regressoes
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmarks da MLP e do pipeline de dados.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p_exec = sub.add_parser("executar", help="roda os benchmarks e grava JSON")
+    p_exec.add_argument("--saida", default="bench_resultados.json")
+    p_exec.add_argument("--rapido", action="store_true", help="grade reduzida (para checagens rápidas)")
+    p_exec.add_argument("--repeticoes", type=int, default=5)
+    p_exec.add_argument("--dados", help="diretório para manter os CSVs sintéticos entre execuções")
+
+    p_comp = sub.add_parser("comparar", help="compara dois JSONs e sinaliza regressões")
+    p_comp.add_argument("base")
+    p_comp.add_argument("novo")
+    p_comp.add_argument("--limite", type=float, default=1.10, help="razão novo/base considerada regressão")
+
+    args = parser.parse_args()
+    if args.comando == "executar":
+        if args.dados:
+            os.makedirs(args.dados, exist_ok=True)
+        executar(GRADE_RAPIDA if args.rapido else GRADE_COMPLETA, args.saida, args.repeticoes, args.dados)
+    else:
+        sys.exit(1 if comparar(args.base, args.novo, args.limite) else 0)
@@ -0,0 +1,103 @@
+"""
+Tempo de parede (e épocas) até atingir um erro alvo, por otimizador e
+agendador, comparado ao SGD de taxa fixa.
+
+Uso:
+    python benchmarks/bench_otimizadores.py [--alvo 0.02] [--saida otimizadores.json]
+
+Cada combinação roda com as mesmas sementes; a coluna 'vs SGD' é a razão
+entre a mediana do tempo até o alvo do SGD constante e a da combinação
+(> 1 = mais rápido que o SGD).
+"""
+
+import argparse
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "backend"))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from mlp import inicializar_pesos, treinar_epoca, criar_otimizador, criar_agendador  # noqa: E402
+from utils import ler_csv, preparar_dados, normalizar_dados, codificar_classes  # noqa: E402
+from bench_mlp import IRIS, gerar_csv_sintetico  # noqa: E402
+
+# taxa base de cada otimizador (os adaptativos usam passos menores)
+TAXAS = {"sgd": 0.5, "momentum": 0.5, "nesterov": 0.5, "rmsprop": 0.01, "adam": 0.02}
+AGENDADORES = [None, "degrau", "exponencial", "cosseno", "warmup", "plato"]
+
+
+def tempo_ate_alvo(X, Y, n_hidden, otimizador, agendador, alvo, max_epocas, batch_size, seed):
+    random.seed(seed)
+    W1, B1, W2, B2 = inicializar_pesos(X.shape[1], n_hidden, Y.shape[1])
+    otim = criar_otimizador(otimizador, TAXAS[otimizador])
+    agenda = criar_agendador(agendador, max_epocas)
+
+    inicio = time.perf_counter()
+    erro = None
+    for epoca in range(max_epocas):
+        if agenda is not None:
+            agenda.ajustar(otim, epoca, erro)
+        erro = treinar_epoca(X, Y, W1, B1, W2, B2, batch_size=batch_size, otimizador=otim)
+        if erro <= alvo:
+            return epoca + 1, time.perf_counter() - inicio, erro
+    return None, time.perf_counter() - inicio, erro
+
+
+def carregar(caminho):
+    X, y = preparar_dados(ler_csv(caminho))
+    y_encoded, _ = codificar_classes(y)
+    return np.asarray(normalizar_dados(X), dtype=float), np.asarray(y_encoded, dtype=float)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tempo até erro alvo por otimizador/agendador.")
+    parser.add_argument("--alvo", type=float, default=0.02)
+    parser.add_argument("--max-epocas", type=int, default=3000)
+    parser.add_argument("--lote", type=int, default=16)
+    parser.add_argument("--sementes", type=int, default=3)
+    parser.add_argument("--saida", default="bench_otimizadores.json")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        sintetico = os.path.join(tmp, "sintetico_5000x16x5.csv")
+        gerar_csv_sintetico(sintetico, 5000, 16, 5)
+        datasets = {os.path.basename(IRIS): carregar(IRIS), os.path.basename(sintetico): carregar(sintetico)}
+
+    resultados = []
+    for nome_dataset, (X, Y) in datasets.items():
+        n_hidden = max(1, (X.shape[1] + Y.shape[1]) // 2)
+        referencia = None
+        for otimizador in TAXAS:
+            for agendador in AGENDADORES:
+                medidas = [tempo_ate_alvo(X, Y, n_hidden, otimizador, agendador, args.alvo,
+                                          args.max_epocas, args.lote, seed) for seed in range(args.sementes)]
+                atingiu = [m for m in medidas if m[0] is not None]
+                tempo = statistics.median(m[1] for m in atingiu) if atingiu else float("inf")
+                epocas = statistics.median(m[0] for m in atingiu) if atingiu else None
+                if otimizador == "sgd" and agendador is None:
+                    referencia = tempo
+                resultado = {
+                    "dataset": nome_dataset,
+                    "otimizador": otimizador,
+                    "agendador": agendador or "constante",
+                    "atingiu": f"{len(atingiu)}/{len(medidas)}",
+                    "epocas_mediana": epocas,
+                    "tempo_mediana_s": tempo if atingiu else None,
+                    "vs_sgd": referencia / tempo if atingiu and referencia not in (None, float("inf")) else None,
+                }
+                resultados.append(resultado)
+                vs = f"{resultado['vs_sgd']:.2f}x" if resultado["vs_sgd"] else "-"
+                print(f"{nome_dataset:<28} {otimizador:<9} {resultado['agendador']:<12} "
+                      f"atingiu={resultado['atingiu']}  épocas={epocas}  tempo={tempo:.3f}s  vs SGD={vs}")
+
+    with open(args.saida, "w", encoding="utf-8") as f:
+        json.dump({"alvo": args.alvo, "lote": args.lote, "resultados": resultados}, f, indent=2)
+    print(f"\nResultados gravados em {args.saida}")
@@ -0,0 +1,113 @@
+"""
+Gerador de carga para backend/servidor.py (localhost).
+
+Uso:
+    python benchmarks/carga_servidor.py [--porta 8765 | --unix /tmp/mlp.sock]
+                                        [--conexoes 64] [--requisicoes 20000] [--amostras 1]
+
+Abre 'conexoes' conexões keep-alive, divide 'requisicoes' POST /predict
+entre elas (cada uma com 'amostras' linhas aleatórias no número de
+atributos do modelo) e reporta vazão e latência do lado do cliente, além
+do /stats do servidor (tamanho médio dos micro-lotes).
+"""
+
+import argparse
+import asyncio
+import json
+import time
+
+import numpy as np
+
+
+async def _requisicao(reader, writer, metodo, caminho, dados=None):
+    corpo = json.dumps(dados).encode("utf-8") if dados is not None else b""
+    writer.write(
+        f"{metodo} {caminho} HTTP/1.1\r\nHost: localhost\r\n"
+        f"Content-Type: application/json\r\nContent-Length: {len(corpo)}\r\n\r\n".encode("latin-1") + corpo
+    )
+    await writer.drain()
+
+    status = int((await reader.readline()).split()[1])
+    tamanho = 0
+    while True:
+        linha = await reader.readline()
+        if linha in (b"\r\n", b""):
+            break
+        nome, _, valor = linha.decode("latin-1").partition(":")
+        if nome.strip().lower() == "content-length":
+            tamanho = int(valor)
+    resposta = json.loads(await reader.readexactly(tamanho))
+    if status != 200:
+        raise RuntimeError(f"HTTP {status}: {resposta}")
+    return resposta
+
+
+async def _conectar(args):
+    if args.unix:
+        return await asyncio.open_unix_connection(args.unix)
+    return await asyncio.open_connection(args.host, args.porta)
+
+
+async def _cliente(args, n_requisicoes, n_atributos, latencias, seed):
+    rng = np.random.default_rng(seed)
+    reader, writer = await _conectar(args)
+    try:
+        for _ in range(n_requisicoes):
+            dados = {"amostras": rng.uniform(0, 10, size=(args.amostras, n_atributos)).tolist()}
+            inicio = time.perf_counter()
+            await _requisicao(reader, writer, "POST", "/predict", dados)
+            latencias.append(time.perf_counter() - inicio)
+    finally:
+        writer.close()
+
+
+async def _descobrir_atributos(args):
+    """Envia amostras de tamanho crescente até o servidor aceitar (sem precisar do .npz)."""
+    reader, writer = await _conectar(args)
+    try:
+        for n in range(1, 4097):
+            try:
+                await _requisicao(reader, writer, "POST", "/predict", {"amostra": [0.0] * n})
+                return n
+            except RuntimeError:
+                continue
+    finally:
+        writer.close()
+    raise RuntimeError("não foi possível descobrir o número de atributos do modelo")
+
+
+async def executar(args):
+    n_atributos = args.atributos or await _descobrir_atributos(args)
+    latencias = []
+    por_conexao = [args.requisicoes // args.conexoes + (i < args.requisicoes % args.conexoes)
+                   for i in range(args.conexoes)]
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(_cliente(args, n, n_atributos, latencias, i) for i, n in enumerate(por_conexao)))
+    decorrido = time.perf_counter() - inicio
+
+    reader, writer = await _conectar(args)
+    try:
+        stats = await _requisicao(reader, writer, "GET", "/stats")
+    finally:
+        writer.close()
+
+    p50, p95, p99 = np.percentile(latencias, [50, 95, 99]) * 1e3
+    print(f"{len(latencias)} requisições em {decorrido:.2f}s com {args.conexoes} conexões "
+          f"({args.amostras} amostra(s) por requisição)")
+    print(f"vazão: {len(latencias) / decorrido:.0f} req/s, {len(latencias) * args.amostras / decorrido:.0f} amostras/s")
+    print(f"latência cliente: p50={p50:.2f}ms  p95={p95:.2f}ms  p99={p99:.2f}ms")
+    print(f"servidor: {stats['lotes']} lotes, {stats['requisicoes_por_lote']:.1f} requisições/lote")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Gerador de carga para o servidor de inferência.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--porta", type=int, default=8765)
+    parser.add_argument("--unix", help="socket Unix do servidor")
+    parser.add_argument("--conexoes", type=int, default=64)
+    parser.add_argument("--requisicoes", type=int, default=20000)
+    parser.add_argument("--amostras", type=int, default=1, help="linhas por requisição")
+    parser.add_argument("--atributos", type=int, help="atributos por amostra (padrão: descobre no servidor)")
+    args = parser.parse_args()
+    asyncio.run(executar(args))
@@ -0,0 +1,49 @@
+"""
+Histórico de erro decimado para o gráfico ao vivo.
+
+Mantém no máximo ~max_pontos pontos (época, erro): quando o buffer enche,
+descarta um ponto a cada dois e dobra o passo de amostragem (contado em
+pontos recebidos, então serve também para séries esparsas como a da
+validação, que chega a cada k épocas). O custo por
+atualização é O(1) amortizado e o custo de desenho fica constante, não
+importa quantas épocas o treino tenha.
+"""
+
+
+class HistoricoDecimado:
+    def __init__(self, max_pontos=2000):
+        self.max_pontos = max_pontos
+        self.passo = 1
+        self.epocas = []
+        self.erros = []
+        self._indices = []  # nº de ordem de cada ponto mantido
+        self._recebidos = 0
+        self.ultimo = None  # último (época, erro) recebido, mesmo se descartado
+
+    def limpar(self):
+        self.__init__(self.max_pontos)
+
+    def adicionar(self, pontos):
+        """pontos: iterável de (época, erro)."""
+        for epoca, erro in pontos:
+            self.ultimo = (epoca, erro)
+            indice = self._recebidos
+            self._recebidos += 1
+            if indice % self.passo:
+                continue
+            self.epocas.append(epoca)
+            self.erros.append(erro)
+            self._indices.append(indice)
+            if len(self.epocas) > self.max_pontos:
+                # mantém apenas os pontos alinhados ao novo passo
+                self.passo *= 2
+                mantidos = [i for i, n in enumerate(self._indices) if n % self.passo == 0]
+                self.epocas = [self.epocas[i] for i in mantidos]
+                self.erros = [self.erros[i] for i in mantidos]
+                self._indices = [self._indices[i] for i in mantidos]
+
+    def dados(self):
+        """Retorna (épocas, erros) prontos para Line2D.set_data, incluindo o último ponto."""
+        if self.ultimo is not None and (not self.epocas or self.epocas[-1] != self.ultimo[0]):
+            return self.epocas + [self.ultimo[0]], self.erros + [self.ultimo[1]]
+        return self.epocas, self.erros
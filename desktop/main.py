@@ -4,17 +4,24 @@ sys.path.append(os.path.join(os.path.dirname(__file__), '../backend'))
 
 from PySide6.QtWidgets import (
     QApplication, QMainWindow, QWidget, QVBoxLayout, QHBoxLayout,
-    QPushButton, QFileDialog, QLabel, QTableWidget, QTableWidgetItem,
-    QSpinBox, QDoubleSpinBox, QComboBox, QMessageBox
+    QPushButton, QFileDialog, QLabel, QTableView, QHeaderView,
+    QSpinBox, QDoubleSpinBox, QComboBox, QMessageBox, QCheckBox, QLineEdit
 )
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-from sklearn.metrics import confusion_matrix, ConfusionMatrixDisplay
 import numpy as np
-from sklearn.model_selection import train_test_split
-from utils import ler_csv, preparar_dados, normalizar_dados, codificar_classes, dividir_treino_teste
-from mlp import forward_pass
-from trainer_thread import TrainerThread
+from utils import (
+    carregar_csv_cache, indices_para_one_hot, dividir_treino_teste, Normalizador, salvar_modelo,
+    matriz_confusao,
+)
+from mlp import predict, interpretar_camadas
+from checkpoint import GravadorCheckpoints, carregar_checkpoint, novo_diretorio_execucao
+from trainer_thread import TrainerThread, ValidacaoCruzadaThread
+from trainer_processo import TrainerProcesso
+from grafico import HistoricoDecimado
+from tabela_dados import ModeloDados, ModeloEstatisticas, estatisticas_colunas
+
+ATIVACOES = {"Logística": "logistica", "Hiperbólica": "hiperbolica", "Linear": "linear"}
+AMOSTRAGENS = {"Fixa": "sequencial", "Aleatória": "aleatoria", "Estratificada": "estratificada",
+               "Balanceada": "balanceada"}
 
 
 class MainWindow(QMainWindow):
@@ -67,41 +74,196 @@ class MainWindow(QMainWindow):
         self.combo_ativ.addItems(["Logística", "Hiperbólica", "Linear"])
         top_row.addWidget(self.combo_ativ)
 
+        # Camada de saída: mesma função das ocultas (erro quadrático) ou softmax (entropia cruzada)
+        top_row.addWidget(QLabel("Saída:"))
+        self.combo_saida = QComboBox()
+        self.combo_saida.addItems(["Ativação", "Softmax"])
+        top_row.addWidget(self.combo_saida)
+
         # Botão avançar
         self.btn_avancar = QPushButton("Avançar")
-        self.btn_avancar.clicked.connect(self.executar_pipeline)
+        self.btn_avancar.clicked.connect(lambda: self.executar_pipeline())
         self.btn_avancar.setEnabled(False)
         top_row.addWidget(self.btn_avancar)
 
+        # Modo de avaliação: k-fold estratificado com as dobras em paralelo
+        self.btn_validacao_cruzada = QPushButton("Validação cruzada")
+        self.btn_validacao_cruzada.clicked.connect(self.executar_validacao_cruzada)
+        self.btn_validacao_cruzada.setEnabled(False)
+        top_row.addWidget(self.btn_validacao_cruzada)
+
+        # Retomar de um checkpoint (mesmo CSV carregado)
+        self.btn_retomar = QPushButton("Retomar")
+        self.btn_retomar.clicked.connect(self.retomar_treino)
+        self.btn_retomar.setEnabled(False)
+        top_row.addWidget(self.btn_retomar)
+
+        # Botão salvar modelo (pesos + normalizador + classes)
+        self.btn_salvar = QPushButton("Salvar modelo")
+        self.btn_salvar.clicked.connect(self.salvar_modelo_treinado)
+        self.btn_salvar.setEnabled(False)
+        top_row.addWidget(self.btn_salvar)
+
+        # Exportar métricas/trace da última execução instrumentada
+        self.btn_exportar_trace = QPushButton("Exportar trace")
+        self.btn_exportar_trace.clicked.connect(self.exportar_trace)
+        self.btn_exportar_trace.setEnabled(False)
+        top_row.addWidget(self.btn_exportar_trace)
+
         self.layout.addLayout(top_row)
 
-        # === Tabela ===
-        self.tabela = QTableWidget()
-        self.layout.addWidget(self.tabela)
+        # === Segunda linha: opções de treino ===
+        opt_row = QHBoxLayout()
+
+        # Otimizador e agendamento da taxa
+        opt_row.addWidget(QLabel("Otimizador:"))
+        self.combo_otimizador = QComboBox()
+        self.combo_otimizador.addItems(["SGD", "Momentum", "Nesterov", "RMSProp", "Adam"])
+        opt_row.addWidget(self.combo_otimizador)
+
+        opt_row.addWidget(QLabel("Agenda:"))
+        self.combo_agenda = QComboBox()
+        self.combo_agenda.addItems(["Constante", "Degrau", "Exponencial", "Cosseno", "Warmup", "Platô"])
+        opt_row.addWidget(self.combo_agenda)
+
+        # Camadas ocultas: larguras separadas por vírgula, com ativação
+        # opcional por camada (ex.: "16:hiperbolica,8"); vazio = automático
+        opt_row.addWidget(QLabel("Camadas:"))
+        self.edit_camadas = QLineEdit()
+        self.edit_camadas.setPlaceholderText("auto (ex.: 16,8)")
+        opt_row.addWidget(self.edit_camadas)
+
+        # Precisão numérica (float32: metade da memória, kernels mais rápidos)
+        opt_row.addWidget(QLabel("Precisão:"))
+        self.combo_precisao = QComboBox()
+        self.combo_precisao.addItems(["float64", "float32"])
+        opt_row.addWidget(self.combo_precisao)
+
+        # Tamanho do mini-lote (1 = SGD por amostra)
+        opt_row.addWidget(QLabel("Lote:"))
+        self.spin_lote = QSpinBox()
+        self.spin_lote.setRange(1, 1000000)
+        self.spin_lote.setValue(32)
+        opt_row.addWidget(self.spin_lote)
+
+        # Ordem das amostras a cada época (estratificada/balanceada: classes em todos os lotes)
+        opt_row.addWidget(QLabel("Ordem:"))
+        self.combo_amostragem = QComboBox()
+        self.combo_amostragem.addItems(["Fixa", "Aleatória", "Estratificada", "Balanceada"])
+        opt_row.addWidget(self.combo_amostragem)
+
+        # Núcleos para treino data-parallel (1 = treino serial na thread)
+        opt_row.addWidget(QLabel("Núcleos:"))
+        self.spin_workers = QSpinBox()
+        self.spin_workers.setRange(1, os.cpu_count() or 1)
+        self.spin_workers.setValue(1)
+        opt_row.addWidget(self.spin_workers)
+
+        # Política automática quando o erro estabiliza
+        opt_row.addWidget(QLabel("Platô:"))
+        self.combo_plato = QComboBox()
+        self.combo_plato.addItems(["Perguntar", "Reduzir taxa", "Parar", "Ignorar"])
+        opt_row.addWidget(self.combo_plato)
+
+        # Instrumentação por fase (tempos, amostras/s, memória)
+        self.check_instrumentar = QCheckBox("Instrumentar")
+        opt_row.addWidget(self.check_instrumentar)
+
+        # Treino em outro processo (a GUI não disputa o GIL com o laço de treino)
+        self.check_processo = QCheckBox("Processo separado")
+        opt_row.addWidget(self.check_processo)
+
+        # Validação periódica (0 = desligada) e paciência da parada antecipada
+        # (avaliações sem melhora; 0 = só guarda os melhores pesos)
+        opt_row.addWidget(QLabel("Validar a cada:"))
+        self.spin_validar = QSpinBox()
+        self.spin_validar.setRange(0, 100000)
+        self.spin_validar.setValue(10)
+        opt_row.addWidget(self.spin_validar)
+
+        opt_row.addWidget(QLabel("Paciência:"))
+        self.spin_paciencia = QSpinBox()
+        self.spin_paciencia.setRange(0, 10000)
+        self.spin_paciencia.setValue(10)
+        opt_row.addWidget(self.spin_paciencia)
+
+        # Checkpoints periódicos (0 = desligado) e quantos manter
+        opt_row.addWidget(QLabel("Checkpoint a cada:"))
+        self.spin_checkpoint = QSpinBox()
+        self.spin_checkpoint.setRange(0, 100000)
+        self.spin_checkpoint.setValue(100)
+        opt_row.addWidget(self.spin_checkpoint)
+
+        opt_row.addWidget(QLabel("Manter últimos:"))
+        self.spin_manter = QSpinBox()
+        self.spin_manter.setRange(1, 100)
+        self.spin_manter.setValue(3)
+        opt_row.addWidget(self.spin_manter)
+
+        # Dobras da validação cruzada (usa "Núcleos" como nº de processos)
+        opt_row.addWidget(QLabel("Dobras:"))
+        self.spin_dobras = QSpinBox()
+        self.spin_dobras.setRange(2, 50)
+        self.spin_dobras.setValue(5)
+        opt_row.addWidget(self.spin_dobras)
+
+        opt_row.addStretch()
+        self.layout.addLayout(opt_row)
+
+        # === Dados: tabela virtualizada (só as linhas visíveis são lidas) +
+        # estatísticas por atributo e contagem por classe ===
+        self.painel_dados = QWidget()
+        dados_row = QHBoxLayout(self.painel_dados)
+        dados_row.setContentsMargins(0, 0, 0, 0)
+
+        self.tabela = QTableView()
+        # altura de linha fixa: a view não mede as linhas (milhões de amostras)
+        self.tabela.verticalHeader().setSectionResizeMode(QHeaderView.Fixed)
+        self.tabela.verticalHeader().setDefaultSectionSize(22)
+        dados_row.addWidget(self.tabela, 3)
+
+        coluna_stats = QVBoxLayout()
+        self.tabela_stats = QTableView()
+        coluna_stats.addWidget(self.tabela_stats)
+        self.label_classes = QLabel()
+        self.label_classes.setWordWrap(True)
+        coluna_stats.addWidget(self.label_classes)
+        dados_row.addLayout(coluna_stats, 1)
+
+        self.layout.addWidget(self.painel_dados)
 
         # === Status ===
         self.status = QLabel("Nenhum arquivo carregado.")
         self.layout.addWidget(self.status)
 
-        # === Área de gráfico (vazia inicialmente) ===
-        self.figura = Figure(figsize=(10, 4))
-        self.canvas = FigureCanvas(self.figura)
-        self.layout.addWidget(self.canvas)
-        self.canvas.hide()
+        # === Área de gráfico: criada no primeiro uso (mostrar_grafico), para
+        # a janela abrir sem esperar o matplotlib carregar ===
+        self.figura = None
+        self.canvas = None
 
         # === Variáveis internas ===
-        self.dados = None
         self.X = None
         self.y = None
-        self.X_norm = None
         self.y_encoded = None
+        self.estatisticas = None  # tabela_dados.estatisticas_colunas do CSV carregado
         self.mapa = None
+        self.caminho_csv = None
+        self.normalizador = None  # ajustado no conjunto de treino
         self.labels = None  # nomes das classes (em ordem de índice)
-        self.W1 = self.B1 = self.W2 = self.B2 = None
-        self.erros = []
+        self.pesos = None  # (W1, B1, ..., Wk, Bk) do último treino
+        self.ativacao_tipo = "logistica"  # ativação (ou uma por camada) usada no último treino
+        self.erros = HistoricoDecimado()  # histórico (época, erro) decimado para o gráfico
+        self.erros_val = HistoricoDecimado()  # (época, erro de validação)
+        self.acuracia_val = None  # última acurácia de validação
+        self.ax_erro = self.linha_erro = self.linha_val = None
+        self.eficiencia = None  # última eficiência de escala (modo multi-núcleo)
+        self.amostras_por_s = None  # vazão da última época instrumentada
 
         # thread handle
         self.thread = None
+        self.thread_cv = None  # ValidacaoCruzadaThread em andamento
+        self.dobras_cv = []  # métricas das dobras já concluídas
+        self.dialogo_plato = None  # diálogo de platô pendente (não-modal)
 
     # =============================================================
     def carregar_csv(self):
@@ -109,15 +271,19 @@ class MainWindow(QMainWindow):
         if not caminho:
             return
 
-        self.dados = ler_csv(caminho)
-        if not self.dados:
+        # Lê via cache binário: recargas do mesmo arquivo só mapeiam os .npy
+        try:
+            self.X, self.y, self.mapa = carregar_csv_cache(caminho)
+            self.caminho_csv = caminho
+        except Exception as e:
+            print(f"Erro ao ler CSV: {e}")
             self.status.setText("Falha ao ler o arquivo CSV.")
             return
 
-        # Prepara e normaliza
-        self.X, self.y = preparar_dados(self.dados)
-        self.X_norm = normalizar_dados(self.X)
-        self.y_encoded, self.mapa = codificar_classes(self.y)
+        # y = índices de classe; o one-hot só é montado (uma vez) se a saída
+        # não for softmax (ver alvos). A tabela normaliza só as linhas
+        # exibidas e o treino ajusta o normalizador só no conjunto de treino
+        self.y_encoded = None
 
         # Prepara labels na ordem dos índices
         # Espera mapa: dict {label: index}
@@ -127,86 +293,159 @@ class MainWindow(QMainWindow):
             self.labels = [inv[i] for i in range(len(inv))]
         else:
             # fallback: usa índices como labels
-            self.labels = [str(i) for i in range(len(self.y_encoded[0]) if isinstance(self.y_encoded[0], (list, tuple, np.ndarray)) else 1)]
+            self.labels = [str(i) for i in range(int(np.max(self.y)) + 1)]
 
         # Exibe tabela
         self.preencher_tabela()
-        self.canvas.hide()
-        self.tabela.show()
+        if self.canvas is not None:
+            self.canvas.hide()
+        self.painel_dados.show()
 
-        self.status.setText(f"Arquivo carregado: {os.path.basename(caminho)} — {len(self.dados)} amostras")
+        self.status.setText(f"Arquivo carregado: {os.path.basename(caminho)} — {len(self.X)} amostras")
         self.btn_avancar.setEnabled(True)
+        self.btn_retomar.setEnabled(True)
+        self.btn_validacao_cruzada.setEnabled(True)
 
     # =============================================================
     def preencher_tabela(self):
-        n_amostras = min(20, len(self.X_norm))
-        n_atributos = len(self.X_norm[0])
-
-        self.tabela.clear()
-        self.tabela.setRowCount(n_amostras)
-        self.tabela.setColumnCount(n_atributos + 1)
-        headers = [f"Atr {i+1}" for i in range(n_atributos)] + ["Classe"]
-        self.tabela.setHorizontalHeaderLabels(headers)
-
-        for i in range(n_amostras):
-            for j in range(n_atributos):
-                item = QTableWidgetItem(f"{self.X_norm[i][j]:.4f}")
-                self.tabela.setItem(i, j, item)
-
-            # obter rótulo da classe do one-hot
-            if isinstance(self.y_encoded[i], (list, tuple, np.ndarray)):
-                idx = int(np.argmax(self.y_encoded[i]))
-                label = self.labels[idx] if idx < len(self.labels) else str(idx)
-            else:
-                # caso y_encoded seja já um índice
-                idx = int(self.y_encoded[i])
-                label = self.labels[idx] if idx < len(self.labels) else str(idx)
+        """Liga as views aos modelos sobre as matrizes carregadas (nada é copiado)."""
+        self.estatisticas = estatisticas_colunas(self.X, self.y, len(self.labels))
+        self.tabela.setModel(ModeloDados(self.X, self.y, self.labels, self.estatisticas, parent=self))
+        self.tabela_stats.setModel(ModeloEstatisticas(self.estatisticas, parent=self))
+        self.tabela.resizeColumnsToContents()
+        self.tabela_stats.resizeColumnsToContents()
 
-            self.tabela.setItem(i, n_atributos, QTableWidgetItem(str(label)))
+        total = max(len(self.y), 1)
+        self.label_classes.setText("Classes: " + "  ·  ".join(
+            f"{rotulo}: {int(n)} ({n / total:.1%})" for rotulo, n in zip(self.labels, self.estatisticas["contagens"])
+        ))
 
-        self.tabela.resizeColumnsToContents()
+    # =============================================================
+    def diretorio_checkpoints(self):
+        """~/.cache/projeto_mlp/checkpoints/<nome do CSV> (um subdiretório por execução)"""
+        nome = os.path.splitext(os.path.basename(self.caminho_csv or "sem_nome"))[0]
+        return os.path.join(os.path.expanduser("~"), ".cache", "projeto_mlp", "checkpoints", nome)
+
+    # =============================================================
+    def retomar_treino(self):
+        caminho, _ = QFileDialog.getOpenFileName(self, "Selecionar checkpoint", self.diretorio_checkpoints(),
+                                                 "Checkpoint MLP (*.ckpt)")
+        if not caminho:
+            return
+        try:
+            estado = carregar_checkpoint(caminho)
+        except Exception as e:
+            print(f"Erro ao ler checkpoint: {e}")
+            self.status.setText("Falha ao ler o checkpoint.")
+            return
+        # a retomada continua gravando na pasta da execução original
+        self.executar_pipeline(estado_inicial=estado, diretorio_execucao=os.path.dirname(caminho))
 
     # =============================================================
-    def executar_pipeline(self):
-        if self.X_norm is None or self.y_encoded is None:
+    def executar_pipeline(self, estado_inicial=None, diretorio_execucao=None):
+        """
+        estado_inicial: dict de carregar_checkpoint para continuar um treino
+        (usa a configuração, o normalizador e os pesos salvos; 'Épocas' passa
+        a ser o número de épocas adicionais).
+        diretorio_execucao: pasta dos checkpoints; None = uma nova para esta execução
+        """
+        if self.X is None or self.y is None:
             self.status.setText("Carregue o CSV antes de continuar.")
             return
 
+        # ao retomar vale a saída do checkpoint (a ativação por camada termina em 'softmax')
+        softmax = self.saida_escolhida() == "softmax"
+        if estado_inicial is not None:
+            ativacao_salva = estado_inicial["config"].get("ativacao_tipo")
+            softmax = not isinstance(ativacao_salva, str) and ativacao_salva[-1] == "softmax"
+
+        # divide os dados brutos e ajusta o normalizador só no treino
+        # (o teste não vaza para as estatísticas de escala)
         X_train, X_test, y_train, y_test = dividir_treino_teste(
-        self.X_norm,
-        self.y_encoded,
+        self.X,
+        self.alvos(softmax),
         test_size=0.3
         )
-        self.X_train = X_train
-        self.X_test = X_test
+
+        # validação separada do treino (o teste fica só para a avaliação
+        # final), também antes do ajuste: a validação não entra na escala
+        X_val = y_val = None
+        validar_cada = int(self.spin_validar.value())
+        if validar_cada > 0:
+            X_train, X_val, y_train, y_val = dividir_treino_teste(X_train, y_train, test_size=0.2)
+
+        if estado_inicial is not None and estado_inicial["normalizador"] is not None:
+            self.normalizador = Normalizador.de_estado(estado_inicial["normalizador"])
+        else:
+            self.normalizador = Normalizador("minmax", self.combo_precisao.currentText()).fit(X_train)
+        self.X_train = self.normalizador.transform(X_train)
+        self.X_test = self.normalizador.transform(X_test)
         self.y_train = y_train
         self.y_test = y_test
+        if X_val is not None:
+            X_val = self.normalizador.transform(X_val)
 
         # calcular automaticamente n_hidden e n_output
-        n_in = len(self.X_norm[0])
-        if isinstance(self.y_encoded[0], (list, tuple, np.ndarray)):
-            n_out = len(self.y_encoded[0])
-        else:
-            n_out = 1
+        n_in = self.X.shape[1]
+        n_out = len(self.mapa)
         n_hidden = (n_in + n_out) // 2
         if n_hidden < 1:
             n_hidden = 1
+        try:
+            n_hidden = interpretar_camadas(self.edit_camadas.text()) or n_hidden
+        except ValueError:
+            self.status.setText("Camadas inválidas: use larguras separadas por vírgula (ex.: 16,8 ou 16:hiperbolica,8).")
+            return
 
         # parâmetros do usuário
         epocas = int(self.spin_epocas.value())
         erro_alvo = float(self.spin_erro.value())
         taxa = float(self.spin_taxa.value())
-        ativ_map = {"Logística": "logistica", "Hiperbólica": "hiperbolica", "Linear": "linear"}
-        ativacao_tipo = ativ_map[self.combo_ativ.currentText()]
+        ativacao_tipo = ATIVACOES[self.combo_ativ.currentText()]
+        saida = self.saida_escolhida()
+        batch_size = int(self.spin_lote.value())
+        amostragem = AMOSTRAGENS[self.combo_amostragem.currentText()]
+        self.ativacao_tipo = ativacao_tipo
+        n_workers = int(self.spin_workers.value())
+        otimizador = self.combo_otimizador.currentText().lower()
+        agenda_map = {"Constante": None, "Degrau": "degrau", "Exponencial": "exponencial",
+                      "Cosseno": "cosseno", "Warmup": "warmup", "Platô": "plato"}
+        agendador = agenda_map[self.combo_agenda.currentText()]
+        plato_map = {"Perguntar": "perguntar", "Reduzir taxa": "reduzir", "Parar": "parar", "Ignorar": "continuar"}
+        politica_plato = plato_map[self.combo_plato.currentText()]
+
+        if estado_inicial is not None:
+            # a configuração do treino salvo prevalece sobre os controles
+            config = estado_inicial["config"]
+            n_hidden = config.get("n_hidden", n_hidden)
+            taxa = config.get("taxa", taxa)
+            ativacao_tipo = config.get("ativacao_tipo", ativacao_tipo)
+            if not isinstance(ativacao_tipo, str):
+                saida = None  # a ativação da saída já vem na lista por camada do checkpoint
+            batch_size = config.get("batch_size", batch_size)
+            amostragem = config.get("amostragem", amostragem)
+            self.ativacao_tipo = ativacao_tipo
+
+        gravador = None
+        if self.spin_checkpoint.value() > 0:
+            if diretorio_execucao is None:
+                diretorio_execucao = novo_diretorio_execucao(self.diretorio_checkpoints())
+            gravador = GravadorCheckpoints(diretorio_execucao, manter_ultimos=int(self.spin_manter.value()))
 
         # limpar histórico e UI
         self.status.setText("Iniciando treinamento...")
-        self.erros = []
-        self.tabela.hide()
-        self.canvas.show()
-
-        # cria thread de treino com parâmetros
-        self.thread = TrainerThread(
+        self.erros.limpar()
+        self.erros_val.limpar()
+        self.acuracia_val = None
+        self.eficiencia = None
+        self.amostras_por_s = None
+        self.btn_exportar_trace.setEnabled(False)
+        self.mostrar_grafico()
+        self.preparar_grafico()
+
+        # cria thread (ou processo) de treino com parâmetros
+        classe_treino = TrainerProcesso if self.check_processo.isChecked() else TrainerThread
+        self.thread = classe_treino(
             X=self.X_train,
             y=self.y_train,
             n_hidden=n_hidden,
@@ -215,34 +454,230 @@ class MainWindow(QMainWindow):
             erro_alvo=erro_alvo,
             ativacao_tipo=ativacao_tipo,
             plateau_window=10,
-            plateau_std_threshold=1e-5
+            plateau_std_threshold=1e-5,
+            batch_size=batch_size,
+            n_workers=n_workers,
+            instrumentar=self.check_instrumentar.isChecked(),
+            otimizador=None if otimizador == "sgd" else otimizador,
+            agendador=agendador,
+            politica_plato=politica_plato,
+            gravador=gravador,
+            checkpoint_cada=max(1, int(self.spin_checkpoint.value())),
+            estado_inicial=estado_inicial,
+            normalizador=self.normalizador,
+            mapa=self.mapa,
+            dtype=self.combo_precisao.currentText(),
+            saida=saida,
+            amostragem=amostragem,
+            X_val=X_val,
+            y_val=y_val,
+            validar_cada=max(1, validar_cada),
+            paciencia_validacao=int(self.spin_paciencia.value())
         )
 
         # conectar sinais
-        self.thread.progresso.connect(self.atualizar_grafico)
+        self.thread.progresso_lote.connect(self.atualizar_grafico)
         self.thread.finalizou.connect(self.finalizou_treino)
         self.thread.plato_detected.connect(self.handle_plateau_detected)
+        self.thread.plato_acao.connect(self.handle_plateau_action)
+        self.thread.eficiencia_paralela.connect(self.atualizar_eficiencia)
+        self.thread.instrumentacao.connect(self.atualizar_instrumentacao)
+        self.thread.validacao.connect(self.atualizar_validacao)
+        self.thread.parada_antecipada.connect(self.handle_parada_antecipada)
+        if isinstance(self.thread, TrainerProcesso):
+            self.thread.falhou.connect(self.falha_treino)
 
         # start
         self.thread.start()
 
     # =============================================================
-    def atualizar_grafico(self, epoch, erro):
-        self.erros.append(erro)
+    def alvos(self, softmax):
+        """
+        Alvos do treino: com saída softmax os próprios índices de classe
+        (vetor int32, sem one-hot); senão o one-hot, montado uma vez por CSV.
+        """
+        if softmax:
+            return np.asarray(self.y, dtype=np.int32)
+        if self.y_encoded is None:
+            self.y_encoded = indices_para_one_hot(self.y, len(self.mapa))
+        return self.y_encoded
+
+    # =============================================================
+    def saida_escolhida(self):
+        """Ativação da camada de saída: None (a mesma das ocultas) ou 'softmax'."""
+        return "softmax" if self.combo_saida.currentText() == "Softmax" else None
+
+    # =============================================================
+    def executar_validacao_cruzada(self):
+        """Avalia a configuração atual com k-fold estratificado (não altera o modelo treinado)."""
+        if self.X is None or self.y is None:
+            self.status.setText("Carregue o CSV antes de continuar.")
+            return
+        try:
+            n_hidden = interpretar_camadas(self.edit_camadas.text())
+        except ValueError:
+            self.status.setText("Camadas inválidas: use larguras separadas por vírgula (ex.: 16,8 ou 16:hiperbolica,8).")
+            return
+        otimizador = self.combo_otimizador.currentText().lower()
+        k = int(self.spin_dobras.value())
+
+        self.dobras_cv = []
+        self.btn_validacao_cruzada.setEnabled(False)
+        self.status.setText(f"Validação cruzada: 0/{k} dobras concluídas...")
+        self.thread_cv = ValidacaoCruzadaThread(
+            self.X,
+            self.alvos(self.saida_escolhida() == "softmax"),
+            k=k,
+            n_hidden=n_hidden,
+            taxa=float(self.spin_taxa.value()),
+            epocas=int(self.spin_epocas.value()),
+            ativacao_tipo=ATIVACOES[self.combo_ativ.currentText()],
+            saida=self.saida_escolhida(),
+            batch_size=int(self.spin_lote.value()),
+            otimizador=None if otimizador == "sgd" else otimizador,
+            processos=int(self.spin_workers.value()),
+            dtype=self.combo_precisao.currentText(),
+        )
+        self.thread_cv.dobra_concluida.connect(self.dobra_cv_concluida)
+        self.thread_cv.finalizou.connect(self.finalizou_validacao_cruzada)
+        self.thread_cv.falhou.connect(self.falha_validacao_cruzada)
+        self.thread_cv.start()
+
+    def dobra_cv_concluida(self, dobra):
+        self.dobras_cv.append(dobra)
+        self.status.setText(f"Validação cruzada: {len(self.dobras_cv)}/{self.thread_cv.k} dobras concluídas "
+                            f"(dobra {dobra['dobra']}: acurácia {dobra['acuracia']:.2%})")
+
+    def falha_validacao_cruzada(self, mensagem):
+        self.btn_validacao_cruzada.setEnabled(True)
+        self.status.setText(f"Falha na validação cruzada: {mensagem}")
+
+    def finalizou_validacao_cruzada(self, resultado):
+        """Acurácia por dobra (barras) e matriz de confusão somada das dobras."""
+        self.btn_validacao_cruzada.setEnabled(True)
+        self.mostrar_grafico()
         self.figura.clear()
-        ax = self.figura.add_subplot(121)
-        ax.plot(self.erros)
-        ax.set_xlabel("Época")
-        ax.set_ylabel("Erro")
-        ax.set_title("Erro da MLP por Época")
+
+        dobras = resultado["dobras"]
+        ax1 = self.figura.add_subplot(121)
+        ax1.bar(range(1, len(dobras) + 1), [d["acuracia"] for d in dobras])
+        ax1.axhline(resultado["acuracia_media"], color="black", linestyle="--", label="Média")
+        ax1.set_ylim(0, 1)
+        ax1.set_xlabel("Dobra")
+        ax1.set_ylabel("Acurácia")
+        ax1.set_title(f"Acurácia por dobra ({resultado['acuracia_media']:.2%} ± {resultado['acuracia_desvio']:.2%})")
+        ax1.legend()
+
+        ax2 = self.figura.add_subplot(122)
+        self.desenhar_matriz_confusao(ax2, resultado["matriz_confusao"], "Matriz de Confusão (soma das dobras)")
+
+        self.figura.tight_layout()
         self.canvas.draw()
-        self.status.setText(f"Treinando... Época {epoch}, Erro {erro:.8f}")
+        self.status.setText(f"Validação cruzada concluída em {resultado['tempo']:.1f}s: acurácia "
+                            f"{resultado['acuracia_media']:.2%} ± {resultado['acuracia_desvio']:.2%} "
+                            f"em {len(dobras)} dobras.")
+
+    # =============================================================
+    def mostrar_grafico(self):
+        """Troca a tabela pelo gráfico; o matplotlib só é importado na primeira chamada."""
+        if self.canvas is None:
+            from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
+            from matplotlib.figure import Figure
+
+            self.figura = Figure(figsize=(10, 4))
+            self.canvas = FigureCanvas(self.figura)
+            self.layout.addWidget(self.canvas)
+        self.painel_dados.hide()
+        self.canvas.show()
+
+    def desenhar_matriz_confusao(self, ax, cm, titulo):
+        """Matriz de confusão (utils.matriz_confusao) com os valores em cada célula."""
+        ax.imshow(cm, cmap="viridis")
+        rotulos = self.labels if self.labels is not None else [str(i) for i in range(len(cm))]
+        ax.set_xticks(range(len(cm)), rotulos, rotation=45, ha="right")
+        ax.set_yticks(range(len(cm)), rotulos)
+        for i in range(len(cm)):
+            for j in range(len(cm)):
+                ax.text(j, i, int(cm[i, j]), ha="center", va="center",
+                        color="black" if cm[i, j] > cm.max() / 2 else "white")
+        ax.set_xlabel("Previsto")
+        ax.set_ylabel("Real")
+        ax.set_title(titulo)
+
+    # =============================================================
+    def preparar_grafico(self):
+        """Cria uma única vez o eixo e a linha que serão atualizados ao vivo."""
+        self.figura.clear()
+        self.ax_erro = self.figura.add_subplot(121)
+        self.linha_erro, = self.ax_erro.plot([], [], label="Treino")
+        self.linha_val, = self.ax_erro.plot([], [], label="Validação")
+        self.ax_erro.legend()
+        self.ax_erro.set_xlabel("Época")
+        self.ax_erro.set_ylabel("Erro")
+        self.ax_erro.set_title("Erro da MLP por Época")
+        self.canvas.draw_idle()
+
+    # =============================================================
+    def atualizar_grafico(self, pontos):
+        """Recebe um lote [(época, erro), ...] e atualiza a linha existente."""
+        self.erros.adicionar(pontos)
+        self.linha_erro.set_data(*self.erros.dados())
+        self.ax_erro.relim()
+        self.ax_erro.autoscale_view()
+        self.canvas.draw_idle()
+
+        epoch, erro = pontos[-1]
+        texto = f"Treinando... Época {epoch}, Erro {erro:.8f}"
+        if self.eficiencia is not None:
+            texto += f"  |  Eficiência paralela {self.eficiencia:.0%}"
+        if self.amostras_por_s is not None:
+            texto += f"  |  {self.amostras_por_s:,.0f} amostras/s"
+        if self.acuracia_val is not None:
+            texto += f"  |  Acurácia validação {self.acuracia_val:.2%}"
+        self.status.setText(texto)
+
+    # =============================================================
+    def atualizar_validacao(self, epoch, erro_val, acuracia):
+        """Acrescenta o ponto à curva de validação (redesenho junto do próximo lote de progresso)."""
+        self.erros_val.adicionar([(epoch, erro_val)])
+        self.acuracia_val = acuracia
+        if self.linha_val is not None:
+            self.linha_val.set_data(*self.erros_val.dados())
+
+    # =============================================================
+    def handle_parada_antecipada(self, epoch, melhor_epoca):
+        self.status.setText(f"Parada antecipada na época {epoch}: validação sem melhora desde a época {melhor_epoca}.")
+
+    # =============================================================
+    def atualizar_eficiencia(self, epoch, eficiencia):
+        self.eficiencia = eficiencia
+
+    # =============================================================
+    def atualizar_instrumentacao(self, metricas):
+        self.amostras_por_s = metricas["amostras_por_segundo"]
+
+    # =============================================================
+    def exportar_trace(self):
+        if self.thread is None or self.thread.perfil is None:
+            return
+        caminho, filtro = QFileDialog.getSaveFileName(
+            self, "Exportar instrumentação", "treino.trace.json",
+            "Chrome trace (*.trace.json);;Métricas por época (*.json)"
+        )
+        if not caminho:
+            return
+        if filtro.startswith("Chrome"):
+            self.thread.perfil.exportar_chrome_trace(caminho)
+        else:
+            self.thread.perfil.exportar_json(caminho)
+        self.status.setText(f"Instrumentação exportada em {os.path.basename(caminho)}")
 
     # =============================================================
     def handle_plateau_detected(self, epoch, erro):
         """
-        Chamado pela thread quando detecta platô.
-        Mostra diálogo modal ao usuário e envia decisão para a thread.
+        Chamado pela thread quando detecta platô (política 'perguntar').
+        Abre um diálogo não-modal: o treino continua rodando e a decisão é
+        enviada à thread quando o usuário clicar.
         """
         # Mostrar diálogo com 3 opções
         msg = QMessageBox(self)
@@ -252,57 +687,80 @@ class MainWindow(QMainWindow):
         reduzir = msg.addButton("Continuar com redução de taxa (-10%)", QMessageBox.AcceptRole)
         parar = msg.addButton("Interromper", QMessageBox.RejectRole)
         msg.setDefaultButton(continuar)
-        msg.exec()
 
-        chosen = None
-        if msg.clickedButton() == reduzir:
-            chosen = 'reduce'
-        elif msg.clickedButton() == parar:
-            chosen = 'stop'
-        else:
-            chosen = 'continue'
+        def decidir(botao):
+            if botao == reduzir:
+                chosen = 'reduce'
+            elif botao == parar:
+                chosen = 'stop'
+            else:
+                chosen = 'continue'
 
-        # envia decisão pra thread
-        if self.thread is not None:
-            self.thread.set_plateau_decision(chosen)
+            # envia decisão pra thread (aplicada na próxima época)
+            if self.thread is not None and self.thread.isRunning():
+                self.thread.set_plateau_decision(chosen)
+            self.dialogo_plato = None
 
-        # exibe info rápida
-        if chosen == 'reduce':
-            self.status.setText("Usuário optou por reduzir taxa em 10% e continuar.")
-        elif chosen == 'stop':
-            self.status.setText("Usuário optou por interromper o treinamento.")
+        msg.buttonClicked.connect(decidir)
+        self.dialogo_plato = msg
+        msg.open()
+
+    # =============================================================
+    def handle_plateau_action(self, epoch, acao):
+        """Informa a ação de platô aplicada pela thread (automática ou do usuário)."""
+        if acao == 'reduce':
+            self.status.setText(f"Platô na época {epoch}: taxa reduzida, treino continua.")
+        elif acao == 'stop':
+            self.status.setText(f"Platô na época {epoch}: treinamento interrompido.")
         else:
-            self.status.setText("Usuário optou por continuar o treinamento sem alteração.")
+            self.status.setText(f"Platô na época {epoch}: treino continua sem alteração.")
 
     # =============================================================
     def finalizou_treino(self, pesos):
-        self.W1, self.B1, self.W2, self.B2 = pesos
+        # treino terminou antes da resposta ao platô: descarta o diálogo
+        if self.dialogo_plato is not None:
+            self.dialogo_plato.close()
+            self.dialogo_plato = None
+        self.pesos = pesos
+        self.ativacao_tipo = self.thread.ativacao_tipo
         self.status.setText("Treinamento concluído! Gerando matriz de confusão...")
         # gerar previsões e matriz
         self.testar_amostras()
+        self.btn_salvar.setEnabled(True)
+        self.btn_exportar_trace.setEnabled(self.thread is not None and self.thread.perfil is not None)
+
+    def falha_treino(self, mensagem):
+        print(mensagem)
+        self.status.setText("Falha no processo de treino (detalhes no terminal).")
+
+    # =============================================================
+    def salvar_modelo_treinado(self):
+        if self.pesos is None:
+            return
+        caminho, _ = QFileDialog.getSaveFileName(self, "Salvar modelo", "modelo.npz", "Modelo MLP (*.npz)")
+        if not caminho:
+            return
+        salvar_modelo(caminho, self.pesos, self.ativacao_tipo, self.normalizador, self.mapa)
+        self.status.setText(f"Modelo salvo em {os.path.basename(caminho)}")
 
     # =============================================================
     def testar_amostras(self):
-        # Gera previsões (classe com maior ativação na saída)
-        previsoes = []
-        for entrada in self.X_test:
-            _, saida = forward_pass(entrada, self.W1, self.B1, self.W2, self.B2, ativacao_tipo=self.combo_ativ.currentText().lower() if False else None)
-            # NOTE: forward_pass no mlp espera ativacao_tipo em nome 'logistica'|'hiperbolica'|'linear'
-            # mas aqui chamamos diretamente com o mesmo tipo que treinou na thread, para simplicidade assumiremos sigmoid-like.
-            # COMO O TREINO USOU ativacao_tipo, é melhor que a thread devolva também o ativacao_tipo ou mantemos a escolha atual:
-            ativ_map = {"Logística": "logistica", "Hiperbólica": "hiperbolica", "Linear": "linear"}
-            ativacao_tipo = ativ_map[self.combo_ativ.currentText()]
-            _, saida = forward_pass(entrada, self.W1, self.B1, self.W2, self.B2, ativacao_tipo=ativacao_tipo)
-            pred = int(np.argmax(saida))
-            previsoes.append(pred)
+        # Gera previsões (classe com maior ativação na saída) em lote,
+        # com a mesma função de ativação usada no treino
+        previsoes = predict(
+            self.X_test,
+            self.pesos,
+            ativacao_tipo=self.ativacao_tipo,
+        )
 
         # converter y_encoded para índices
-        if isinstance(self.y_test[0], (list, tuple, np.ndarray)):
-            y_true = np.array([int(np.argmax(y)) for y in self.y_test])
+        y_test = np.asarray(self.y_test)
+        if y_test.ndim == 2:
+            y_true = np.argmax(y_test, axis=1)
         else:
-            y_true = np.array([int(y) for y in self.y_test])
+            y_true = y_test.astype(int)
 
-        self.mostrar_matriz_confusao(y_true, np.array(previsoes))
+        self.mostrar_matriz_confusao(y_true, previsoes)
         self.status.setText("Treino e avaliação concluídos com sucesso!")
 
     # =============================================================
@@ -312,22 +770,32 @@ class MainWindow(QMainWindow):
 
         # Gráfico de erro
         ax1 = self.figura.add_subplot(121)
-        ax1.plot(self.erros)
+        ax1.plot(*self.erros.dados(), label="Treino")
+        if self.erros_val.dados()[0]:
+            ax1.plot(*self.erros_val.dados(), label="Validação")
+            ax1.legend()
         ax1.set_xlabel("Época")
         ax1.set_ylabel("Erro")
         ax1.set_title("Erro da MLP por Época")
 
         # Matriz de confusão
-        cm = confusion_matrix(y_true, previsoes)
+        n_classes = len(self.labels) if self.labels is not None else None
         ax2 = self.figura.add_subplot(122)
-        labels = self.labels if self.labels is not None else None
-        disp = ConfusionMatrixDisplay(confusion_matrix=cm, display_labels=labels)
-        disp.plot(ax=ax2, colorbar=False)
-        ax2.set_title("Matriz de Confusão")
+        self.desenhar_matriz_confusao(ax2, matriz_confusao(y_true, previsoes, n_classes), "Matriz de Confusão")
 
         self.figura.tight_layout()
         self.canvas.draw()
 
+    # =============================================================
+    def closeEvent(self, event):
+        # para o treino e espera o checkpoint final ser gravado
+        if self.thread is not None and self.thread.isRunning():
+            self.thread.request_stop()
+            self.thread.wait()
+        if self.thread_cv is not None and self.thread_cv.isRunning():
+            self.thread_cv.wait()
+        super().closeEvent(event)
+
 
 # =============================================================
 if __name__ == "__main__":
@@ -0,0 +1,121 @@
+"""
+Visualização virtualizada do dataset carregado.
+
+- ModeloDados (QAbstractTableModel) lê direto das matrizes NumPy (inclusive
+  as mapeadas em memória por carregar_csv_cache): a view só pede as células
+  visíveis, então rolar por milhões de amostras custa o mesmo que por 20.
+  As linhas são normalizadas (minmax) sob demanda, em blocos vetorizados,
+  sem criar uma cópia normalizada do dataset inteiro
+- estatisticas_colunas calcula uma única vez, em uma passada por blocos,
+  mínimo/máximo/média de cada atributo e a contagem de cada classe
+- ModeloEstatisticas exibe essas estatísticas (uma linha por atributo)
+"""
+
+import numpy as np
+from PySide6.QtCore import QAbstractTableModel, QModelIndex, Qt
+
+
+def estatisticas_colunas(X, y, n_classes, tamanho_bloco=262144):
+    """
+    X: matriz (m x n) (ndarray ou memmap); y: índices de classe (m)
+    retorna: dict com 'mins', 'maxs', 'medias' (n) e 'contagens' (n_classes)
+    """
+    n_amostras, n_atributos = X.shape
+    mins = np.full(n_atributos, np.inf)
+    maxs = np.full(n_atributos, -np.inf)
+    somas = np.zeros(n_atributos)
+    for inicio in range(0, n_amostras, tamanho_bloco):
+        bloco = np.asarray(X[inicio:inicio + tamanho_bloco], dtype=np.float64)
+        np.minimum(mins, bloco.min(axis=0), out=mins)
+        np.maximum(maxs, bloco.max(axis=0), out=maxs)
+        somas += bloco.sum(axis=0)
+    return {
+        "mins": mins,
+        "maxs": maxs,
+        "medias": somas / max(n_amostras, 1),
+        "contagens": np.bincount(np.asarray(y, dtype=np.int64), minlength=n_classes),
+    }
+
+
+class ModeloDados(QAbstractTableModel):
+    """Atributos (normalizados para exibição) + classe de cada amostra."""
+
+    LINHAS_POR_BLOCO = 256
+
+    def __init__(self, X, y, labels, estatisticas, normalizar=True, parent=None):
+        super().__init__(parent)
+        self.X = X
+        self.y = y
+        self.labels = list(labels)
+        self.normalizar = normalizar
+        self._mins = estatisticas["mins"]
+        amplitude = estatisticas["maxs"] - estatisticas["mins"]
+        self._escala = np.divide(1.0, amplitude, out=np.zeros_like(amplitude), where=amplitude > 0)
+        self._bloco_inicio = -1
+        self._bloco = None  # linhas [inicio, inicio + LINHAS_POR_BLOCO) já normalizadas
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.X)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.X.shape[1] + 1
+
+    def _linha(self, linha):
+        """Linha normalizada, vinda do bloco vetorizado que a contém (a view pede linha a linha)."""
+        inicio = linha - linha % self.LINHAS_POR_BLOCO
+        if inicio != self._bloco_inicio:
+            bloco = np.asarray(self.X[inicio:inicio + self.LINHAS_POR_BLOCO], dtype=np.float64)
+            if self.normalizar:
+                bloco = (bloco - self._mins) * self._escala
+            self._bloco, self._bloco_inicio = bloco, inicio
+        return self._bloco[linha - inicio]
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        linha, coluna = index.row(), index.column()
+        if role == Qt.DisplayRole:
+            if coluna == self.X.shape[1]:
+                classe = int(self.y[linha])
+                return self.labels[classe] if classe < len(self.labels) else str(classe)
+            return f"{self._linha(linha)[coluna]:.4f}"
+        if role == Qt.TextAlignmentRole and coluna < self.X.shape[1]:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, secao, orientacao, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        if orientacao == Qt.Vertical:
+            return str(secao + 1)
+        return "Classe" if secao == self.X.shape[1] else f"Atr {secao + 1}"
+
+
+class ModeloEstatisticas(QAbstractTableModel):
+    """Uma linha por atributo: mínimo, máximo e média (valores brutos)."""
+
+    COLUNAS = ("Mínimo", "Máximo", "Média")
+
+    def __init__(self, estatisticas, parent=None):
+        super().__init__(parent)
+        self._valores = np.column_stack([estatisticas["mins"], estatisticas["maxs"], estatisticas["medias"]])
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self._valores)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUNAS)
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        if role == Qt.DisplayRole:
+            return f"{self._valores[index.row(), index.column()]:.4g}"
+        if role == Qt.TextAlignmentRole:
+            return int(Qt.AlignRight | Qt.AlignVCenter)
+        return None
+
+    def headerData(self, secao, orientacao, role=Qt.DisplayRole):
+        if role != Qt.DisplayRole:
+            return None
+        return self.COLUNAS[secao] if orientacao == Qt.Horizontal else f"Atr {secao + 1}"
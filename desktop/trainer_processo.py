@@ -0,0 +1,279 @@
+"""
+Treino em um processo separado: o laço de treino não disputa o GIL com a GUI.
+
+- O processo filho roda o mesmo laço de TrainerThread (run() chamado direto,
+  sem thread); cada sinal emitido lá vira um registro em um
+  compartilhado.AnelCompartilhado
+- TrainerProcesso (lado da GUI) lê o anel com um QTimer a fps_alvo e reemite
+  os mesmos sinais de TrainerThread, então MainWindow não muda
+- Pesos: snapshot em compartilhado.PesosCompartilhados (seqlock) a cada
+  snapshot_cada épocas e no fim (pesos_atuais() lê a qualquer momento)
+- Controle GUI -> filho por um Pipe, lido no início de cada época:
+  ('parar',), ('taxa', valor), ('plato', 'reduce' | 'stop' | 'continue').
+  No sentido contrário só passam ('fim', ativacao_tipo, perfil) e ('erro', texto)
+- Dataset (treino e validação) vai uma única vez para memória compartilhada
+"""
+
+import multiprocessing as mp
+import traceback
+
+import numpy as np
+from PySide6.QtCore import QObject, QTimer, Signal
+
+from compartilhado import AnelCompartilhado, PesosCompartilhados, criar_array_compartilhado, anexar_array, liberar
+from mlp import CallbackTreino, especificacao_camadas, formas_camadas, dtype_pesos, dimensao_saida
+from checkpoint import GravadorCheckpoints
+
+# tipos de registro no anel (coluna 0)
+PROGRESSO, VALIDACAO, PLATO, PLATO_ACAO, PARADA, EFICIENCIA, INSTRUMENTACAO = range(1, 8)
+ACOES_PLATO = ("continue", "reduce", "stop")
+# fases do Perfilador com coluna fixa no registro de instrumentação
+FASES = ("forward", "backward", "atualizacao", "treino_paralelo", "sinais", "plato", "validacao")
+LARGURA_REGISTRO = 6 + len(FASES)
+
+
+class _ControleProcesso(CallbackTreino):
+    """No filho: aplica os comandos da GUI e publica o snapshot de pesos."""
+
+    def __init__(self, treino, conexao, pesos_compartilhados, snapshot_cada):
+        self.treino = treino
+        self.conexao = conexao
+        self.pesos_compartilhados = pesos_compartilhados
+        self.snapshot_cada = snapshot_cada
+
+    def inicio_epoca(self, epoca):
+        while self.conexao.poll():
+            try:
+                comando = self.conexao.recv()
+            except EOFError:
+                # a GUI fechou o outro lado: encerra como se tivesse pedido para parar
+                self.treino.request_stop()
+                return
+            if comando[0] == "parar":
+                self.treino.request_stop()
+            elif comando[0] == "taxa":
+                self.treino.definir_taxa(comando[1])
+            elif comando[0] == "plato":
+                self.treino.set_plateau_decision(comando[1])
+
+    def fim_epoca(self, epoca, metricas):
+        if self.snapshot_cada and epoca % self.snapshot_cada == 0:
+            self.pesos_compartilhados.escrever(self.treino.pesos_vivos)
+
+
+def _processo_treino(kwargs, descritores, descritor_anel, descritores_pesos, formas, conexao, snapshot_cada,
+                     config_gravador):
+    # importado aqui: o filho (spawn) só paga o import quando de fato treina
+    from trainer_thread import TrainerThread
+
+    class TreinoNoProcesso(TrainerThread):
+        def _treinar(self, X, y, pesos, paralelo=None, X_val=None, y_val=None):
+            self.pesos_vivos = paralelo.pesos if paralelo is not None else pesos
+            return super()._treinar(X, y, pesos, paralelo, X_val, y_val)
+
+    blocos = []
+    anel = pesos_compartilhados = None
+    try:
+        for nome, descritor in descritores.items():
+            shm, array = anexar_array(descritor)
+            blocos.append(shm)
+            kwargs[nome] = array
+        if config_gravador is not None:
+            kwargs["gravador"] = GravadorCheckpoints(*config_gravador)
+        anel = AnelCompartilhado.anexar(descritor_anel)
+        pesos_compartilhados = PesosCompartilhados(formas, descritores=descritores_pesos)
+
+        treino = TreinoNoProcesso(**kwargs)
+        treino.callbacks.append(_ControleProcesso(treino, conexao, pesos_compartilhados, snapshot_cada))
+
+        treino.progresso.connect(lambda epoca, erro: anel.escrever(PROGRESSO, epoca, erro))
+        treino.validacao.connect(lambda epoca, erro, acuracia: anel.escrever(VALIDACAO, epoca, erro, acuracia))
+        treino.plato_detected.connect(lambda epoca, erro: anel.escrever(PLATO, epoca, erro))
+        treino.plato_acao.connect(
+            lambda epoca, acao: anel.escrever(PLATO_ACAO, epoca, ACOES_PLATO.index(acao)))
+        treino.parada_antecipada.connect(lambda epoca, melhor: anel.escrever(PARADA, epoca, melhor))
+        treino.eficiencia_paralela.connect(lambda epoca, eficiencia: anel.escrever(EFICIENCIA, epoca, eficiencia))
+        treino.instrumentacao.connect(lambda m: anel.escrever(
+            INSTRUMENTACAO, m["epoca"], m["erro"], m["tempo"], m["amostras_por_segundo"],
+            m["memoria_pico_kb"] or 0, *(m["fases"].get(fase, 0.0) for fase in FASES)))
+
+        def finalizar(pesos):
+            pesos_compartilhados.escrever(pesos)
+            conexao.send(("fim", treino.ativacao_tipo, treino.perfil))
+
+        treino.finalizou.connect(finalizar)
+        treino.run()
+    except Exception:
+        conexao.send(("erro", traceback.format_exc()))
+    finally:
+        if anel is not None:
+            anel.fechar()
+        if pesos_compartilhados is not None:
+            pesos_compartilhados.fechar()
+        for shm in blocos:
+            shm.close()
+        conexao.close()
+
+
+class TrainerProcesso(QObject):
+    """
+    Mesmos argumentos, sinais e métodos usados pela GUI que TrainerThread,
+    mas o treino roda em outro processo. Argumentos extras:
+    snapshot_cada: épocas entre snapshots dos pesos (0 = só o final)
+    fps_alvo: leituras do anel por segundo (cada uma emite um progresso_lote)
+    """
+    progresso = Signal(int, float)
+    progresso_lote = Signal(list)
+    finalizou = Signal(tuple)
+    plato_detected = Signal(int, float)
+    plato_acao = Signal(int, str)
+    eficiencia_paralela = Signal(int, float)
+    instrumentacao = Signal(dict)
+    validacao = Signal(int, float, float)
+    parada_antecipada = Signal(int, int)
+    falhou = Signal(str)
+
+    def __init__(self, X, y, snapshot_cada=10, fps_alvo=30, capacidade_anel=65536, **kwargs):
+        super().__init__()
+        estado_inicial = kwargs.get("estado_inicial")
+        self.ativacao_tipo = kwargs.get("ativacao_tipo", "logistica")
+        self.perfil = None  # Perfilador do filho, recebido ao final (instrumentar=True)
+        self.snapshot_cada = snapshot_cada
+
+        # formas dos pesos decididas aqui (mesma heurística de TrainerThread.run)
+        # para alocar o bloco compartilhado antes do filho começar
+        y = np.asarray(y)
+        mapa = kwargs.get("mapa")
+        n_in, n_out = np.shape(X)[1], dimensao_saida(y, len(mapa) if mapa else None)
+        if estado_inicial is not None:
+            formas = [p.shape for p in estado_inicial["pesos"]]
+            dtype = dtype_pesos(estado_inicial["pesos"])
+        else:
+            n_hidden = kwargs.get("n_hidden") or max(1, (n_in + n_out) // 2)
+            larguras, _ = especificacao_camadas(n_hidden, self.ativacao_tipo, kwargs.get("saida"))
+            formas = formas_camadas(n_in, larguras, n_out)
+            dtype = np.dtype(kwargs.get("dtype", np.float64))
+
+        # o gravador (thread de escrita) não atravessa processos: o filho cria o seu
+        self._config_gravador = None
+        gravador = kwargs.pop("gravador", None)
+        if gravador is not None:
+            self._config_gravador = (gravador.diretorio, gravador.manter_ultimos, gravador.manter_melhor)
+            gravador.fechar()
+
+        self._blocos = []
+        self._descritores = {}
+        for nome, array in (("X", X), ("y", y), ("X_val", kwargs.pop("X_val", None)),
+                            ("y_val", kwargs.pop("y_val", None))):
+            if array is not None:
+                shm, descritor, _ = criar_array_compartilhado(np.asarray(array))
+                self._blocos.append(shm)
+                self._descritores[nome] = descritor
+        self.anel = AnelCompartilhado(capacidade_anel, LARGURA_REGISTRO)
+        self.pesos_compartilhados = PesosCompartilhados(formas, dtype)
+
+        self._conexao, conexao_filho = mp.Pipe()
+        self._processo = mp.get_context("spawn").Process(
+            # não-daemon: com n_workers > 1 o filho cria os próprios workers
+            target=_processo_treino, name="TrainerProcesso",
+            args=(kwargs, self._descritores, self.anel.descritor, self.pesos_compartilhados.descritores,
+                  formas, conexao_filho, snapshot_cada, self._config_gravador),
+        )
+        self._timer = QTimer(self)
+        self._timer.setInterval(max(1, int(1000 / fps_alvo)))
+        self._timer.timeout.connect(self._ler)
+        self._encerrado = False
+
+    # ---- mesma interface de TrainerThread usada pela GUI ----
+    def start(self):
+        self._processo.start()
+        self._timer.start()
+
+    def isRunning(self):
+        return not self._encerrado
+
+    def wait(self, timeout_ms=None):
+        self._processo.join(None if timeout_ms is None else timeout_ms / 1000)
+        self._ler()
+        return not self._processo.is_alive()
+
+    def request_stop(self):
+        self._enviar(("parar",))
+
+    def set_plateau_decision(self, choice):
+        self._enviar(("plato", choice))
+
+    def definir_taxa(self, taxa):
+        self._enviar(("taxa", taxa))
+
+    def pesos_atuais(self):
+        """Último snapshot publicado pelo filho (cópia)."""
+        return self.pesos_compartilhados.ler()
+
+    def _enviar(self, comando):
+        if not self._encerrado:
+            try:
+                self._conexao.send(comando)
+            except (BrokenPipeError, OSError):
+                pass
+
+    # ---- leitura periódica do anel (thread da GUI) ----
+    def _ler(self):
+        if self._encerrado:
+            return
+        # mensagem de fim lida antes de drenar o anel: tudo o que o filho
+        # escreveu antes dela já está no anel
+        mensagem = self._conexao.recv() if self._conexao.poll() else None
+        pontos = []
+        for registro in self.anel.ler():
+            tipo, epoca = int(registro[0]), int(registro[1])
+            if tipo == PROGRESSO:
+                pontos.append((epoca, float(registro[2])))
+                self.progresso.emit(epoca, float(registro[2]))
+                continue
+            # como em TrainerThread, só platô e parada descarregam os pontos antes
+            if tipo in (PLATO, PARADA) and pontos:
+                self.progresso_lote.emit(pontos)
+                pontos = []
+            if tipo == VALIDACAO:
+                self.validacao.emit(epoca, float(registro[2]), float(registro[3]))
+            elif tipo == PLATO:
+                self.plato_detected.emit(epoca, float(registro[2]))
+            elif tipo == PLATO_ACAO:
+                self.plato_acao.emit(epoca, ACOES_PLATO[int(registro[2])])
+            elif tipo == PARADA:
+                self.parada_antecipada.emit(epoca, int(registro[2]))
+            elif tipo == EFICIENCIA:
+                self.eficiencia_paralela.emit(epoca, float(registro[2]))
+            elif tipo == INSTRUMENTACAO:
+                self.instrumentacao.emit({
+                    "epoca": epoca, "erro": float(registro[2]), "tempo": float(registro[3]),
+                    "amostras_por_segundo": float(registro[4]), "memoria_pico_kb": int(registro[5]) or None,
+                    "fases": {fase: float(t) for fase, t in zip(FASES, registro[6:]) if t},
+                })
+        if pontos:
+            self.progresso_lote.emit(pontos)
+
+        if mensagem is None and not self._processo.is_alive():
+            if self._conexao.poll():
+                return  # o fim chegou agora; é tratado na próxima leitura, depois de drenar o anel
+            mensagem = ("erro", f"processo de treino terminou com código {self._processo.exitcode}")
+        if mensagem is not None:
+            self._encerrar(mensagem)
+
+    def _encerrar(self, mensagem):
+        self._timer.stop()
+        self._encerrado = True
+        if mensagem[0] == "fim":
+            _, self.ativacao_tipo, self.perfil = mensagem
+            pesos = self.pesos_atuais()
+        self._processo.join()
+        self._conexao.close()
+        self.anel.fechar()
+        self.pesos_compartilhados.fechar()
+        liberar(self._blocos)
+        self._blocos = []
+        if mensagem[0] == "fim":
+            self.finalizou.emit(pesos)
+        else:
+            self.falhou.emit(mensagem[1])
@@ -1,32 +1,117 @@
 from PySide6.QtCore import QThread, Signal
-from mlp import inicializar_pesos, treinar_epoca, forward_pass
+from mlp import (
+    inicializar_camadas, especificacao_camadas, treinar_epoca_camadas, EspacoTrabalho, Perfilador,
+    criar_otimizador, criar_agendador, dtype_pesos, avaliar, validacao_cruzada, dimensao_saida, alvos_treino,
+)
+from paralelo import TreinadorParalelo
+from carregador import CarregadorLotes
+from checkpoint import criar_snapshot, restaurar_rng
+from utils import DetectorPlato
 import numpy as np
-import threading
+import queue
+import random
 import time
 
 
 class TrainerThread(QThread):
     progresso = Signal(int, float)          # (época, erro_médio)
-    finalizou = Signal(tuple)               # (W1, B1, W2, B2)
+    progresso_lote = Signal(list)           # [(época, erro_médio), ...] agrupados a fps_alvo
+    finalizou = Signal(tuple)               # (W1, B1, ..., Wk, Bk)
     plato_detected = Signal(int, float)     # (época, erro_médio) -> notificar GUI para decisão
+    plato_acao = Signal(int, str)           # (época, ação aplicada: 'reduce' | 'stop' | 'continue')
+    eficiencia_paralela = Signal(int, float)  # (época, eficiência de escala) no modo multi-núcleo
+    instrumentacao = Signal(dict)           # métricas da época (só com instrumentar=True)
+    validacao = Signal(int, float, float)   # (época, erro de validação, acurácia de validação)
+    parada_antecipada = Signal(int, int)    # (época da parada, melhor época na validação)
 
-    def __init__(self, X, y, n_hidden=None, epocas=2000, taxa=0.01, erro_alvo=0.0, ativacao_tipo="logistica", plateau_window=10, plateau_std_threshold=1e-5):
+    def __init__(self, X, y, n_hidden=None, epocas=2000, taxa=0.01, erro_alvo=0.0, ativacao_tipo="logistica", plateau_window=10, plateau_std_threshold=1e-5, batch_size=1, n_workers=1, modo_paralelo="sincrono", fps_alvo=30, instrumentar=False, callbacks=(), otimizador=None, agendador=None, politica_plato="perguntar", fator_reducao=0.9, paciencia_plato=10, gravador=None, checkpoint_cada=100, estado_inicial=None, normalizador=None, mapa=None, dtype=np.float64, X_val=None, y_val=None, validar_cada=10, paciencia_validacao=0, restaurar_melhores=True, saida=None, amostragem="sequencial", seed=None):
         super().__init__()
         self.X = X
         self.y = y
-        self.n_hidden = n_hidden  # if None caller should compute and pass
+        # camadas ocultas: int (uma camada), lista de int / (largura, ativação)
+        # — ver mlp.especificacao_camadas — ou None (heurística (n_in + n_out) // 2)
+        self.n_hidden = n_hidden
         self.epocas = epocas
         self.taxa = taxa
         self.erro_alvo = erro_alvo
         self.ativacao_tipo = ativacao_tipo
+        self.saida = saida  # ativação da camada de saída, se diferente (ex.: 'softmax' + entropia cruzada)
+        self.batch_size = batch_size  # 1 = SGD por amostra, None = lote completo
+        # ordem das amostras a cada época: 'sequencial' | 'aleatoria' | 'estratificada' | 'balanceada'
+        # (ver carregador.CarregadorLotes; o modo multi-núcleo mantém os shards fixos)
+        self.amostragem = amostragem
+        self.seed = seed  # semente das ordens; None = sorteada do random global
+        self.dtype = np.dtype(dtype)  # float64 | float32 (pesos, dados e buffers)
+        self.n_workers = n_workers  # > 1 usa TreinadorParalelo (processos + memória compartilhada)
+        self.modo_paralelo = modo_paralelo  # 'sincrono' | 'assincrono'
 
-        # plateau detection config
+        # otimizador ('sgd', 'momentum', 'nesterov', 'rmsprop', 'adam') e
+        # agendador de taxa (ver mlp.criar_agendador); None = SGD com taxa fixa.
+        # O modo multi-núcleo usa sempre SGD com self.taxa.
+        self.otimizador = None
+        self.agendador = criar_agendador(agendador, epocas)
+        if otimizador is not None or self.agendador is not None:
+            self.otimizador = criar_otimizador(otimizador or "sgd", taxa)
+
+        # progresso agrupado: no máximo fps_alvo emissões de progresso_lote/s
+        self.fps_alvo = fps_alvo
+        self._pontos_pendentes = []
+        self._ultimo_envio = 0.0
+
+        # instrumentação opcional (Perfilador) e callbacks (mlp.CallbackTreino)
+        self.perfil = Perfilador() if instrumentar else None
+        self.callbacks = list(callbacks)
+
+        # plateau detection config (média/variância móveis em O(1))
         self.plateau_window = plateau_window
         self.plateau_std_threshold = plateau_std_threshold
+        self.detector_plato = DetectorPlato(plateau_window, plateau_std_threshold)
 
-        # coordination with main thread when plateau happens
-        self._decision_event = threading.Event()
-        self._decision_choice = None  # 'continue', 'reduce', 'stop'
+        # política no platô (nunca bloqueia o treino):
+        #   'perguntar' -> emite plato_detected e segue treinando; a resposta
+        #                  (set_plateau_decision) é aplicada na próxima época
+        #   'reduzir'   -> multiplica a taxa por fator_reducao automaticamente
+        #   'parar'     -> early stop se o platô durar paciencia_plato épocas
+        #   'continuar' -> ignora o platô
+        self.politica_plato = politica_plato
+        self.fator_reducao = fator_reducao
+        self.paciencia_plato = paciencia_plato
+        self._decisoes = queue.SimpleQueue()  # respostas vindas da GUI
+        self._aguardando_decisao = False
+
+        # checkpoints (checkpoint.GravadorCheckpoints): snapshot a cada
+        # checkpoint_cada épocas e um final ao terminar/parar. Com
+        # estado_inicial (carregar_checkpoint) o treino continua da época
+        # salva por mais 'epocas' épocas, com pesos, otimizador, agendador e
+        # RNG restaurados. normalizador/mapa vão junto no snapshot.
+        self.gravador = gravador
+        self.checkpoint_cada = checkpoint_cada
+        self.estado_inicial = estado_inicial
+        self.normalizador = normalizador
+        self.mapa = mapa
+        self.historico_erros = []
+        self.epoca_inicial = 0
+        self._lotes = None  # CarregadorLotes do treino (estado do gerador vai nos snapshots)
+        if estado_inicial is not None:
+            self.otimizador = estado_inicial["otimizador"]
+            self.agendador = estado_inicial["agendador"]
+            self.historico_erros = list(estado_inicial["erros"])
+            self.epoca_inicial = estado_inicial["epoca"]
+
+        # validação periódica (opcional): a cada validar_cada épocas avalia
+        # X_val/y_val com um forward em lote, guarda em memória os pesos com
+        # menor erro de validação e para se não houver melhora em
+        # paciencia_validacao avaliações seguidas (0 = nunca para). Com
+        # restaurar_melhores, finalizou emite os melhores pesos.
+        self.X_val = X_val
+        self.y_val = y_val
+        self.validar_cada = max(1, validar_cada)
+        self.paciencia_validacao = paciencia_validacao
+        self.restaurar_melhores = restaurar_melhores
+        self.melhor_erro_val = float("inf")
+        self.melhor_epoca = None
+        self.ultimo_erro_val = None
+        self._melhores_pesos = None
 
         self._stop_requested = False
 
@@ -34,22 +119,107 @@ class TrainerThread(QThread):
     def set_plateau_decision(self, choice):
         """
         choice: 'continue' | 'reduce' | 'stop'
+        Pode ser chamado a qualquer momento; a thread aplica a decisão no
+        início da próxima época, sem ter parado para esperá-la.
         """
-        self._decision_choice = choice
-        # wake the waiting thread
-        self._decision_event.set()
+        self._decisoes.put(choice)
 
     def request_stop(self):
         self._stop_requested = True
 
+    def definir_taxa(self, taxa):
+        """Troca a taxa de aprendizado (chame entre épocas, ex.: de um CallbackTreino)."""
+        self._reduzir_taxa(taxa / self.taxa)
+
+    def _reduzir_taxa(self, fator):
+        self.taxa *= fator
+        if self.otimizador is not None:
+            self.otimizador.taxa *= fator
+        if self.agendador is not None:
+            self.agendador.escalar(fator)
+
+    def _aplicar_acao_plato(self, epoca, acao):
+        """Aplica 'reduce' | 'stop' | 'continue' e reinicia a janela do detector."""
+        if acao == 'stop':
+            self._stop_requested = True
+        elif acao == 'reduce':
+            self._reduzir_taxa(self.fator_reducao)
+        # nova janela cheia antes de detectar outro platô
+        self.detector_plato.reiniciar()
+        self.plato_acao.emit(epoca, acao)
+
+    def _enfileirar_progresso(self, epoca, erro_medio, forcar=False):
+        """Acumula o ponto e emite o lote quando o intervalo de quadro venceu."""
+        if epoca is not None:
+            self._pontos_pendentes.append((epoca, erro_medio))
+        agora = time.perf_counter()
+        if self._pontos_pendentes and (forcar or agora - self._ultimo_envio >= 1.0 / self.fps_alvo):
+            self.progresso_lote.emit(self._pontos_pendentes)
+            self._pontos_pendentes = []
+            self._ultimo_envio = agora
+
+    def _submeter_checkpoint(self, epoca, pesos):
+        if self.gravador is None:
+            return
+        config = {
+            "ativacao_tipo": self.ativacao_tipo,
+            "taxa": self.taxa,
+            "batch_size": self.batch_size,
+            "n_hidden": self.n_hidden,
+            "saida": self.saida,
+            "amostragem": self.amostragem,
+            "seed": self.seed,
+        }
+        # com validação, o melhor checkpoint é o de menor erro de validação
+        metrica = self.ultimo_erro_val
+        if metrica is None:
+            metrica = self.historico_erros[-1] if self.historico_erros else None
+        self.gravador.submeter(criar_snapshot(epoca, pesos, self.otimizador, self.agendador, self.historico_erros,
+                                              self.normalizador, self.mapa, config, metrica, self._lotes))
+
+    def _validar(self, epoca, pesos, X_val, y_val):
+        """Avalia a validação; retorna True se deve parar (sem melhora há paciencia avaliações)."""
+        erro_val, acuracia = avaliar(X_val, y_val, pesos, self.ativacao_tipo)
+        self.ultimo_erro_val = erro_val
+        self.validacao.emit(epoca, erro_val, acuracia)
+
+        if erro_val < self.melhor_erro_val:
+            self.melhor_erro_val = erro_val
+            self.melhor_epoca = epoca
+            self._avaliacoes_sem_melhora = 0
+            if self._melhores_pesos is None:
+                self._melhores_pesos = [np.array(p, copy=True) for p in pesos]
+            else:
+                for destino, p in zip(self._melhores_pesos, pesos):
+                    np.copyto(destino, p)
+            return False
+
+        self._avaliacoes_sem_melhora += 1
+        return bool(self.paciencia_validacao) and self._avaliacoes_sem_melhora >= self.paciencia_validacao
+
     def run(self):
+        # ao retomar, vale o dtype dos pesos salvos
+        if self.estado_inicial is not None:
+            self.dtype = dtype_pesos(self.estado_inicial["pesos"])
+
+        # converte uma única vez para matrizes contíguas (o motor é vetorizado)
+        # y: one-hot, valores (uma coluna) ou índices de classe inteiros,
+        # que ficam como vetor compacto (o one-hot é implícito no kernel)
+        X = np.asarray(self.X, dtype=self.dtype)
+        y = alvos_treino(self.y, self.dtype)
+        if y.ndim == 1 and not np.issubdtype(y.dtype, np.integer):
+            y = y.reshape(-1, 1)
+
+        X_val = y_val = None
+        if self.X_val is not None and self.y_val is not None and len(self.X_val):
+            X_val = np.asarray(self.X_val, dtype=self.dtype)
+            y_val = alvos_treino(self.y_val, self.dtype)
+            if not np.issubdtype(y_val.dtype, np.integer):
+                y_val = y_val.reshape(len(X_val), -1)
+
         # Calcula dimensões de entrada e saída
-        n_in = len(self.X[0])
-        # y pode ser one-hot (lista) ou rótulos simples; suporta ambos
-        if isinstance(self.y[0], list) or isinstance(self.y[0], (tuple, np.ndarray)):
-            n_out = len(self.y[0])
-        else:
-            n_out = 1
+        n_in = X.shape[1]
+        n_out = dimensao_saida(y, len(self.mapa) if self.mapa else None)
 
         # se n_hidden não fornecido, calcula heurística
         if self.n_hidden is None:
@@ -57,59 +227,191 @@ class TrainerThread(QThread):
             if self.n_hidden < 1:
                 self.n_hidden = 1
 
-        # inicializa pesos
-        W1, B1, W2, B2 = inicializar_pesos(n_in, self.n_hidden, n_out)
+        # ativação por camada (str se todas iguais)
+        larguras, self.ativacao_tipo = especificacao_camadas(self.n_hidden, self.ativacao_tipo, self.saida)
+
+        # inicializa pesos (ou restaura do checkpoint)
+        if self.estado_inicial is not None:
+            pesos = tuple(np.array(p, copy=True) for p in self.estado_inicial["pesos"])
+        else:
+            pesos = inicializar_camadas(n_in, larguras, n_out, self.dtype)
+
+        paralelo = None
+        if self.n_workers and self.n_workers > 1:
+            paralelo = TreinadorParalelo(
+                X, y, pesos,
+                n_workers=self.n_workers,
+                modo=self.modo_paralelo,
+                ativacao_tipo=self.ativacao_tipo,
+                batch_size=self.batch_size,
+                metodo_inicio="spawn",
+            )
+
+        epoca_final = self.epoca_inicial
+        try:
+            epoca_final = self._treinar(X, y, pesos, paralelo, X_val, y_val)
+        finally:
+            if paralelo is not None:
+                paralelo.fechar()
+                pesos = paralelo.pesos
+            if self.gravador is not None:
+                # snapshot final (também quando o usuário parou o treino)
+                if epoca_final > self.epoca_inicial:
+                    self._submeter_checkpoint(epoca_final, pesos)
+                self.gravador.fechar()
+
+        # volta para os pesos da melhor época na validação
+        if self.restaurar_melhores and self._melhores_pesos is not None:
+            for destino, melhor in zip(pesos, self._melhores_pesos):
+                np.copyto(destino, melhor)
 
-        erros_hist = []  # histórico de erros por época
+        # descarrega os pontos ainda não enviados ao gráfico
+        self._enfileirar_progresso(None, None, forcar=True)
+
+        for callback in self.callbacks:
+            callback.fim_treino(pesos)
+
+        # fim do loop de treinamento: emitir sinais de finalização com pesos
+        self.finalizou.emit(tuple(pesos))
+
+    def _treinar(self, X, y, pesos, paralelo=None, X_val=None, y_val=None):
+        """Laço de épocas; retorna a última época concluída."""
+        ultimo_erro = self.historico_erros[-1] if self.historico_erros else None
+        epocas_em_plato = 0
+        perfil = self.perfil
+        concluida = self.epoca_inicial
+        self._avaliacoes_sem_melhora = 0
+        # buffers de ativações/deltas/gradientes reaproveitados em todas as épocas
+        espaco = EspacoTrabalho(pesos, self.ativacao_tipo, self.batch_size or len(X)) if paralelo is None else None
+        lotes = None
+        if paralelo is None and self.amostragem != "sequencial":
+            if self.seed is None:
+                self.seed = random.getrandbits(64)
+            lotes = CarregadorLotes(X, y, self.batch_size, self.amostragem, seed=self.seed)
+        self._lotes = lotes
+        if self.estado_inicial is not None:
+            # RNG global e a ordem das épocas continuam de onde pararam
+            restaurar_rng(self.estado_inicial["rng"], lotes)
+
+        for epoca in range(self.epoca_inicial + 1, self.epoca_inicial + self.epocas + 1):
+            # decisões da GUI que chegaram durante a época anterior
+            while not self._decisoes.empty():
+                self._aguardando_decisao = False
+                self._aplicar_acao_plato(epoca, self._decisoes.get())
 
-        for epoca in range(1, self.epocas + 1):
             if self._stop_requested:
                 break
 
-            erro_medio = treinar_epoca(self.X, self.y, W1, B1, W2, B2, self.taxa, self.ativacao_tipo)
-            erros_hist.append(erro_medio)
+            if self.agendador is not None:
+                self.agendador.ajustar(self.otimizador, epoca - 1, ultimo_erro)
+
+            if perfil is not None:
+                perfil.iniciar_epoca()
+            for callback in self.callbacks:
+                callback.inicio_epoca(epoca)
 
-            # emitir progresso
+            if paralelo is not None:
+                t0 = time.perf_counter()
+                erro_medio = paralelo.treinar_epoca(self.taxa)
+                if perfil is not None:
+                    perfil.registrar("treino_paralelo", t0)
+                self.eficiencia_paralela.emit(epoca, paralelo.metricas["eficiencia"])
+            else:
+                erro_medio = treinar_epoca_camadas(X, y, pesos, self.taxa, self.ativacao_tipo, self.batch_size, perfil,
+                                                   self.otimizador, espaco, lotes)
+            ultimo_erro = erro_medio
+            concluida = epoca
+            if self.gravador is not None:
+                self.historico_erros.append(erro_medio)
+                if epoca % self.checkpoint_cada == 0:
+                    self._submeter_checkpoint(epoca, paralelo.pesos if paralelo is not None else pesos)
+
+            # emitir progresso (por época e agrupado para o gráfico)
+            t0 = time.perf_counter() if perfil is not None else 0.0
             self.progresso.emit(epoca, erro_medio)
+            self._enfileirar_progresso(epoca, erro_medio)
+            if perfil is not None:
+                perfil.registrar("sinais", t0)
+
+            # verificar platô: desvio padrão móvel das últimas
+            # 'plateau_window' épocas comparado com o threshold (O(1))
+            t0 = time.perf_counter() if perfil is not None else 0.0
+            em_plato = self.detector_plato.adicionar(erro_medio)
+            if perfil is not None:
+                perfil.registrar("plato", t0)
+
+            # validação periódica (forward em lote) e parada antecipada
+            parar_validacao = False
+            if X_val is not None and epoca % self.validar_cada == 0:
+                t0 = time.perf_counter() if perfil is not None else 0.0
+                parar_validacao = self._validar(epoca, paralelo.pesos if paralelo is not None else pesos, X_val, y_val)
+                if perfil is not None:
+                    perfil.registrar("validacao", t0)
+
+            # fecha as métricas da época
+            if perfil is not None:
+                metricas = perfil.finalizar_epoca(epoca, len(X), erro_medio)
+                self.instrumentacao.emit(metricas)
+            else:
+                metricas = {"epoca": epoca, "erro": erro_medio}
+            for callback in self.callbacks:
+                callback.fim_epoca(epoca, metricas)
+
+            if parar_validacao:
+                self._enfileirar_progresso(None, None, forcar=True)
+                self.parada_antecipada.emit(epoca, self.melhor_epoca)
+                break
 
             # critério de parada por erro alvo
             if self.erro_alvo is not None and self.erro_alvo > 0 and erro_medio <= self.erro_alvo:
                 # atingiu erro desejado -> finaliza
                 break
 
-            # verificar platô: se tivermos pelo menos 'plateau_window' épocas,
-            # calcular desvio padrão do último bloco e comparar com threshold
-            if len(erros_hist) >= self.plateau_window:
-                window = erros_hist[-self.plateau_window:]
-                std = float(np.std(window))
-                # se desvio padrão muito pequeno -> consideramos platô
-                if 0.0 <= std <= self.plateau_std_threshold:
-                    # emitir sinal pra GUI e aguardar decisão do usuário
+            if not em_plato:
+                epocas_em_plato = 0
+            elif self.politica_plato == 'perguntar':
+                # avisa a GUI uma vez e segue treinando enquanto ela decide
+                if not self._aguardando_decisao:
+                    self._aguardando_decisao = True
+                    self._enfileirar_progresso(None, None, forcar=True)
                     self.plato_detected.emit(epoca, erro_medio)
-
-                    # aguardar decisão (main thread deverá chamar set_plateau_decision)
-                    self._decision_event.clear()
-                    # Espera até que a main thread escolha uma ação
-                    self._decision_event.wait()
-
-                    # se pediu parar
-                    if self._decision_choice == 'stop':
-                        self._stop_requested = True
-                        break
-                    elif self._decision_choice == 'reduce':
-                        # reduz taxa em 10%
-                        self.taxa *= 0.9
-                        # limpa para próxima iteração
-                        self._decision_choice = None
-                        # continua treinamento (se continuar, pode detectar novamente)
-                        continue
-                    else:
-                        # 'continue' -> apenas continuar sem alterar taxa
-                        self._decision_choice = None
-                        continue
+            elif self.politica_plato == 'reduzir':
+                self._aplicar_acao_plato(epoca, 'reduce')
+            elif self.politica_plato == 'parar':
+                epocas_em_plato += 1
+                if epocas_em_plato >= self.paciencia_plato:
+                    self._aplicar_acao_plato(epoca, 'stop')
+                    break
 
             # inserir pequena pausa (não estrangula CPU) - opcional
             # time.sleep(0.0001)
 
-        # fim do loop de treinamento: emitir sinais de finalização com pesos
-        self.finalizou.emit((W1, B1, W2, B2))
\ No newline at end of file
+        return concluida
+
+
+class ValidacaoCruzadaThread(QThread):
+    """
+    Modo de avaliação: k-fold estratificado (mlp.validacao_cruzada) com as
+    dobras treinadas em paralelo em processos, fora da thread da GUI.
+    """
+    dobra_concluida = Signal(dict)  # métricas de cada dobra, na ordem de conclusão
+    finalizou = Signal(dict)        # resultado agregado de validacao_cruzada
+    falhou = Signal(str)
+
+    def __init__(self, X, y, k=5, repeticoes=1, **kwargs):
+        super().__init__()
+        self.X = X
+        self.y = y
+        self.k = k
+        self.repeticoes = repeticoes
+        self.kwargs = kwargs  # n_hidden, taxa, epocas, ativacao_tipo, saida, batch_size, otimizador, processos, dtype
+
+    def run(self):
+        try:
+            # spawn: fork a partir de uma thread com Qt ativo não é seguro
+            resultado = validacao_cruzada(self.X, self.y, self.k, self.repeticoes, metodo_inicio="spawn",
+                                          ao_concluir=self.dobra_concluida.emit, **self.kwargs)
+        except Exception as e:
+            self.falhou.emit(str(e))
+            return
+        self.finalizou.emit(resultado)
@@ -0,0 +1,128 @@
+"""
+Testes de regressão do motor da MLP (dados da Iris).
+
+Conferem as equivalências que o código promete: SGD por amostra igual ao
+laço antigo, treinar_epoca delegando para treinar_epoca_camadas, retomada
+exata de checkpoint, paralelo síncrono igual ao lote completo serial e
+cada membro do ensemble igual a um treino isolado com a sua semente.
+
+    python -m pytest -q tests
+"""
+
+import multiprocessing as mp
+import os
+import random
+import sys
+
+import numpy as np
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(RAIZ, "backend"))
+
+from checkpoint import GravadorCheckpoints, ultimo_checkpoint  # noqa: E402
+from ensemble import treinar_ensemble, membro  # noqa: E402
+from mlp import (  # noqa: E402
+    inicializar_camadas, inicializar_pesos, especificacao_camadas, forward_pass, backpropagation,
+    treinar_epoca, treinar_epoca_camadas, treinar, retomar_treino,
+)
+from paralelo import TreinadorParalelo  # noqa: E402
+from utils import ler_csv, preparar_dados, codificar_indices, indices_para_one_hot, Normalizador  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def iris():
+    X, y = preparar_dados(ler_csv(os.path.join(RAIZ, "backend", "Base_Treinamento_Iris.csv")))
+    indices, mapa = codificar_indices(y)
+    X = Normalizador("minmax").fit_transform(X)
+    return np.asarray(X), np.asarray(indices), indices_para_one_hot(indices, len(mapa))
+
+
+def _iguais(a, b):
+    return all(np.array_equal(p, q) for p, q in zip(a, b))
+
+
+def _pesos(semente, larguras=(3,), dtype=np.float64):
+    random.seed(semente)
+    return inicializar_camadas(4, list(larguras), 3, dtype)
+
+
+def test_lote_1_igual_ao_laco_por_amostra(iris):
+    X, _, Y = iris
+    random.seed(0)
+    referencia = inicializar_pesos(4, 3, 3)
+    pesos = tuple(p.copy() for p in referencia)
+
+    # laço original: forward + backpropagation amostra a amostra
+    erros = []
+    for x, y in zip(X, Y):
+        hidden, output = forward_pass(x, *referencia)
+        erros.append(backpropagation(x, y, hidden, output, *referencia, 0.5))
+
+    erro = treinar_epoca_camadas(X, Y, pesos, 0.5, batch_size=1)
+    assert erro == pytest.approx(sum(erros) / len(erros), rel=1e-12)
+    for p, q in zip(pesos, referencia):
+        np.testing.assert_allclose(p, q, rtol=1e-12, atol=1e-14)
+
+
+@pytest.mark.parametrize("batch_size", [1, 16, None])
+def test_treinar_epoca_delega_para_camadas(iris, batch_size):
+    X, _, Y = iris
+    a = _pesos(1)
+    b = tuple(p.copy() for p in a)
+    erro_a = treinar_epoca(X, Y, *a, taxa=0.3, batch_size=batch_size)
+    erro_b = treinar_epoca_camadas(X, Y, b, 0.3, batch_size=batch_size)
+    assert erro_a == erro_b
+    assert _iguais(a, b)
+
+
+@pytest.mark.parametrize("amostragem", ["sequencial", "aleatoria", "estratificada"])
+def test_retomada_de_checkpoint_exata(iris, tmp_path, amostragem):
+    X, indices, _ = iris
+    kwargs = dict(n_in=4, n_hidden=[5, 3], n_out=3, taxa=0.3, batch_size=8, saida="softmax",
+                  otimizador="momentum", amostragem=amostragem)
+
+    random.seed(7)
+    direto = treinar(X, indices, epocas=20, **kwargs)
+
+    gravador = GravadorCheckpoints(str(tmp_path))
+    random.seed(7)
+    treinar(X, indices, epocas=10, gravador=gravador, checkpoint_cada=10, **kwargs)
+    gravador.fechar()
+
+    # a amostragem, a saída e o estado do carregador vêm do checkpoint
+    retomado = retomar_treino(ultimo_checkpoint(str(tmp_path)), X, indices, epocas=10)
+    assert _iguais(direto, retomado)
+
+
+@pytest.mark.skipif("fork" not in mp.get_all_start_methods(), reason="exige o método de início 'fork'")
+@pytest.mark.parametrize("alvos", ["one_hot", "indices"])
+def test_paralelo_sincrono_igual_ao_lote_completo(iris, alvos):
+    X, indices, Y = iris
+    saida = "softmax" if alvos == "indices" else None
+    Y = indices if alvos == "indices" else Y
+    _, ativacoes = especificacao_camadas(3, "logistica", saida)
+    serial = _pesos(2)
+
+    erros_serial = [treinar_epoca_camadas(X, Y, serial, 0.5, ativacoes, batch_size=None) for _ in range(5)]
+    with TreinadorParalelo(X, Y, _pesos(2), n_workers=2, ativacao_tipo=ativacoes, batch_size=None,
+                           metodo_inicio="fork") as paralelo:
+        erros_paralelo = [paralelo.treinar_epoca(0.5) for _ in range(5)]
+        pesos_paralelo = paralelo.pesos_copia()
+
+    np.testing.assert_allclose(erros_paralelo, erros_serial, rtol=1e-10)
+    for p, q in zip(pesos_paralelo, serial):
+        np.testing.assert_allclose(p, q, rtol=1e-10, atol=1e-12)
+
+
+def test_membros_do_ensemble_iguais_a_treinos_isolados(iris, capsys):
+    X, indices, _ = iris
+    pesos = treinar_ensemble(X, indices, 4, [5], 3, n_membros=3, seed=10, taxa=0.3, epocas=5, batch_size=16,
+                             saida="softmax")
+    _, ativacoes = especificacao_camadas([5], "logistica", "softmax")
+    for i in range(3):
+        isolado = _pesos(10 + i, [5])
+        for _ in range(5):
+            treinar_epoca_camadas(X, indices, isolado, 0.3, ativacoes, batch_size=16)
+        for p, q in zip(membro(pesos, i), isolado):
+            np.testing.assert_allclose(p, q, rtol=1e-10, atol=1e-12)